@@ -0,0 +1,33 @@
+"""add quiz (user_id, is_saved, created_at desc) index
+
+Revision ID: 8c3f1d2a9b47
+Revises: 29719f0a6707
+Create Date: 2026-10-19 10:12:41.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3f1d2a9b47'
+down_revision: Union[str, Sequence[str], None] = '29719f0a6707'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_quiz_user_id_is_saved_created_at',
+        'quiz',
+        ['user_id', 'is_saved', sa.text('created_at DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_quiz_user_id_is_saved_created_at', table_name='quiz')
@@ -15,6 +15,14 @@ api_router.include_router(
     quiz_router.router,
 )
 
+api_router.include_router(
+    quiz_router.stream_router,
+)
+
 api_router.include_router(
     note_router.router
+)
+
+api_router.include_router(
+    note_router.stream_router
 )
\ No newline at end of file
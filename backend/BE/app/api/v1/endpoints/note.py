@@ -1,11 +1,10 @@
 
-import shutil
-from typing import List
+from typing import List, Optional
 
 from app.core.base_router import BaseRouter
 from app.schema.common import APIResponse
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
 import os
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -19,7 +18,13 @@ from app.schema.note import (
     UrlFillBlankRequest,
 )
 from app.service.note_service import NoteService
-from app.auth.dependencies import get_current_user
+from app.schema.job import TaskEventsTokenResponse
+from app.service.task_events import SSE_HEADERS, task_event_hub
+from app.service.task_status import task_status_reader
+from app.auth.dependencies import get_current_user, get_stream_user
+from app.util.jwt_utils import create_stream_token
+from app.util.file_delivery import serve_file
+from app.util.upload import remove_uploads, save_pdf_uploads
 from app.schema.common import APIResponse
 
 
@@ -34,21 +39,17 @@ async def create_summary_from_files(
     current_user_id: int = Depends(get_current_user_id)
 ):
     
-    temp_dir = os.path.join(settings.SUMMARY_WORKDIR, "temp_uploads", str(current_user_id))
-    os.makedirs(temp_dir, exist_ok=True)
-    saved_paths = []
-    
-    # 파일 저장
-    for file in files:
-        file_path = os.path.join(temp_dir, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        saved_paths.append(file_path)
-                
-    result = await note_service.create_summary_from_files(
-        user_id=current_user_id,
-        files=saved_paths
-    )
+    # 파일 저장 (이벤트 루프 밖에서 스트리밍 + SHA-256, 크기/PDF 형식 검사)
+    uploads = await save_pdf_uploads(files, current_user_id)
+    try:
+        result = await note_service.create_summary_from_files(
+            user_id=current_user_id,
+            files=[u.path for u in uploads],
+            file_digests=[u.sha256 for u in uploads]
+        )
+    except Exception:
+        remove_uploads(uploads)
+        raise
         
     return APIResponse(
         status=200,
@@ -78,21 +79,16 @@ async def create_blank_from_files(
     files: List[UploadFile] = File(...),
     current_user_id: int = Depends(get_current_user_id)
 ):
-    temp_dir = os.path.join(settings.SUMMARY_WORKDIR, "temp_uploads", str(current_user_id))
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    saved_paths = []
-    
-    for file in files:
-        file_path = os.path.join(temp_dir, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        saved_paths.append(file_path)
-        
-    result = await note_service.create_blank_from_files(
-        user_id=current_user_id,
-        files=saved_paths
-    )
+    uploads = await save_pdf_uploads(files, current_user_id)
+    try:
+        result = await note_service.create_blank_from_files(
+            user_id=current_user_id,
+            files=[u.path for u in uploads],
+            file_digests=[u.sha256 for u in uploads]
+        )
+    except Exception:
+        remove_uploads(uploads)
+        raise
         
     return APIResponse(
         status=200,
@@ -119,25 +115,85 @@ async def create_blank_from_url(
     )
 
 # 생성된 PDF 다운
-async def download_pdf(job_id: str, filename: str):
+# ETag/Range/immutable 캐시/사전 압축/X-Accel-Redirect 처리는 app/util/file_delivery.py
+async def download_pdf(job_id: str, filename: str, request: Request):
+    # 경로 이동(../) 방지
+    if os.path.basename(filename) != filename or os.path.basename(job_id) != job_id:
+        raise HTTPException(status_code=404, detail="PDF를 찾을 수 없습니다")
+
     file_path = os.path.join(settings.SUMMARY_WORKDIR, f"job_{job_id}", filename)
     
-    if not os.path.exists(file_path):
+    if not os.path.isfile(file_path):
         raise HTTPException(status_code=404, detail="PDF를 찾을 수 없습니다")
     
-    return FileResponse(
-        path=file_path,
-        filename=filename,
-        media_type="application/pdf"
+    return await serve_file(request, file_path, filename, "application/pdf")
+
+# 실패한 노트 생성 작업 재시도
+async def retry_note_job(
+    job_id: str,
+    current_user_id: int = Depends(get_current_user_id)
+):
+    result = await note_service.retry_job(
+        user_id=current_user_id,
+        job_id=job_id
+    )
+    
+    return APIResponse(
+        status=202,
+        message="노트 생성 작업을 다시 시작했습니다.",
+        data=result
     )
 
 async def get_note_task_status(
     task_id: str,
     current_user_id: int = Depends(get_current_user_id)
 ):
+    await task_status_reader.ensure_owner(task_id, current_user_id)
     result = await note_service.get_task_status(task_id)
     return APIResponse(
         status=200,
         message="작업 상태 조회 성공",
         data=result
-    )
\ No newline at end of file
+    )
+
+# 노트 생성 작업 상태 구독 토큰 발급 (EventSource는 헤더를 못 보내므로 events?token=으로 전달)
+async def issue_note_events_token(
+    task_id: str,
+    current_user_id: int = Depends(get_current_user_id)
+):
+    await task_status_reader.ensure_owner(task_id, current_user_id)
+    return APIResponse(
+        status=200,
+        message="구독 토큰 발급 성공",
+        data=TaskEventsTokenResponse(
+            token=create_stream_token(current_user_id, task_id),
+            expires_in=settings.TASK_EVENTS_TOKEN_EXPIRE_SEC
+        )
+    )
+
+# 노트 생성 작업 상태 실시간 구독 (SSE, 완료/실패 시 스트림 종료, 인증은 구독 토큰으로)
+async def stream_note_task_status(
+    task_id: str,
+    user: dict = Depends(get_stream_user)
+):
+    return StreamingResponse(
+        task_event_hub.stream(task_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+# 노트 생성 작업 상태 long-poll (If-None-Match와 다를 때까지 대기, 시간 초과 시 304)
+async def wait_note_task_status(
+    task_id: str,
+    timeout: int = Query(settings.TASK_LONGPOLL_TIMEOUT_SEC, ge=0, le=60),
+    if_none_match: Optional[str] = Header(None),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    await task_status_reader.ensure_owner(task_id, current_user_id)
+    result, etag, changed = await task_event_hub.wait(task_id, if_none_match, timeout)
+    headers = {"ETag": etag, "Cache-Control": "no-store"}
+    if not changed:
+        return Response(status_code=304, headers=headers)
+    
+    body = APIResponse(status=200, message="작업 상태 조회 성공", data=result).model_dump_json()
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,45 +1,49 @@
-import os
-import shutil
 import traceback
-from typing import List
+from typing import List, Optional
 
-from fastapi import Depends, File, HTTPException, UploadFile
+from fastapi import Depends, File, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_stream_user
 from app.core.config import settings
 from app.db.session import get_db
 from app.exception.custom_exceptions import APIException
 from app.schema.common import APIResponse
+from app.schema.job import TaskEventsTokenResponse
 from app.schema.quiz import (
     QuizFileRequest,
-    QuizListResponse,
     QuizSaveRequest,
     QuizSubmitRequest,
     QuizUrlRequest,
 )
 from app.service.quiz_service import QuizService
+from app.service.task_events import SSE_HEADERS, task_event_hub
+from app.service.task_status import task_status_reader
+from app.util.http_cache import etag_matches
+from app.util.jwt_utils import create_stream_token
+from app.util.upload import remove_uploads, save_pdf_uploads
+from app.util.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 quiz_service = QuizService()
 
 async def get_current_user_id(user: dict = Depends(get_current_user)) -> int:
-    print(user)
     return user["user_id"]
 
 # 노트 목록
 async def get_quizzes(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None),
         db: AsyncSession = Depends(get_db),
         current_user_id: int = Depends(get_current_user_id)
 ):
     try:
-        quizzes = await quiz_service.get_user_quizzes(db, current_user_id)
+        quizzes = await quiz_service.get_user_quizzes(db, current_user_id, limit, cursor)
         
-        if quizzes is None:
-            quizzes = []
         return APIResponse(
             status=200,
             message="저장된 문제 목록 조회 성공",
-            data=QuizListResponse(data=quizzes)
+            data=quizzes
         )
     
     except APIException as e:
@@ -60,27 +64,33 @@ async def get_quizzes(
 # 퀴즈 상세 정보
 async def get_quiz_detail(
     quiz_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     try:
-        quizzes = await quiz_service.get_quiz_detail(db, quiz_id)
-        if not quizzes:
+        # 캐시 적중 시 DB 조회 없이 직렬화된 응답을 그대로 반환
+        detail = await quiz_service.get_quiz_detail_cached(db, quiz_id)
+        if not detail:
             raise HTTPException(
                 status_code=404,
                 detail="문제 내용을 찾을 수 없습니다."
             )
-    
-        return APIResponse(
-                status=200,
-                message="문제 내용 조회 성공",
-                data=quizzes
-            )
+
+        # 브라우저가 매번 재검증하도록 no-cache, 바뀌지 않았으면 304
+        headers = {"ETag": detail.etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, detail.etag):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=detail.body, media_type="application/json", headers=headers)
     
     except APIException as e:
         raise HTTPException(
             status_code=e.status_code,
             detail=e.detail
         )
+
+    except HTTPException:
+        raise
     
     except Exception as e:
         raise HTTPException(
@@ -96,27 +106,21 @@ async def create_quiz_file(
         current_user_id: int = Depends(get_current_user_id)
 ):
 
-    temp_dir = os.path.join(settings.SUMMARY_WORKDIR, "temp_uploads", str(current_user_id))
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    saved_paths = []
+    uploads = []
     
     try:
         
-        for file in files:
-            file_path = os.path.join(temp_dir, file.filename)
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            saved_paths.append(file_path)
-        
-        print(f"✅ {len(saved_paths)}개 파일 임시 저장 완료: {[os.path.basename(p) for p in saved_paths]}")
+        # 이벤트 루프 밖에서 스트리밍 저장 + SHA-256, 크기/PDF 형식 검사
+        uploads = await save_pdf_uploads(files, current_user_id)
+        print(f"✅ {len(uploads)}개 파일 임시 저장 완료: {[u.filename for u in uploads]}")
         
         quiz = await quiz_service.create_quiz_file(
             db=db,
             user_id=current_user_id,
-            files=saved_paths,
+            files=[u.path for u in uploads],
             include_short_answer=include_short_answer,
-            total_questions=10
+            total_questions=10,
+            file_digests=[u.sha256 for u in uploads]
         )
 
         return APIResponse(
@@ -132,13 +136,7 @@ async def create_quiz_file(
         print(f"💬 Detail: {e.detail}")
         print("=" * 60)
         
-        for path in saved_paths:
-            try:
-                if os.path.exists(path):
-                    os.remove(path)
-                    print(f"🗑️ 에러로 인한 임시 파일 정리: {os.path.basename(path)}")
-            except Exception as cleanup_err:
-                print(f"[WARN] 임시 파일 정리 실패: {path}, {cleanup_err}")
+        remove_uploads(uploads)
         
         raise HTTPException(
             status_code=e.status_code,
@@ -154,13 +152,7 @@ async def create_quiz_file(
         print(traceback.format_exc())
         print("=" * 60)
         
-        for path in saved_paths:
-            try:
-                if os.path.exists(path):
-                    os.remove(path)
-                    print(f"🗑️ 에러로 인한 임시 파일 정리: {os.path.basename(path)}")
-            except Exception as cleanup_err:
-                print(f"[WARN] 임시 파일 정리 실패: {path}, {cleanup_err}")
+        remove_uploads(uploads)
         
         raise HTTPException(
             status_code=500,
@@ -306,12 +298,89 @@ async def submit_quiz(
         )
 
 
-async def get_task_status(task_id: str):
+# 실패한 퀴즈 생성 재시도
+async def retry_quiz(
+    quiz_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    try:
+        result = await quiz_service.retry_quiz(
+            db=db,
+            user_id=current_user_id,
+            quiz_id=quiz_id
+        )
+
+        return APIResponse(
+            status=202,
+            message="퀴즈 생성 작업을 다시 시작했습니다.",
+            data=result
+        )
+
+    except APIException as e:
+        print("=" * 60)
+        print("🔥 API Exception in retry_quiz")
+        print(f"🔴 Status Code: {e.status_code}")
+        print(f"💬 Detail: {e.detail}")
+        print("=" * 60)
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail
+        )
+
+
+async def get_task_status(
+        task_id: str,
+        current_user_id: int = Depends(get_current_user_id)
+):
     """Celery 작업 상태 확인"""
+    await task_status_reader.ensure_owner(task_id, current_user_id)
     status = await quiz_service.get_task_status(task_id)
     
     return APIResponse(
         status=200,
         message="작업 상태 조회 성공",
         data=status
-    )
\ No newline at end of file
+    )
+
+
+async def issue_task_events_token(
+        task_id: str,
+        current_user_id: int = Depends(get_current_user_id)
+):
+    """작업 상태 구독 토큰 발급 (EventSource는 헤더를 못 보내므로 events?token=으로 전달)"""
+    await task_status_reader.ensure_owner(task_id, current_user_id)
+    return APIResponse(
+        status=200,
+        message="구독 토큰 발급 성공",
+        data=TaskEventsTokenResponse(
+            token=create_stream_token(current_user_id, task_id),
+            expires_in=settings.TASK_EVENTS_TOKEN_EXPIRE_SEC
+        )
+    )
+
+
+async def stream_task_status(task_id: str, user: dict = Depends(get_stream_user)):
+    """Celery 작업 상태 실시간 구독 (SSE, 완료/실패 시 스트림 종료, 인증은 구독 토큰으로)"""
+    return StreamingResponse(
+        task_event_hub.stream(task_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+async def wait_task_status(
+        task_id: str,
+        timeout: int = Query(settings.TASK_LONGPOLL_TIMEOUT_SEC, ge=0, le=60),
+        if_none_match: Optional[str] = Header(None),
+        current_user_id: int = Depends(get_current_user_id)
+):
+    """Celery 작업 상태 long-poll (If-None-Match와 다를 때까지 대기, 시간 초과 시 304)"""
+    await task_status_reader.ensure_owner(task_id, current_user_id)
+    status, etag, changed = await task_event_hub.wait(task_id, if_none_match, timeout)
+    headers = {"ETag": etag, "Cache-Control": "no-store"}
+    if not changed:
+        return Response(status_code=304, headers=headers)
+
+    body = APIResponse(status=200, message="작업 상태 조회 성공", data=status).model_dump_json()
+    return Response(content=body, media_type="application/json", headers=headers)
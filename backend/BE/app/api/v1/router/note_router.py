@@ -1,10 +1,13 @@
 from app.core.base_router import BaseRouter
+from app.exception.error_code import Error
 from app.schema.common import APIResponse
+from app.schema.job import TaskEventsTokenResponse, TaskStatusResponse
 from app.schema.note import (
     FileSummaryRequest, FileSummaryResponse,
     UrlSummaryRequest, UrlSummaryResponse,
     FileFillBlankRequest, FileFillBlankResponse,
-    UrlFillBlankRequest, UrlFillBlankResponse
+    UrlFillBlankRequest, UrlFillBlankResponse,
+    NoteRetryResponse
 )
 from fastapi.responses import FileResponse
 from app.schema.common import APIResponse
@@ -14,11 +17,16 @@ from app.api.v1.endpoints.note import (
     create_blank_from_files,
     create_blank_from_url,
     download_pdf,
-    get_note_task_status
+    retry_note_job,
+    get_note_task_status,
+    stream_note_task_status,
+    wait_note_task_status,
+    issue_note_events_token
 )
 
 
 router = BaseRouter(prefix ="/notes", tags=["note"])
+stream_router = BaseRouter(prefix ="/notes", tags=["note"], require_auth=False)
 
 router.api_doc(
     path="/summary/files",
@@ -37,7 +45,16 @@ router.api_doc(
             "createdAt": "2025-12-17"
         }
     },
-    errors={},
+    errors={
+        400: {
+            "message": Error.FILE_INVALID_FORMAT.message,
+            "code": Error.FILE_INVALID_FORMAT.code,
+        },
+        413: {
+            "message": Error.FILE_TOO_LARGE.message,
+            "code": Error.FILE_TOO_LARGE.code,
+        },
+    },
     summary="📝 PDF 파일로 요약 노트 생성",
     description="PDF 파일들(최대 5개)로 요약 노트를 생성합니다."
 )
@@ -83,7 +100,16 @@ router.api_doc(
             "createdAt": "2025-12-17"
         }
     },
-    errors={},
+    errors={
+        400: {
+            "message": Error.FILE_INVALID_FORMAT.message,
+            "code": Error.FILE_INVALID_FORMAT.code,
+        },
+        413: {
+            "message": Error.FILE_TOO_LARGE.message,
+            "code": Error.FILE_TOO_LARGE.code,
+        },
+    },
     summary="📝 PDF 파일로 빈칸 채우기 노트 생성",
     description="PDF 파일들로 빈칸 채우기 노트를 생성합니다."
 )
@@ -125,7 +151,8 @@ router.api_doc(
         }
     },
     summary="📄 생성된 PDF 다운로드",
-    description="생성된 PDF 파일을 다운로드합니다. job_id와 filename은 노트 생성 시 반환된 pdfUrl에서 추출할 수 있습니다."
+    description="생성된 PDF 파일을 다운로드합니다. job_id와 filename은 노트 생성 시 반환된 pdfUrl에서 추출할 수 있습니다. "
+                "Range 요청(206)과 ETag/If-None-Match(304)를 지원하며, 결과 파일은 바뀌지 않으므로 immutable로 캐시됩니다."
 )
 
 
@@ -134,18 +161,132 @@ router.api_doc(
     endpoint=get_note_task_status,
     methods=["GET"],
     request_model=None,
-    response_model=APIResponse[dict],
-    success_model=dict,
+    response_model=APIResponse[TaskStatusResponse],
+    success_model=TaskStatusResponse,
     success_example={
         "status": 200,
         "message": "작업 상태 조회 성공",
         "data": {
             "status": "PROCESSING",
-            "progress": 0,
-            "message": "처리 중..."
+            "progress": 35,
+            "message": "페이지 요약 중",
+            "stage": "stage.summarize_pages",
+            "etaSeconds": 120
+        }
+    },
+    errors={
+        404: {
+            "message": Error.JOB_NOT_FOUND.message,
+            "code": Error.JOB_NOT_FOUND.code
         }
     },
-    errors={},
     summary="📊 노트 생성 작업 상태 조회",
-    description="Celery 작업의 진행 상태를 조회합니다."
-)
\ No newline at end of file
+    description="Celery 작업의 진행 상태를 조회합니다. 퀴즈 작업 상태와 같은 형식이며 해당 없는 필드는 null입니다. "
+                "같은 작업을 짧은 간격으로 여러 번 조회하면 약 1초간 같은 결과를 돌려줍니다."
+)
+
+router.api_doc(
+    path="/jobs/{job_id}/retry",
+    endpoint=retry_note_job,
+    methods=["POST"],
+    request_model=None,
+    response_model=APIResponse[NoteRetryResponse],
+    success_model=NoteRetryResponse,
+    success_example={
+        "status": 202,
+        "message": "노트 생성 작업을 다시 시작했습니다.",
+        "data": {
+            "taskId": "baf500f8-335b-4fb6-b421-5f458b15f18b",
+            "jobId": "note_1_1734412800",
+            "status": "PROCESSING",
+            "attempts": 2
+        }
+    },
+    errors={
+        404: {
+            "message": "해당 작업을 찾을 수 없습니다.",
+            "code": "JOB_NOT_FOUND"
+        },
+        409: {
+            "message": "실패한 작업만 다시 시도할 수 있습니다.",
+            "code": "JOB_NOT_RETRYABLE"
+        }
+    },
+    summary="🔁 실패한 노트 생성 재시도",
+    description="실패한 작업을 완료된 단계는 건너뛰고 첫 미완료 단계부터 다시 실행합니다. 기존 taskId로 계속 상태를 조회할 수 있습니다."
+)
+
+router.api_doc(
+    path="/task/{task_id}/events/token",
+    endpoint=issue_note_events_token,
+    methods=["POST"],
+    request_model=None,
+    response_model=APIResponse[TaskEventsTokenResponse],
+    success_model=TaskEventsTokenResponse,
+    success_example={
+        "status": 200,
+        "message": "구독 토큰 발급 성공",
+        "data": {
+            "token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
+            "expiresIn": 60
+        }
+    },
+    errors={
+        404: {
+            "message": Error.JOB_NOT_FOUND.message,
+            "code": Error.JOB_NOT_FOUND.code
+        }
+    },
+    summary="🎫 노트 생성 작업 상태 구독 토큰 발급",
+    description="events(SSE) 연결에 쓸 단기 토큰을 발급합니다. 요청하거나 합류한 작업에만 발급되며, 연결할 때 한 번만 검사합니다."
+)
+
+# SSE는 구독 토큰으로 인증하므로 Bearer 헤더를 요구하지 않는 라우터에 등록
+stream_router.api_doc(
+    path="/task/{task_id}/events",
+    endpoint=stream_note_task_status,
+    methods=["GET"],
+    request_model=None,
+    response_model=None,
+    success_model=None,
+    success_example=None,
+    errors={
+        401: {
+            "message": Error.AUTH_INVALID_TOKEN.message,
+            "code": Error.AUTH_INVALID_TOKEN.code
+        }
+    },
+    summary="📡 노트 생성 작업 상태 실시간 구독 (SSE)",
+    description="text/event-stream으로 상태가 바뀔 때마다 `event: status` (data는 상태 조회 API의 data와 같은 JSON)를 보냅니다. "
+                "변화가 없으면 주기적으로 keep-alive 주석을 보내고, COMPLETED/FAILED를 보낸 뒤 연결을 닫습니다. "
+                "EventSource는 헤더를 보낼 수 없으므로 Authorization 헤더 대신 events/token으로 발급받은 구독 토큰을 ?token=으로 전달합니다."
+)
+
+router.api_doc(
+    path="/task/{task_id}/wait",
+    endpoint=wait_note_task_status,
+    methods=["GET"],
+    request_model=None,
+    response_model=APIResponse[TaskStatusResponse],
+    success_model=TaskStatusResponse,
+    success_example={
+        "status": 200,
+        "message": "작업 상태 조회 성공",
+        "data": {
+            "status": "PROCESSING",
+            "progress": 35,
+            "message": "페이지 요약 중",
+            "stage": "stage.summarize_pages",
+            "etaSeconds": 120
+        }
+    },
+    errors={
+        404: {
+            "message": Error.JOB_NOT_FOUND.message,
+            "code": Error.JOB_NOT_FOUND.code
+        }
+    },
+    summary="⏳ 노트 생성 작업 상태 long-poll",
+    description="SSE를 쓸 수 없는 클라이언트용. 직전 응답의 ETag를 If-None-Match로 보내면 상태가 바뀔 때까지(최대 timeout초) 기다렸다가 응답하고, "
+                "끝까지 바뀌지 않으면 304를 반환합니다. If-None-Match가 없거나 이미 다르면 바로 응답합니다."
+)
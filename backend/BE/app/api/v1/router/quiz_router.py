@@ -4,16 +4,23 @@ from app.api.v1.endpoints.quiz import (
     get_quiz_detail,
     get_quizzes,
     get_task_status,
+    issue_task_events_token,
+    retry_quiz,
     save_quiz_answers,
+    stream_task_status,
     submit_quiz,
+    wait_task_status,
 )
 from app.core.base_router import BaseRouter
+from app.exception.error_code import Error
 from app.schema.common import APIResponse
+from app.schema.job import TaskEventsTokenResponse, TaskStatusResponse
 from app.schema.quiz import (
     QuizDetailResponse,
     QuizFileRequest,
     QuizFileResponse,
     QuizListResponse,
+    QuizRetryResponse,
     QuizSaveRequest,
     QuizSaveResponse,
     QuizSubmitRequest,
@@ -23,6 +30,7 @@ from app.schema.quiz import (
 )
 
 router = BaseRouter(prefix ="/quiz", tags=["quiz"])
+stream_router = BaseRouter(prefix ="/quiz", tags=["quiz"], require_auth=False)
 
 # 저장된 퀴즈 리스트
 router.api_doc(
@@ -31,16 +39,22 @@ router.api_doc(
     methods=["GET"],
     request_model=None,
     response_model=APIResponse[QuizListResponse],
-    success_model=list[QuizListResponse],
-    success_example=[
-        {"quizId": 1, "title": "메타버스 01"},
-        {"quizId": 2, "title": "메타버스 02"},
-    ],
+    success_model=QuizListResponse,
+    success_example={
+        "data": [
+            {"quizId": 2, "title": "메타버스 02", "isSaved": True},
+            {"quizId": 1, "title": "메타버스 01", "isSaved": True},
+        ],
+        "nextCursor": "MjAyNS0xMS0xNlQxNDo1NDoyNSswOTowMHwx",
+    },
     errors={
-
+        400: {
+            "message": Error.QUIZ_INVALID_CURSOR.message,
+            "code": Error.QUIZ_INVALID_CURSOR.code,
+        },
     },
     summary="🗒️ 저장된 퀴즈 노트 목록 조회",
-    description="저장된 모든 노트 목록을 반환합니다.",
+    description="저장된 노트 목록을 최신순으로 limit개씩 반환합니다. 다음 페이지는 응답의 nextCursor를 cursor 쿼리로 넘겨 조회합니다.",
 )
 """
         500: {
@@ -95,7 +109,7 @@ router.api_doc(
 
     },
     summary="📝 저장된 퀴즈 상세 조회",
-    description="특정 퀴즈의 상세 정보(문항, 정답, 해설 등)를 조회합니다.",
+    description="특정 퀴즈의 상세 정보(문항, 정답, 해설 등)를 조회합니다. 응답의 ETag를 If-None-Match로 보내면 변경이 없을 때 304를 반환합니다.",
 )
 
 """
@@ -242,13 +256,124 @@ router.api_doc(
 )
 
 
+# 실패한 퀴즈 생성 재시도
+router.api_doc(
+    path="/{quiz_id}/retry",
+    endpoint=retry_quiz,
+    methods=["POST"],
+    request_model=None,
+    response_model=APIResponse[QuizRetryResponse],
+    success_model=QuizRetryResponse,
+    success_example={
+        "quizId": 1,
+        "taskId": "baf500f8-335b-4fb6-b421-5f458b15f18b",
+        "status": "PROCESSING",
+        "attempts": 2
+    },
+    errors={
+        404: {
+            "message": "해당 작업을 찾을 수 없습니다.",
+            "code": "JOB_NOT_FOUND"
+        },
+        409: {
+            "message": "실패한 작업만 다시 시도할 수 있습니다.",
+            "code": "JOB_NOT_RETRYABLE"
+        }
+    },
+    summary="🔁 실패한 퀴즈 생성 재시도",
+    description="실패한 퀴즈 생성을 완료된 단계는 건너뛰고 첫 미완료 단계부터 다시 실행합니다.",
+)
+
 # task 로그
 router.api_doc(
     path="/task-status/{task_id}",
     endpoint=get_task_status,
     methods=["GET"],
     request_model=None, 
+    response_model=APIResponse[TaskStatusResponse],
+    success_model=TaskStatusResponse, 
+    success_example={
+        "status": 200,
+        "message": "작업 상태 조회 성공",
+        "data": {
+            "status": "COMPLETED",
+            "progress": 100,
+            "jobId": "quiz_12_1",
+            "quizId": 12,
+            "totalQuestions": 10
+        }
+    },
+    errors={
+        404: {
+            "message": Error.JOB_NOT_FOUND.message,
+            "code": Error.JOB_NOT_FOUND.code
+        }
+    },
+    summary="📊 퀴즈 생성 작업 상태 조회",
+    description="Celery 작업의 진행 상태를 조회합니다. 노트 작업 상태와 같은 형식이며 해당 없는 필드는 null입니다."
+)
+
+router.api_doc(
+    path="/task-status/{task_id}/events/token",
+    endpoint=issue_task_events_token,
+    methods=["POST"],
+    request_model=None,
+    response_model=APIResponse[TaskEventsTokenResponse],
+    success_model=TaskEventsTokenResponse,
+    success_example={
+        "status": 200,
+        "message": "구독 토큰 발급 성공",
+        "data": {
+            "token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
+            "expiresIn": 60
+        }
+    },
+    errors={
+        404: {
+            "message": Error.JOB_NOT_FOUND.message,
+            "code": Error.JOB_NOT_FOUND.code
+        }
+    },
+    summary="🎫 퀴즈 생성 작업 상태 구독 토큰 발급",
+    description="events(SSE) 연결에 쓸 단기 토큰을 발급합니다. 요청하거나 합류한 작업에만 발급되며, 연결할 때 한 번만 검사합니다."
+)
+
+# SSE는 구독 토큰으로 인증하므로 Bearer 헤더를 요구하지 않는 라우터에 등록
+stream_router.api_doc(
+    path="/task-status/{task_id}/events",
+    endpoint=stream_task_status,
+    methods=["GET"],
+    request_model=None,
     response_model=None,
-    success_model=None, 
+    success_model=None,
     success_example=None,
-)
\ No newline at end of file
+    errors={
+        401: {
+            "message": Error.AUTH_INVALID_TOKEN.message,
+            "code": Error.AUTH_INVALID_TOKEN.code
+        }
+    },
+    summary="📡 퀴즈 생성 작업 상태 실시간 구독 (SSE)",
+    description="text/event-stream으로 상태가 바뀔 때마다 `event: status` (data는 task-status 응답의 data와 같은 JSON)를 보냅니다. "
+                "변화가 없으면 주기적으로 keep-alive 주석을 보내고, COMPLETED/FAILED를 보낸 뒤 연결을 닫습니다. "
+                "EventSource는 헤더를 보낼 수 없으므로 Authorization 헤더 대신 events/token으로 발급받은 구독 토큰을 ?token=으로 전달합니다."
+)
+
+router.api_doc(
+    path="/task-status/{task_id}/wait",
+    endpoint=wait_task_status,
+    methods=["GET"],
+    request_model=None,
+    response_model=APIResponse[TaskStatusResponse],
+    success_model=TaskStatusResponse,
+    success_example=None,
+    errors={
+        404: {
+            "message": Error.JOB_NOT_FOUND.message,
+            "code": Error.JOB_NOT_FOUND.code
+        }
+    },
+    summary="⏳ 퀴즈 생성 작업 상태 long-poll",
+    description="SSE를 쓸 수 없는 클라이언트용. 직전 응답의 ETag를 If-None-Match로 보내면 상태가 바뀔 때까지(최대 timeout초) 기다렸다가 응답하고, "
+                "끝까지 바뀌지 않으면 304를 반환합니다. If-None-Match가 없거나 이미 다르면 바로 응답합니다."
+)
@@ -1,69 +1,42 @@
-from fastapi import Depends
+from typing import Optional
+
+from fastapi import Depends, Query
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import ExpiredSignatureError, JWTError, jwt
 
-from app.core.config import settings
+from app.auth.token_verifier import token_verifier
+from app.core.logging import get_logger
 from app.exception.custom_exceptions import APIException
 from app.exception.error_code import Error
 
 bearer_scheme = HTTPBearer(auto_error=False)  # 토큰이 없을 때도 우리가 처리
+logger = get_logger(__name__)
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
 ):
     
     """
     JWT 토큰 검증 및 사용자 정보 반환
+
+    - 서명 검증은 token_verifier가 토큰 만료 시각까지 LRU로 기억 (app/auth/token_verifier.py)
+    - CPU 작업이 짧아 스레드풀로 넘기지 않도록 async로 둔다
     """
-    print("\n" + "="*60)
-    print("🔍 JWT Token Verification Started")
-    print("="*60)
-    
     if not credentials:
-        print("❌ No credentials provided")
+        logger.debug("JWT 누락")
         raise APIException(401, Error.AUTH_TOKEN_MISSING)
 
-    token = credentials.credentials
-    print(f"Token (first 30 chars): {token[:30]}...")
-    print(f"Token length: {len(token)}")
-    print(f"JWT_SECRET (first 10 chars): {settings.JWT_SECRET[:10]}...")
-    print(f"JWT_ALGORITHM: {settings.JWT_ALGORITHM}")
-
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        
-        print(f"✅ Token decoded successfully!")
-        print(f"Payload: {payload}")
-
-        # sub 에서 user_id 추출
-        user_id = payload.get("sub")
-        token_type = payload.get("type")
+    user = {"user_id": token_verifier.verify_access(credentials.credentials)}
+    logger.debug("JWT 검증 성공", user_id=user["user_id"])
+    return user
 
-        print(f"✅ Token decoded successfully!")
-        print(f"Payload: {payload}")
 
-        # 타입 검증
-        if token_type != "access":
-            print(f"❌ Invalid token type: {token_type}")
-            raise APIException(401, Error.AUTH_INVALID_TOKEN)
-
-        if user_id is None:
-            print(f"❌ Invalid token type: {token_type}")
-            raise APIException(401, Error.AUTH_INVALID_TOKEN)
-        
-        return {"user_id" : int(user_id)}
-    
-    except ExpiredSignatureError as e:
-        print(f"❌ Token EXPIRED: {e}")
-        raise APIException(401, Error.AUTH_EXPIRED_TOKEN)
-    except JWTError as e:
-        print(f"❌ JWT Error: {type(e).__name__}")
-        print(f"Error message: {str(e)}")
-        print("="*60 + "\n")
-        raise APIException(401, Error.AUTH_INVALID_TOKEN)
-    except Exception as e:
-        print(f"❌ Unexpected error: {type(e).__name__}")
-        print(f"Error message: {str(e)}")
-        print("="*60 + "\n")
-        raise APIException(401, Error.AUTH_INVALID_TOKEN)
\ No newline at end of file
+async def get_stream_user(task_id: str, token: Optional[str] = Query(None)):
+    """
+    작업 상태 SSE 전용: 브라우저 EventSource는 Authorization 헤더를 못 보내므로
+    /events/token으로 발급받은 해당 작업 한정 단기 토큰을 ?token=으로 받는다
+    """
+    if not token:
+        logger.debug("구독 토큰 누락", task_id=task_id)
+        raise APIException(401, Error.AUTH_TOKEN_MISSING)
+    return {"user_id": token_verifier.verify_stream(token, task_id)}
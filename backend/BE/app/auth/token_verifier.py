@@ -0,0 +1,133 @@
+# app/auth/token_verifier.py
+"""
+Access Token / 작업 상태 구독 토큰 검증 (app/auth/dependencies.py에서 사용)
+
+- 서명 검증을 통과한 토큰은 만료 시각까지 작은 LRU에 보관해 같은 토큰이 다시 오면 디코드/서명 검증을 생략
+  (프론트는 한 화면에서 같은 토큰으로 여러 API를 연달아 호출함)
+- LRU 키는 서명 부분이고, 적중 시 header.payload 부분이 저장된 값과 같은지 비교하므로
+  서명만 재사용한 위조 토큰은 캐시를 통과하지 못한다.
+- JWT_BACKEND=pyjwt면 PyJWT로 디코드 (python-jose보다 빠름, 설치돼 있지 않으면 jose 사용)
+"""
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from jose import ExpiredSignatureError, JWTError
+from jose import jwt as jose_jwt
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.exception.custom_exceptions import APIException
+from app.exception.error_code import Error
+
+try:
+    import jwt as pyjwt
+except ImportError:  # 선택 의존성
+    pyjwt = None
+
+logger = get_logger(__name__)
+
+
+class TokenVerifier:
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = settings.JWT_CACHE_SIZE if max_entries is None else max_entries
+        # 서명 → (header.payload, claims, 만료 시각)
+        self._cache: "OrderedDict[str, tuple[str, Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.backend = self._select_backend(settings.JWT_BACKEND)
+
+    @staticmethod
+    def _select_backend(name: str) -> str:
+        if name == "pyjwt" and pyjwt is None:
+            logger.warning("PyJWT가 설치되어 있지 않아 python-jose로 검증합니다")
+            return "jose"
+        return name if name in ("jose", "pyjwt") else "jose"
+
+    # ---------- 디코드 ----------
+    def _decode(self, token: str) -> Dict[str, Any]:
+        if self.backend == "pyjwt":
+            try:
+                return pyjwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+            except pyjwt.ExpiredSignatureError:
+                raise APIException(401, Error.AUTH_EXPIRED_TOKEN)
+            except pyjwt.InvalidTokenError as e:
+                logger.info("JWT 검증 실패", error=type(e).__name__)
+                raise APIException(401, Error.AUTH_INVALID_TOKEN)
+        try:
+            return jose_jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        except ExpiredSignatureError:
+            raise APIException(401, Error.AUTH_EXPIRED_TOKEN)
+        except JWTError as e:
+            logger.info("JWT 검증 실패", error=type(e).__name__)
+            raise APIException(401, Error.AUTH_INVALID_TOKEN)
+
+    # ---------- LRU ----------
+    def _lookup(self, signing_input: str, signature: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(signature)
+            if entry is None:
+                return None
+            cached_input, claims, expires_at = entry
+            if time.time() >= expires_at:
+                del self._cache[signature]
+                return None
+            self._cache.move_to_end(signature)
+        if not hmac.compare_digest(cached_input, signing_input):
+            return None
+        return claims
+
+    def _store(self, signing_input: str, signature: str, claims: Dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if not self.max_entries or not isinstance(exp, (int, float)):
+            return
+        with self._lock:
+            self._cache[signature] = (signing_input, claims, float(exp))
+            self._cache.move_to_end(signature)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    # ---------- 검증 ----------
+    def verify(self, token: str) -> Dict[str, Any]:
+        """서명/만료 검증된 claims 반환 (실패 시 APIException 401)"""
+        signing_input, _, signature = token.rpartition(".")
+        if not signing_input or not signature:
+            raise APIException(401, Error.AUTH_INVALID_TOKEN)
+
+        claims = self._lookup(signing_input, signature)
+        if claims is None:
+            claims = self._decode(token)
+            self._store(signing_input, signature, claims)
+        return claims
+
+    def _user_id(self, claims: Dict[str, Any], token_type: str) -> int:
+        user_id = claims.get("sub")
+        if claims.get("type") != token_type or user_id is None:
+            logger.debug("JWT 타입/sub 불일치", token_type=claims.get("type"))
+            raise APIException(401, Error.AUTH_INVALID_TOKEN)
+        try:
+            return int(user_id)
+        except (TypeError, ValueError):
+            raise APIException(401, Error.AUTH_INVALID_TOKEN)
+
+    def verify_access(self, token: str) -> int:
+        """Access Token → user_id"""
+        return self._user_id(self.verify(token), "access")
+
+    def verify_stream(self, token: str, task_id: str) -> int:
+        """작업 상태 구독 토큰 → user_id (토큰을 발급받은 작업이 아니면 401)"""
+        claims = self.verify(token)
+        user_id = self._user_id(claims, "stream")
+        if claims.get("task_id") != task_id:
+            logger.debug("구독 토큰 작업 불일치", task_id=task_id)
+            raise APIException(401, Error.AUTH_INVALID_TOKEN)
+        return user_id
+
+
+token_verifier = TokenVerifier()
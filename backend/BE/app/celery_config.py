@@ -1,8 +1,19 @@
 import os
+import time
 
 from celery import Celery
+from celery.signals import (
+    after_setup_logger,
+    task_postrun,
+    task_prerun,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+)
 
 from app.core.config import settings
+from app.core.logging import setup_logging
+from app.db.sync_session import dispose_engine, init_engine
 
 REDIS_HOST = os.getenv("REDIS_HOST")
 REDIS_PORT = os.getenv("REDIS_PORT")
@@ -12,11 +23,31 @@ celery_app = Celery(
     broker=f'redis://{REDIS_HOST}:{REDIS_PORT}/0',
     backend=f'redis://{REDIS_HOST}:{REDIS_PORT}/0',
     include=[
+        'app.tasks.pipeline',
+        'app.tasks.stage_tasks',
         'app.tasks.quiz_tasks',
         'app.tasks.note_tasks'
     ]
 )
 
+# 파이프라인 단계별 큐
+#   io  : 다운로드/병합/마무리 (네트워크·디스크 대기 위주 → 높은 동시성)
+#   cpu : PDF 래스터화/영상 디코드 (CPU 바운드 → 코어 수 이하로 제한)
+#   llm : STT/페이지 요약/통합 생성 (OpenAI 응답 대기 위주)
+TASK_ROUTES = {
+    'stage.prepare_pdf': {'queue': 'io'},
+    'stage.download': {'queue': 'io'},
+    'note.finalize': {'queue': 'io'},
+    'quiz.finalize': {'queue': 'io'},
+    'pipeline.failed': {'queue': 'io'},
+    'stage.rasterize': {'queue': 'cpu'},
+    'stage.analyze_media': {'queue': 'cpu'},
+    'stage.summarize_pages': {'queue': 'llm'},
+    'stage.aggregate': {'queue': 'llm'},
+    'stage.transcribe': {'queue': 'llm'},
+    'stage.generate': {'queue': 'llm'},
+}
+
 
 celery_app.conf.update(
     task_serializer='json',
@@ -25,9 +56,20 @@ celery_app.conf.update(
     timezone='Asia/Seoul',
     enable_utc=True,
     task_track_started=True,
+    task_routes=TASK_ROUTES,
     task_time_limit=1600, 
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=10,
+    # --autoscale 사용 시 큐 길이 기반 autoscaler (app/tasks/autoscale.py)
+    worker_autoscaler='app.tasks.autoscale:QueueDepthAutoscaler',
+
+    # 작업 예상 비용에 따른 우선순위 (0이 가장 높음, job_scheduler.priority_for 참고)
+    broker_transport_options={
+        'priority_steps': list(range(10)),
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+    },
+    task_default_priority=3,
     
     # ✅ DB backend 설정
     result_backend_transport_options={
@@ -37,4 +79,61 @@ celery_app.conf.update(
         'task': 'celery_taskmeta',
         'group': 'celery_groupmeta',
     }
-)
\ No newline at end of file
+)
+
+
+# Celery가 만든 로그 핸들러는 그대로 두고 모듈별 레벨/샘플링만 적용 (app/core/logging.py)
+@after_setup_logger.connect
+def _setup_worker_logging(**kwargs):
+    setup_logging(keep_handlers=True)
+
+
+# 워커 프로세스(prefork 자식)마다 DB 커넥션 풀을 한 번만 생성/정리
+@worker_process_init.connect
+def _init_worker_db(**kwargs):
+    init_engine()
+
+
+@worker_process_shutdown.connect
+def _dispose_worker_db(**kwargs):
+    dispose_engine()
+
+
+# ========== 지표 (app/service/metrics.py) ==========
+_task_started = {}
+
+
+@task_prerun.connect
+def _mark_task_start(task_id=None, **kwargs):
+    _task_started[task_id] = time.monotonic()
+
+
+@task_postrun.connect
+def _record_task_runtime(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    from app.tasks.autoscale import record_task_runtime
+
+    record_task_runtime(task, time.monotonic() - started, state)
+
+
+# finalize의 task_id가 곧 상태 조회용 task_id → 결과 저장 직후 구독 중인 API에 알림
+_FINAL_TASKS = ("note.finalize", "quiz.finalize")
+
+
+@task_postrun.connect
+def _publish_final_status(task_id=None, task=None, **kwargs):
+    if task is None or task.name not in _FINAL_TASKS:
+        return
+    from app.service.task_events import publish_task_event
+
+    publish_task_event(task_id)
+
+
+@worker_ready.connect
+def _start_worker_metrics(**kwargs):
+    if settings.WORKER_METRICS_PORT:
+        from app.tasks.autoscale import start_metrics_server
+
+        start_metrics_server(settings.WORKER_METRICS_PORT)
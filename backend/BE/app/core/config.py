@@ -9,31 +9,92 @@ class Settings(BaseSettings):
     API_V1_PREFIX: str
     DEBUG: bool = True
 
+    # 로깅 (app/core/logging.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"              # text | json
+    LOG_LEVELS: str = ""                  # 모듈별 레벨 예) "app.repository=DEBUG,app.auth=WARNING"
+    LOG_SAMPLE_RATES: str = ""            # DEBUG 로그 모듈별 샘플링 비율 예) "app.auth=0.01"
+
     # JWT
     JWT_SECRET: str
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
     ENCRYPT_KEY: str
+    JWT_BACKEND: str = "jose"             # jose | pyjwt (PyJWT 설치 시 더 빠름)
+    JWT_CACHE_SIZE: int = 2048            # 검증된 Access Token LRU 크기 (0이면 캐시 안 함)
 
     # DB
     DATABASE_URL:str
+
+    # Celery 워커용 동기 DB 커넥션 풀 (워커 프로세스당)
+    WORKER_DB_POOL_SIZE: int = 2
+    WORKER_DB_MAX_OVERFLOW: int = 2
+    WORKER_DB_POOL_TIMEOUT: int = 30
+    WORKER_DB_POOL_RECYCLE: int = 1800
+
+    # Redis
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
     
     # 노트 생성
     SUMMARY_WORKDIR: str
+    # 업로드 제한 (app/util/upload.py)
+    UPLOAD_MAX_FILE_BYTES: int = 50 * 1024 * 1024
+    UPLOAD_MAX_REQUEST_BYTES: int = 150 * 1024 * 1024
+    # 결과 PDF 다운로드 (app/util/file_delivery.py)
+    DOWNLOAD_PRECOMPRESS: bool = False     # finalize에서 .br/.gz 변형을 미리 만들어 Accept-Encoding에 맞춰 전송
+    DOWNLOAD_ACCEL_PREFIX: str = ""        # 설정 시 X-Accel-Redirect로 프록시가 전송 (예: "/_protected/jobs")
     PDF_SCRIPT_PATH: str
     URL_SCRIPT_PATH: str
     CANVAS_DOWNLOADER_PATH: str
+    MEDIA_STORE_DIR: str = "/app/data/media_store"   # 사용자 간 공유 강의 영상 저장소
+    MEDIA_STORE_MAX_BYTES: int = 0                     # 0이면 용량 제한 없음
+    MEDIA_CACHE_DIR: str = "/app/data/media_cache"     # STT/오디오 청크/키프레임 공유 캐시
     
     # 스크립트 타임아웃
     PDF_TIMEOUT: int
     VIDEO_TIMEOUT: int
+    DOWNLOAD_TIMEOUT: int = 900
+    # 파이프라인 단계 자동 재시도 (백오프: STAGE_RETRY_BACKOFF * 2^n 초)
+    STAGE_MAX_RETRIES: int = 2
+    STAGE_RETRY_BACKOFF: int = 30
+    # 동일 입력 요청 합치기 키 최대 유지 시간 (작업이 비정상 종료돼도 이후 풀리도록)
+    JOB_COALESCE_TTL: int = 3 * 3600
+    # 작업 스케줄러 (app/service/job_scheduler.py)
+    SCHED_MAX_RUNNING: int = 6            # 동시에 실행되는 작업 수 (전체)
+    SCHED_USER_MAX_RUNNING: int = 2       # 사용자별 동시 실행 작업 수
+    SCHED_RUNNING_TTL: int = 4 * 3600     # 종료 신호 없이 이 시간이 지나면 실행 슬롯 회수
+    SCHED_LIGHT_JOB_SEC: int = 180        # 예상 소요가 이 이하면 최우선
+    SCHED_HEAVY_JOB_SEC: int = 1200       # 이 초과면 최하위 우선순위
+    # 지표/오토스케일 (app/service/metrics.py, app/tasks/autoscale.py)
+    METRICS_TOKEN: str = ""               # 설정 시 /metrics 요청에 Bearer 토큰 필요
+    WORKER_METRICS_PORT: int = 0          # 워커에서도 /metrics 제공 (0이면 끔)
+    AUTOSCALE_TARGET_DRAIN_SEC: int = 300 # 밀린 작업을 이 시간 안에 처리할 만큼 프로세스 확장
+    AUTOSCALE_MAX_CONCURRENCY: int = 16   # /metrics 권장치 상한 (워커는 --autoscale 최댓값 사용)
+    AUTOSCALE_MAX_RSS_BYTES: int = 0      # 워커 컨테이너 메모리 예산 (0이면 제한 없음)
     
+    # 퀴즈 채점 (app/util/grading.py): 단답형 비교 시 제출 답안의 어절 끝 조사 무시 (선택)
+    GRADING_STRIP_KOREAN_PARTICLES: bool = False
+    # 퀴즈 상세 응답 캐시 (app/service/quiz_detail_cache.py)
+    QUIZ_DETAIL_CACHE_TTL: int = 24 * 3600
+    # 작업 상태 푸시 (app/service/task_events.py): SSE 연결 유지 주기, long-poll 최대 대기 시간(초)
+    TASK_EVENTS_KEEPALIVE_SEC: int = 15
+    TASK_LONGPOLL_TIMEOUT_SEC: int = 25
+    # SSE(EventSource)는 헤더를 못 보내므로 쿼리로 받는 작업 한정 토큰의 유효 시간(초, 연결 시점에만 검사)
+    TASK_EVENTS_TOKEN_EXPIRE_SEC: int = 60
+    # 작업을 요청/합류한 사용자 기록 유지 시간(초, 이 사용자만 상태 구독 가능)
+    TASK_OWNER_TTL: int = 24 * 3600
+    # 작업 상태 조회 결과를 프로세스 메모리에 두는 시간(초, app/service/task_status.py)
+    TASK_STATUS_CACHE_TTL: float = 1.0
+
     # OPENAI API
     OPENAI_API_KEY: str
     
     # CANVAS
     CANVAS_LOGIN_URL: str
+    CANVAS_SESSION_TTL: int = 1800          # 세션 쿠키 캐시 유지 시간(초)
+    CANVAS_SESSION_PROBE_INTERVAL: int = 300  # 마지막 유효성 확인 후 재확인 없이 신뢰하는 시간(초)
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,162 @@
+# app/core/logging.py
+"""
+구조화 로깅 (표준 logging 기반)
+
+    from app.core.logging import get_logger
+    logger = get_logger(__name__)
+    logger.debug("퀴즈 조회", quiz_id=quiz.quiz_id, questions=len(quiz.questions))
+
+- 키워드 인자는 메시지에 섞지 않고 필드로 남긴다 (LOG_FORMAT=json이면 JSON 한 줄)
+- 레벨이 꺼져 있으면 필드 가공/문자열 포맷을 하지 않는다. 계산이 무거운 값은 lazy(lambda: ...)로 감싸면
+  실제로 출력될 때만 계산된다.
+- LOG_LEVELS="app.repository=DEBUG,app.auth=WARNING" 처럼 모듈(로거 이름 접두어)별 레벨 지정
+- LOG_SAMPLE_RATES="app.auth=0.01" 처럼 DEBUG 이하 로그를 모듈별 비율만 남김 (INFO 이상은 항상 출력)
+"""
+import json
+import logging
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+_RESERVED_KWARGS = {"exc_info", "stack_info", "stacklevel", "extra"}
+_HANDLER_NAME = "ecampus"
+
+
+class lazy:
+    """출력될 때만 계산되는 필드 값"""
+
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self.fn = fn
+
+    def __call__(self) -> Any:
+        return self.fn()
+
+    def __str__(self) -> str:
+        return str(self.fn())
+
+
+def _resolve(value: Any) -> Any:
+    return value() if isinstance(value, lazy) else value
+
+
+class StructLogger(logging.LoggerAdapter):
+    """키워드 인자를 record.fields로 넘기는 어댑터 (bind로 공통 필드 고정)"""
+
+    def process(self, msg, kwargs):
+        fields = dict(self.extra or {})
+        for key in [k for k in kwargs if k not in _RESERVED_KWARGS]:
+            fields[key] = kwargs.pop(key)
+        extra = dict(kwargs.get("extra") or {})
+        extra["fields"] = fields
+        kwargs["extra"] = extra
+        return msg, kwargs
+
+    def bind(self, **fields) -> "StructLogger":
+        return StructLogger(self.logger, {**(self.extra or {}), **fields})
+
+
+def get_logger(name: str, **fields) -> StructLogger:
+    return StructLogger(logging.getLogger(name), fields)
+
+
+# ---------- 설정 파싱 ----------
+def _parse_overrides(raw: str, cast: Callable[[str], Any]) -> Dict[str, Any]:
+    """"a.b=DEBUG, c=INFO" → {"a.b": "DEBUG", "c": "INFO"} (잘못된 항목은 무시)"""
+    result = {}
+    for item in (raw or "").split(","):
+        name, sep, value = item.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            result[name.strip()] = cast(value.strip())
+        except ValueError:
+            print(f"⚠️ 로그 설정 무시: {item.strip()}")
+    return result
+
+
+def _level(value: str) -> int:
+    level = logging.getLevelName(value.upper())
+    if not isinstance(level, int):
+        raise ValueError(value)
+    return level
+
+
+# ---------- 필터/포맷터 ----------
+class SamplingFilter(logging.Filter):
+    """DEBUG 이하 레코드를 로거 이름 접두어별 비율로만 통과시킴"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # 긴 접두어가 먼저 매칭되도록
+        self.rates = sorted(rates.items(), key=lambda kv: len(kv[0]), reverse=True)
+
+    def _rate(self, name: str) -> Optional[float]:
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or not self.rates:
+            return True
+        rate = self._rate(record.name)
+        return rate is None or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in getattr(record, "fields", {}).items():
+            entry[key] = _resolve(value)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={_resolve(v)}" for k, v in fields.items())
+        return line
+
+
+def setup_logging(keep_handlers: bool = False) -> None:
+    """
+    프로세스 시작 시 한 번 호출 (API: app/main.py, 워커: celery after_setup_logger).
+    keep_handlers=True면 이미 설정된 핸들러와 루트 레벨(Celery -l)을 유지하고 모듈별 레벨/샘플링만 적용한다.
+    """
+    root = logging.getLogger()
+    sampler = SamplingFilter(_parse_overrides(settings.LOG_SAMPLE_RATES, float))
+
+    if not keep_handlers:
+        for handler in [h for h in root.handlers if h.get_name() == _HANDLER_NAME]:
+            root.removeHandler(handler)
+        handler = logging.StreamHandler(sys.stdout)
+        handler.set_name(_HANDLER_NAME)
+        handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+        root.addHandler(handler)
+
+    for handler in root.handlers:
+        for old in [f for f in handler.filters if isinstance(f, SamplingFilter)]:
+            handler.removeFilter(old)
+        handler.addFilter(sampler)
+
+    if not keep_handlers:
+        root.setLevel(_level(settings.LOG_LEVEL))
+    for name, level in _parse_overrides(settings.LOG_LEVELS, _level).items():
+        logging.getLogger(name).setLevel(level)
@@ -0,0 +1,34 @@
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+# 프로세스 단위로 커넥션 풀을 하나만 유지 (API / Celery 워커 공용)
+_sync_pool: redis.ConnectionPool | None = None
+_async_pool: aioredis.ConnectionPool | None = None
+
+
+def get_redis() -> redis.Redis:
+    """동기 Redis 클라이언트 (Celery 작업, Selenium 스레드 등에서 사용)"""
+    global _sync_pool
+    if _sync_pool is None:
+        _sync_pool = redis.ConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=0,
+            decode_responses=True,
+        )
+    return redis.Redis(connection_pool=_sync_pool)
+
+
+def get_async_redis() -> aioredis.Redis:
+    """비동기 Redis 클라이언트 (API 이벤트 루프에서 사용: 작업 상태 pub/sub 등)"""
+    global _async_pool
+    if _async_pool is None:
+        _async_pool = aioredis.ConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=0,
+            decode_responses=True,
+        )
+    return aioredis.Redis(connection_pool=_async_pool)
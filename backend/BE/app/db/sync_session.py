@@ -0,0 +1,135 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+
+
+# Celery 워커(동기) 전용 DB 레이어
+# 워커 프로세스마다 엔진/커넥션 풀을 하나만 만들고 작업 간에 재사용한다.
+# (worker_process_init에서 생성, worker_process_shutdown에서 정리 - app/celery_config.py)
+
+
+@dataclass
+class PoolMetrics:
+    checkouts: int = 0
+    checkins: int = 0
+    connects: int = 0
+    invalidations: int = 0
+    wait_count: int = 0
+    wait_total_sec: float = 0.0
+    wait_max_sec: float = 0.0
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_sec += seconds
+            self.wait_max_sec = max(self.wait_max_sec, seconds)
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = asdict(self)
+        data["wait_avg_sec"] = data["wait_total_sec"] / data["wait_count"] if data["wait_count"] else 0.0
+        if _engine is not None:
+            pool = _engine.pool
+            data.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """풀에서 커넥션을 얻기까지 걸린 시간(대기 시간)을 기록하는 QueuePool"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - started)
+
+
+_engine: Optional[Engine] = None
+SyncSessionLocal = sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+def _sync_database_url() -> str:
+    return settings.DATABASE_URL.replace("postgresql+asyncpg", "postgresql")
+
+
+def _attach_pool_events(engine: Engine) -> None:
+    event.listen(engine, "connect", lambda *_: pool_metrics.incr("connects"))
+    event.listen(engine, "checkout", lambda *_: pool_metrics.incr("checkouts"))
+    event.listen(engine, "checkin", lambda *_: pool_metrics.incr("checkins"))
+    event.listen(engine, "invalidate", lambda *_: pool_metrics.incr("invalidations"))
+
+
+def init_engine() -> Engine:
+    """워커 프로세스 시작 시 호출. fork 이전에 만들어진 엔진이 있으면 커넥션을 공유하지 않도록 버림"""
+    global _engine
+    if _engine is not None:
+        _engine.dispose(close=False)
+
+    _engine = create_engine(
+        _sync_database_url(),
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.WORKER_DB_POOL_SIZE,
+        max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+        pool_timeout=settings.WORKER_DB_POOL_TIMEOUT,
+        pool_recycle=settings.WORKER_DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    _attach_pool_events(_engine)
+    SyncSessionLocal.configure(bind=_engine)
+    print(f"🗄️ 워커 DB 풀 초기화 (size={settings.WORKER_DB_POOL_SIZE}, overflow={settings.WORKER_DB_MAX_OVERFLOW})")
+    return _engine
+
+
+def dispose_engine() -> None:
+    """워커 프로세스 종료 시 커넥션 반환"""
+    global _engine
+    if _engine is None:
+        return
+    print(f"🗄️ 워커 DB 풀 종료: {pool_metrics.snapshot()}")
+    _engine.dispose()
+    _engine = None
+
+
+def get_engine() -> Engine:
+    return _engine if _engine is not None else init_engine()
+
+
+@contextmanager
+def task_session() -> Iterator[Session]:
+    """
+    Celery 작업용 동기 세션.
+    예외가 밖으로 전파되면 rollback, 항상 close 하여 커넥션을 풀에 반환한다.
+    """
+    get_engine()
+    db = SyncSessionLocal()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
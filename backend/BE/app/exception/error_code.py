@@ -29,6 +29,7 @@ class Error:
     QUIZ_INTERNAL_ERROR = ErrorCode("QUIZ-002", "퀴즈 저장이 실패했습니다.")
     QUIZ_CREATION_FAILED = ErrorCode("QUIZ-003", "퀴즈 생성에 실패했습니다.")
     QUIZ_INVALID_REQUEST = ErrorCode("QUIZ-004", "잘못된 퀴즈 요청입니다.")
+    QUIZ_INVALID_CURSOR = ErrorCode("QUIZ-005", "유효하지 않은 목록 커서입니다.")
     
     # File
     FILE_NOT_FOUND = ErrorCode("FILE-001", "파일을 찾을 수 없습니다.")
@@ -53,6 +54,10 @@ class Error:
     DB_QUERY_ERROR = ErrorCode("DB-002", "데이터베이스 쿼리 실행에 실패했습니다.")
     DB_COMMIT_ERROR = ErrorCode("DB-003", "데이터베이스 커밋에 실패했습니다.")
     
+    # Job (노트/퀴즈 생성 작업)
+    JOB_NOT_FOUND = ErrorCode("JOB-001", "해당 작업을 찾을 수 없습니다.")
+    JOB_NOT_RETRYABLE = ErrorCode("JOB-002", "실패한 작업만 다시 시도할 수 있습니다.")
+    
     # User
     USER_NOT_FOUND = ErrorCode("USER-001", "사용자를 찾을 수 없습니다.")
     
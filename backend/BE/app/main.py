@@ -1,19 +1,27 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.api.main import api_router
 from app.core.config import settings
+from app.core.logging import setup_logging
 from app.db.session import init_db
+from app.service.metrics import metrics
+from app.util.upload import UploadSizeLimitMiddleware
 from app.exception.custom_exceptions import APIException
+from app.exception.error_code import Error
 from app.exception.exception_handler import (
     api_exception_handler,
     general_exception_handler,
     sqlalchemy_exception_handler,
 )
 
+setup_logging()
+
 
 # lifespan 정의
 # 앱 시작 전 한번만 실행
@@ -32,6 +40,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# 업로드 크기 제한: 본문을 받기 전에 Content-Length로 거절 (CORS보다 안쪽에 둬서 413에도 CORS 헤더가 붙도록)
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # cors 설정: 다른 도메인에서 API 호출 허용
 app.add_middleware(
         CORSMiddleware,
@@ -58,6 +69,15 @@ def root():
         "docs": "/docs"
     }
 
+
+# 내부 지표 (Prometheus 텍스트 형식, 워커에서 기록한 값 포함)
+@app.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+async def prometheus_metrics(authorization: str | None = Header(default=None)):
+    if settings.METRICS_TOKEN and authorization != f"Bearer {settings.METRICS_TOKEN}":
+        raise APIException(401, Error.AUTH_INVALID_TOKEN)
+    body = await run_in_threadpool(metrics.render)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # 예외처리 핸들러 등록
 app.add_exception_handler(APIException, api_exception_handler)
 app.add_exception_handler(SQLAlchemyError, sqlalchemy_exception_handler)
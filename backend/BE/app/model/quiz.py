@@ -4,9 +4,11 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     func,
+    text,
 )
 from sqlalchemy.orm import relationship
 
@@ -16,6 +18,10 @@ from app.util.datetime_utils import now_kst
 
 class Quiz(Base):
     __tablename__ = "quiz"
+    __table_args__ = (
+        # 저장된 퀴즈 목록 (키셋 페이지네이션) 조회용
+        Index("ix_quiz_user_id_is_saved_created_at", "user_id", "is_saved", text("created_at DESC")),
+    )
 
     quiz_id = Column(BigInteger, primary_key=True, index=True)
     user_id = Column(BigInteger, ForeignKey("user.user_id"), nullable=False)
@@ -1,29 +1,76 @@
 import json
-from typing import Any, Dict, List, Optional
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import desc, update
+from sqlalchemy import BigInteger, Boolean, Row, String, column, desc, insert, tuple_, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.logging import get_logger
 from app.model.question import Question
 from app.model.quiz import Quiz
 from app.schema.quiz import QuizSubmitItem
+from app.util.grading import GradedAnswer, GradedSubmission, grade_submission
+
+logger = get_logger(__name__)
 
 
 class QuizRepository:
 
-    # 유저의 저장된 퀴즈 목록 조회
-    async def get_quizzes(self, db: AsyncSession, user_id: int) -> List[Quiz]:
-        result = await db.execute(
-            select(Quiz)
+    # 문제 dict 목록 → question 테이블 다중 행 INSERT용 row 목록 (파일/URL/Celery 공통)
+    @staticmethod
+    def build_question_rows(quiz_id: int, questions: List[dict]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "quiz_id": quiz_id,
+                "question_number": q.get("questionNumber", i + 1),
+                "question_text": q["questionText"],
+                "question_type": q["questionType"],
+                "choices": q.get("choices", []),
+                "correct_answer": str(q["correctAnswer"]),
+                "explanation": q.get("explanation", ""),
+            }
+            for i, q in enumerate(questions)
+        ]
+
+    # 문제 일괄 저장: INSERT ... VALUES (...), (...) RETURNING 한 번으로 처리
+    # 반환: {question_number: question_id}
+    @staticmethod
+    def bulk_insert_questions_stmt(quiz_id: int, questions: List[dict]):
+        rows = QuizRepository.build_question_rows(quiz_id, questions)
+        return (
+            insert(Question)
+            .values(rows)
+            .returning(Question.question_number, Question.question_id)
+        )
+
+    # 유저의 저장된 퀴즈 목록 조회 (키셋 페이지네이션)
+    # 목록에 필요한 컬럼만 조회하고, (created_at, quiz_id) < 커서 조건으로 다음 페이지를 이어 받는다.
+    # limit + 1개를 읽어 다음 페이지 존재 여부를 판단 → 반환: (행 목록, 다음 페이지 여부)
+    async def get_quizzes(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> Tuple[List[Row], bool]:
+        stmt = (
+            select(Quiz.quiz_id, Quiz.title, Quiz.is_saved, Quiz.created_at)
             .where(
                 Quiz.user_id == user_id,
-                   Quiz.is_saved == True)
-            .order_by(desc(Quiz.created_at))  # 최신순 정렬
-            )
-        return result.scalars().all()
-    
+                Quiz.is_saved == True)
+            .order_by(desc(Quiz.created_at), desc(Quiz.quiz_id))  # 최신순 정렬
+            .limit(limit + 1)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Quiz.created_at, Quiz.quiz_id) < tuple_(*after))
+
+        rows = (await db.execute(stmt)).all()
+        return rows[:limit], len(rows) > limit
+
     # 저장된 퀴즈 내용 상세 조회
     async def get_quiz_by_id(self, db: AsyncSession, quiz_id: int) -> Quiz | None:
 
@@ -35,30 +82,30 @@ class QuizRepository:
         )
         quiz = result.scalar_one_or_none()  # 하나 or None
         if not quiz:
-            print(f"⚠️ Quiz not found: quiz_id={quiz_id}")
+            logger.debug("퀴즈 없음", quiz_id=quiz_id)
             return None
 
-        print(f"✅ Quiz found!")
-        print(f"   - quiz_id: {quiz.quiz_id}")
-        print(f"   - title: {quiz.title}")
-        print(f"   - is_saved: {quiz.is_saved}")
-        print(f"   - total_questions: {quiz.total_questions}")
-        print(f"   - correct_number: {quiz.correct_number}")
-        print(f"   - created_at: {quiz.created_at}")
-        print(f"   - questions loaded: {len(quiz.questions) if quiz.questions else 0}")
-        
-        # questions 상세 확인
-        if quiz.questions:
-            print(f"\n📋 Questions detail:")
+        logger.debug(
+            "퀴즈 조회",
+            quiz_id=quiz.quiz_id,
+            is_saved=quiz.is_saved,
+            total_questions=quiz.total_questions,
+            correct_number=quiz.correct_number,
+            questions=len(quiz.questions),
+        )
+        # 문항별 상세는 DEBUG가 켜진 경우에만 순회
+        if logger.isEnabledFor(logging.DEBUG):
             for q in quiz.questions:
-                print(f"   Q{q.question_number}: type={q.question_type}, "
-                      f"correct={q.correct_answer}, user={q.user_answer}, "
-                      f"is_correct={q.is_correct}")
-                print(f"      choices: {q.choices}")
-                print(f"      explanation: {q.explanation}")
-        else:
-            print(f"⚠️ No questions found for quiz_id={quiz_id}")
-            
+                logger.debug(
+                    "문항",
+                    quiz_id=quiz.quiz_id,
+                    number=q.question_number,
+                    type=q.question_type,
+                    correct=q.correct_answer,
+                    user=q.user_answer,
+                    is_correct=q.is_correct,
+                )
+
         # 질문 목록 조회
         if quiz.questions:
             quiz.questions.sort(key=lambda q: q.question_number)
@@ -88,54 +135,29 @@ class QuizRepository:
             db.add(new_quiz)
             await db.flush() # 변경 사항 반영 but 커밋x
             
-            # question 생성
-            for q in questions:
-                explanation_value = q.get("explanation")
-                print(f"   - explanation: {explanation_value} (type: {type(explanation_value)})")
-                
-                question = Question(
-                    quiz_id = new_quiz.quiz_id,
-                    question_number=q["questionNumber"],
-                    question_text=q["questionText"],
-                    question_type=q["questionType"],
-                    choices=q.get("choices", []),
-                    correct_answer=str(q["correctAnswer"]),
-                    explanation=q.get("explanation", "")
+            # question 일괄 생성 (행마다 ORM 객체를 만들지 않음)
+            if questions:
+                result = await db.execute(
+                    self.bulk_insert_questions_stmt(new_quiz.quiz_id, questions)
                 )
-                db.add(question)
+                question_ids = dict(result.all())
+                logger.debug("문제 일괄 저장", quiz_id=new_quiz.quiz_id, questions=len(question_ids))
 
             await db.commit()
-            await db.refresh(new_quiz)
 
-            print("🔸 db.commit() 호출...")
-            await db.commit()
-            
-            print("🔸 db.refresh() 호출...")
-            await db.refresh(new_quiz)
-            
-            print(f"✅ Quiz 저장 완료! ID: {new_quiz.quiz_id}")
+            logger.debug("퀴즈 저장 완료", quiz_id=new_quiz.quiz_id)
             return new_quiz
 
         except Exception as e:
             await db.rollback()
-            print("=" * 60)
-            print(f"🔥 ERROR in create_quiz")
-            print(f"🔥 Error Type: {type(e).__name__}")
-            print(f"🔥 Error Message: {str(e)}")
-            print(f"🔥 Error repr: {repr(e)}")
-            
-            # SQLAlchemy 에러인 경우 더 자세한 정보
-            if hasattr(e, 'orig'):
-                print(f"🔥 Original Error: {e.orig}")
-            if hasattr(e, 'params'):
-                print(f"🔥 Params: {e.params}")
-            if hasattr(e, 'statement'):
-                print(f"🔥 Statement: {e.statement}")
-            
-            import traceback
-            print("📚 Full Traceback:")
-            print(traceback.format_exc())
-            print("=" * 60)
+            # SQLAlchemy 에러인 경우 원본 에러/SQL도 함께 남김
+            logger.exception(
+                "create_quiz 실패",
+                user_id=user_id,
+                error=type(e).__name__,
+                orig=getattr(e, "orig", None),
+                statement=getattr(e, "statement", None),
+            )
             raise   
     
     # 예상 문제 생성(파일용)
@@ -201,80 +223,66 @@ class QuizRepository:
             print(traceback.format_exc())
             raise e
 
+    # 채점 결과 일괄 반영: UPDATE question SET ... FROM (VALUES (...), (...)) 한 번으로 처리
+    @staticmethod
+    def bulk_grade_stmt(graded_answers: List[GradedAnswer]):
+        graded = values(
+            column("question_id", BigInteger),
+            column("user_answer", String(500)),
+            column("is_correct", Boolean),
+            name="graded",
+        ).data([(g.question_id, g.user_answer, g.is_correct) for g in graded_answers])
+        return (
+            update(Question)
+            .where(Question.question_id == graded.c.question_id)
+            .values(user_answer=graded.c.user_answer, is_correct=graded.c.is_correct)
+            .execution_options(synchronize_session=False)
+        )
+
     # 예상 문제 정답 제출(사용자 답안)
+    # 문제 전체 조회 1번 → 채점 엔진(app/util/grading.py)으로 한 번에 채점
+    # → 답안/정답 여부 일괄 UPDATE 1번 + 맞춘 개수 UPDATE 1번 (한 트랜잭션)
+    # 반환: (번호순 문제 목록, 채점 결과) — 서비스는 다시 채점하지 않는다
     async def submit_quiz(
             self,
             db: AsyncSession,
             quiz_id: int,
             answers: List[QuizSubmitItem]
-    ) -> List[Question]:
+    ) -> Tuple[List[Question], GradedSubmission]:
         
         try:
-            for answer in answers:
-                question_number = answer.question_number
-                user_answer = answer.answer
-                
-                stmt = select(Question).where(
-                    Question.quiz_id == quiz_id,
-                    Question.question_number == question_number
-                )
+            result = await db.execute(
+                select(Question)
+                .where(Question.quiz_id == quiz_id)
+                .order_by(Question.question_number)
+            )
+            questions = result.scalars().all()
 
-                result = await db.execute(stmt)
-                question = result.scalar_one_or_none()
-                
-                if question:
-                    # question.user_answer = str(user_answer)
-                
-                    # 정답 여부
-                    if question.question_type == "MULTIPLE":
-                        # 객관식(숫자 비교)
-                        question.is_correct = (
-                            str(user_answer).strip() == str(question.correct_answer)
-                        )
-                        
-                    else:
-                        # 단답형
-                        question.is_correct = (
-                            str(user_answer).strip().lower() ==
-                            str(question.correct_answer).strip().lower()
-                        )
+            graded = grade_submission(questions, {a.question_number: a.answer for a in answers})
+            logger.debug("채점 완료", quiz_id=quiz_id, correct=graded.correct_number, total=graded.total)
 
-            # 정답 갯수
-            correct_count_result = await db.execute(
-                select(Question).where(
-                    Question.quiz_id == quiz_id,
-                    Question.is_correct == True
-                )
+            if graded.answers:
+                await db.execute(self.bulk_grade_stmt(graded.answers))
+            await db.execute(
+                update(Quiz)
+                .where(Quiz.quiz_id == quiz_id)
+                .values(correct_number=graded.correct_number)
             )
-            
-            correct_count = len(correct_count_result.scalars().all())
-            
-            print(f"✅ 정답 개수: {correct_count}")
-            
-            stmt = update(Quiz).where(
-                Quiz.quiz_id == quiz_id
-            ).values(
-                correct_number = correct_count
-            )
-            
-            await db.execute(stmt)
             await db.commit()
-            
-            update_result = await db.execute(
-                    select(Question)
-                    .where(Question.quiz_id == quiz_id)
-                    .order_by(Question.question_number)
-                )
-            questions = update_result.scalars().all()
-            return questions
+
+            # 이미 불러온 객체에 반영 (변경 추적 없이 → 다시 flush/조회하지 않음)
+            for q, g in zip(questions, graded.answers):
+                set_committed_value(q, "user_answer", g.user_answer)
+                set_committed_value(q, "is_correct", g.is_correct)
+            return questions, graded
 
         except Exception as e:
             await db.rollback()
-            print("=" * 60)
-            print("🔥 Repository Error in submit_quiz")
-            print(f"   Error Type: {type(e).__name__}")
-            print(f"   Error Message: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            print("=" * 60)
-            raise 
+            logger.exception(
+                "submit_quiz 실패",
+                quiz_id=quiz_id,
+                error=type(e).__name__,
+                orig=getattr(e, "orig", None),
+                statement=getattr(e, "statement", None),
+            )
+            raise
@@ -0,0 +1,42 @@
+from typing import Optional
+
+from app.util.base import CamelCaseModel
+
+
+# 생성 작업 사전 추정치 (app/service/job_estimator.py)
+class JobEstimateResponse(CamelCaseModel):
+    kind: str
+    wall_clock_sec: float
+    input_tokens: int
+    output_tokens: int
+    disk_bytes: int
+    pages: Optional[int] = None
+    duration_sec: Optional[float] = None
+    source: str
+
+    @classmethod
+    def from_estimate(cls, estimate: Optional[dict]) -> Optional["JobEstimateResponse"]:
+        if not estimate:
+            return None
+        return cls(**{k: estimate.get(k) for k in cls.model_fields if k in estimate})
+
+
+# 노트/퀴즈 생성 작업 상태 (app/service/task_status.py, 해당 없는 필드는 null)
+class TaskStatusResponse(CamelCaseModel):
+    status: str                                 # PROCESSING / COMPLETED / FAILED / UNKNOWN
+    progress: int = 0
+    message: Optional[str] = None
+    stage: Optional[str] = None
+    eta_seconds: Optional[int] = None
+    queue_position: Optional[int] = None        # 스케줄러 대기열에서 기다리는 중일 때만
+    error: Optional[str] = None
+    job_id: Optional[str] = None
+    pdf_url: Optional[str] = None               # 노트
+    quiz_id: Optional[int] = None               # 퀴즈
+    total_questions: Optional[int] = None       # 퀴즈
+
+
+# 작업 상태 SSE 구독 토큰 (GET .../events?token= 으로 전달)
+class TaskEventsTokenResponse(CamelCaseModel):
+    token: str
+    expires_in: int                             # 초
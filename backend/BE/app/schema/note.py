@@ -1,8 +1,9 @@
 
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+from app.schema.job import JobEstimateResponse
 from app.util.base import CamelCaseModel
 
 # 파일로 요약노트 생성
@@ -14,6 +15,7 @@ class FileSummaryResponse(CamelCaseModel):
     status: str
     pdf_url: str
     created_at: str
+    estimate: Optional[JobEstimateResponse] = None
 
 # url로 요약노트 생성
 class UrlSummaryRequest(CamelCaseModel):
@@ -24,6 +26,7 @@ class UrlSummaryResponse(CamelCaseModel):
     status: str
     pdf_url: str
     created_at:str
+    estimate: Optional[JobEstimateResponse] = None
 
 # 파일로 빈칸 채우기 노트 생성
 class FileFillBlankRequest(CamelCaseModel):
@@ -34,6 +37,7 @@ class FileFillBlankResponse(CamelCaseModel):
     status: str
     pdf_url: str
     created_at: str
+    estimate: Optional[JobEstimateResponse] = None
 
 # url로 빈칸 채우기 노트 생성
 class UrlFillBlankRequest(CamelCaseModel):
@@ -43,4 +47,12 @@ class UrlFillBlankResponse(CamelCaseModel):
     task_id: str
     status: str
     pdf_url: str
-    created_at: str
\ No newline at end of file
+    created_at: str
+    estimate: Optional[JobEstimateResponse] = None
+
+# 실패한 노트 생성 작업 재시도
+class NoteRetryResponse(CamelCaseModel):
+    task_id: str
+    job_id: str
+    status: str
+    attempts: int
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import List, Optional, Union
 
+from app.schema.job import JobEstimateResponse
 from app.util.base import CamelCaseModel
 
 
@@ -13,6 +14,7 @@ class QuizItem(CamelCaseModel):
 # 저장된 퀴즈 제목 리스트 응답 DTO
 class QuizListResponse(CamelCaseModel):
     data: List[QuizItem] = []
+    next_cursor: Optional[str] = None    # 다음 페이지 요청 시 cursor로 전달 (마지막 페이지면 null)
 
 # 저장된 퀴즈 제목 리스트
 class QuestionResponse(CamelCaseModel):
@@ -53,6 +55,7 @@ class QuizFileResponse(CamelCaseModel):
     total_questions: int
     created_at: str
     questions: List[QuestionItem]
+    estimate: Optional[JobEstimateResponse] = None
 
 # 예상 문제 정답 - url용
 class QuizUrlRequest(CamelCaseModel):
@@ -66,6 +69,14 @@ class QuizUrlResponse(CamelCaseModel):
     total_questions: int
     created_at: str
     questions: List[QuestionItem]
+    estimate: Optional[JobEstimateResponse] = None
+
+# 실패한 퀴즈 생성 작업 재시도
+class QuizRetryResponse(CamelCaseModel):
+    quiz_id: int
+    task_id: str
+    status: str
+    attempts: int
 
 # 예상 문제 정답 제출
 # request
@@ -7,6 +7,8 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 
+from app.service.canvas_session_cache import CanvasSession, canvas_session_cache
+
 
 class CanvasService:
     def __init__(self):
@@ -26,6 +28,35 @@ class CanvasService:
             chrome_options.add_argument("--hide-scrollbars")
         
         return webdriver.Chrome(options=chrome_options)
+
+    def _export_cookies(self, driver) -> list:
+        """SSO/Canvas 도메인 쿠키 전체 추출 (get_cookies는 현재 도메인만 반환)"""
+        try:
+            return driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        except Exception:
+            return driver.get_cookies()
+
+    def _restore_cookies(self, driver, cookies: list) -> None:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+
+    def _probe_session(self, driver, session: CanvasSession) -> bool:
+        """캐시된 쿠키로 Canvas에 접근해 로그인 페이지로 튕기지 않는지 확인"""
+        try:
+            self._restore_cookies(driver, session.cookies)
+            driver.get(self.canvas_url)
+            time.sleep(2)
+            current_url = driver.current_url.lower()
+            print(f"📍 세션 확인 URL: {current_url}")
+            return "khcanvas.khu.ac.kr" in current_url and "login" not in current_url
+        except Exception as e:
+            print(f"⚠️ 캐시 세션 확인 실패: {type(e).__name__}: {e}")
+            return False
+
+    def _remember_session(self, driver, username: str, password: str) -> None:
+        cookies = self._export_cookies(driver)
+        if canvas_session_cache.save(username, cookies, password=password):
+            print(f"💾 Canvas 세션 캐시 저장 ({len(cookies)}개 쿠키)")
     
     def verify_canvas_login(self, username: str, password: str) -> bool:
         """
@@ -41,7 +72,26 @@ class CanvasService:
         driver = None
         try:
             print(f"🔍 Canvas 로그인 검증 시작 (사용자: {username})")
+
+            # 0. 같은 자격 증명으로 최근 로그인한 세션이 있으면 재사용
+            cached = canvas_session_cache.load(username)
+            if cached and not canvas_session_cache.matches_credentials(cached, username, password):
+                cached = None
+
+            if cached and not cached.needs_probe:
+                print("⚡ 최근 검증된 Canvas 세션 캐시 사용")
+                return True
+
             driver = self._create_driver(headless=True)
+
+            if cached:
+                if self._probe_session(driver, cached):
+                    canvas_session_cache.mark_probed(username, cached)
+                    print("✅ 캐시된 Canvas 세션 유효 - 로그인 생략")
+                    return True
+                print("♻️ 캐시된 세션 만료 - 다시 로그인")
+                canvas_session_cache.invalidate(username)
+                driver.delete_all_cookies()
             
             # 1. 로그인 페이지 접속
             full_login_url = (
@@ -119,6 +169,7 @@ class CanvasService:
             # 성공 판단
             if any(success_indicators) and not any(failure_indicators):
                 print("✅ Canvas 로그인 성공!")
+                self._remember_session(driver, username, password)
                 return True
             
             if any(failure_indicators):
@@ -131,6 +182,7 @@ class CanvasService:
             
             if session_cookies:
                 print(f"✅ 세션 쿠키 발견 ({len(session_cookies)}개) - 로그인 성공!")
+                self._remember_session(driver, username, password)
                 return True
             
             print("❌ Canvas 로그인 실패 - 성공 지표를 찾을 수 없음")
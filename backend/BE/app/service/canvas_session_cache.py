@@ -0,0 +1,158 @@
+# app/service/canvas_session_cache.py
+import hashlib
+import hmac
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+import redis
+from cryptography.fernet import InvalidToken
+
+from app.core.config import settings
+from app.db.redis import get_redis
+
+KEY_PREFIX = "canvas:session:"
+
+
+@dataclass
+class CanvasSession:
+    cookies: List[dict]                  # CDP(Network.getAllCookies) 형식 쿠키 목록
+    saved_at: float
+    last_probe_at: float
+    cred_fp: Optional[str] = None        # 로그인에 사용된 자격 증명 지문(HMAC)
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def needs_probe(self) -> bool:
+        """마지막 유효성 확인 이후 일정 시간이 지나면 다시 확인해야 함"""
+        return time.time() - self.last_probe_at > settings.CANVAS_SESSION_PROBE_INTERVAL
+
+
+class CanvasSessionCache:
+    """
+    Canvas SSO 로그인 세션 쿠키를 사용자별로 암호화해 Redis에 보관한다.
+    캐시는 보조 수단이므로 Redis 장애 시에도 예외를 던지지 않고 None/False를 반환한다.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = get_redis()
+        return self._client
+
+    # ---------- 키/지문 ----------
+    def _key(self, username: str) -> str:
+        digest = hashlib.sha256(username.encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}{digest}"
+
+    @staticmethod
+    def credential_fingerprint(username: str, password: str) -> str:
+        return hmac.new(
+            settings.ENCRYPT_KEY.encode("utf-8"),
+            f"{username}\x00{password}".encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+
+    def matches_credentials(self, session: CanvasSession, username: str, password: str) -> bool:
+        if not session.cred_fp:
+            return False
+        return hmac.compare_digest(
+            session.cred_fp, self.credential_fingerprint(username, password)
+        )
+
+    # ---------- 조회/저장 ----------
+    def load(self, username: str) -> Optional[CanvasSession]:
+        try:
+            token = self.client.get(self._key(username))
+            if not token:
+                return None
+            raw = settings.fernet.decrypt(token.encode(), ttl=settings.CANVAS_SESSION_TTL)
+            data = json.loads(raw)
+            session = CanvasSession(**data)
+            if not session.cookies:
+                return None
+            return session
+        except (redis.RedisError, InvalidToken, ValueError, TypeError) as e:
+            print(f"⚠️ Canvas 세션 캐시 조회 실패: {type(e).__name__}: {e}")
+            return None
+
+    def save(
+        self,
+        username: str,
+        cookies: List[dict],
+        password: Optional[str] = None,
+        probed: bool = True,
+    ) -> bool:
+        if not cookies:
+            return False
+
+        now = time.time()
+        previous = self.load(username)
+        cred_fp = (
+            self.credential_fingerprint(username, password)
+            if password
+            else (previous.cred_fp if previous else None)
+        )
+        session = CanvasSession(
+            cookies=cookies,
+            saved_at=now,
+            last_probe_at=now if probed else (previous.last_probe_at if previous else 0.0),
+            cred_fp=cred_fp,
+        )
+        return self._write(username, session, keep_ttl=False)
+
+    def mark_probed(self, username: str, session: CanvasSession) -> bool:
+        """유효성 확인 시각만 갱신 (만료 시각은 유지)"""
+        session.last_probe_at = time.time()
+        return self._write(username, session, keep_ttl=True)
+
+    def invalidate(self, username: str) -> None:
+        try:
+            self.client.delete(self._key(username))
+        except redis.RedisError as e:
+            print(f"⚠️ Canvas 세션 캐시 삭제 실패: {e}")
+
+    def _write(self, username: str, session: CanvasSession, keep_ttl: bool) -> bool:
+        token = settings.fernet.encrypt(json.dumps(asdict(session)).encode()).decode()
+        try:
+            if keep_ttl:
+                self.client.set(self._key(username), token, keepttl=True, xx=True)
+            else:
+                self.client.set(self._key(username), token, ex=settings.CANVAS_SESSION_TTL)
+            return True
+        except redis.RedisError as e:
+            print(f"⚠️ Canvas 세션 캐시 저장 실패: {e}")
+            return False
+
+    # ---------- 다운로드 스크립트(subprocess) 연동 ----------
+    def export_for_subprocess(self, username: str) -> Optional[str]:
+        """스크립트에 환경변수(CANVAS_COOKIES)로 넘길 쿠키 JSON"""
+        session = self.load(username)
+        if not session:
+            return None
+        return json.dumps(session.cookies)
+
+    def import_from_file(self, username: str, path: str, password: Optional[str] = None) -> bool:
+        """스크립트가 CANVAS_COOKIES_OUT 경로에 남긴 쿠키를 캐시에 반영하고 파일은 삭제"""
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cookies = json.load(f)
+            return self.save(username, cookies, password=password)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Canvas 쿠키 파일 읽기 실패: {e}")
+            return False
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+canvas_session_cache = CanvasSessionCache()
@@ -0,0 +1,171 @@
+# app/service/job_coalescer.py
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+import redis
+from celery.utils import uuid
+
+from app.core.config import settings
+from app.db.redis import get_redis
+
+KEY_PREFIX = "job:coalesce:"
+_JOIN_ATTEMPTS = 3
+
+
+@dataclass
+class CoalesceTicket:
+    task_id: str                 # 상태 조회용 대표 task_id (리더/대기자 공통)
+    is_leader: bool              # True면 호출자가 파이프라인을 시작해야 함
+    leader_files: List[str] = field(default_factory=list)
+
+    def discard_duplicate_inputs(self, files: Optional[List[str]]) -> None:
+        """대기자가 올린 업로드 중 리더 작업이 쓰지 않는 파일만 삭제 (같은 경로면 리더 입력이므로 유지)"""
+        for path in files or []:
+            if path in self.leader_files:
+                continue
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                print(f"⚠️ 중복 업로드 정리 실패: {os.path.basename(path)}: {e}")
+
+
+class JobCoalescer:
+    """
+    같은 입력(파일 내용/URL) + 같은 모드/옵션으로 동시에 들어온 생성 요청을 하나의 작업으로 합친다.
+
+    - job:coalesce:{digest}          → 진행 중인 작업의 대표 task_id/입력 파일 (SET NX, 리더만 성공)
+    - job:coalesce:{digest}:waiters  → 뒤늦게 합류한 요청 목록 (user_id, quiz_id 등)
+
+    리더 작업이 끝나면(성공/실패) release()가 키를 지우고 대기자 목록을 돌려주며,
+    대기자는 같은 task_id로 상태를 조회하거나 (퀴즈의 경우) finalize에서 결과를 복사받는다.
+    Redis 장애 시에는 합치지 않고 항상 새 작업을 시작한다.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = get_redis()
+        return self._client
+
+    # ---------- 키 ----------
+    @staticmethod
+    def digest_hashes(file_digests: Iterable[str]) -> str:
+        """파일별 SHA-256 → 입력 전체 해시 (병합 순서가 결과에 영향을 주므로 순서 유지)"""
+        return hashlib.sha256("\x00".join(file_digests).encode("ascii")).hexdigest()
+
+    @staticmethod
+    def digest_files(paths: Iterable[str]) -> str:
+        """업로드 파일 내용 해시 (업로드 시 계산한 해시가 없을 때만 파일을 다시 읽음)"""
+        file_digests = []
+        for path in paths:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(block)
+            file_digests.append(h.hexdigest())
+        return JobCoalescer.digest_hashes(file_digests)
+
+    @staticmethod
+    def digest_url(url: str) -> str:
+        return hashlib.sha256(url.strip().encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(kind: str, content_digest: str, **options) -> str:
+        opts = json.dumps(options, sort_keys=True)
+        digest = hashlib.sha256(f"{kind}\x00{content_digest}\x00{opts}".encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}{digest}"
+
+    @staticmethod
+    def _waiters_key(key: str) -> str:
+        return f"{key}:waiters"
+
+    # ---------- 합류 / 해제 ----------
+    def join(self, key: str, waiter: dict, files: Optional[List[str]] = None) -> CoalesceTicket:
+        """
+        진행 중인 작업이 있으면 대기자로 등록하고 그 task_id를, 없으면 새 task_id로 리더가 된다.
+        files: 리더가 될 경우 파이프라인 입력으로 쓸 업로드 경로
+        """
+        waiters_key = self._waiters_key(key)
+        try:
+            for _ in range(_JOIN_ATTEMPTS):
+                with self.client.pipeline() as pipe:
+                    try:
+                        # release()와 경합하면 WatchError → 다시 판단
+                        pipe.watch(key)
+                        leader = self._parse(pipe.get(key))
+                        pipe.multi()
+                        if leader:
+                            entry = {**waiter, "joined_at": int(time.time())}
+                            pipe.rpush(waiters_key, json.dumps(entry))
+                            pipe.expire(waiters_key, settings.JOB_COALESCE_TTL)
+                            pipe.execute()
+                            print(f"🔗 동일 작업 합류: {leader['task_id']} ← {waiter}")
+                            return CoalesceTicket(leader["task_id"], False, leader.get("files") or [])
+
+                        task_id = uuid()
+                        value = json.dumps({"task_id": task_id, "files": files or []})
+                        pipe.set(key, value, ex=settings.JOB_COALESCE_TTL)
+                        pipe.execute()
+                        return CoalesceTicket(task_id, True, files or [])
+                    except redis.WatchError:
+                        continue
+        except redis.RedisError as e:
+            print(f"⚠️ 작업 합치기 건너뜀 (Redis 오류): {e}")
+        return CoalesceTicket(uuid(), True, files or [])
+
+    @staticmethod
+    def _parse(raw: Optional[str]) -> Optional[dict]:
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def release(self, key: Optional[str], task_id: str) -> List[dict]:
+        """
+        리더 작업 종료 시 호출. 키가 아직 이 작업 것일 때만 지우고 대기자 목록을 반환.
+        (재시도로 다시 끝난 작업이 새로 시작된 동일 작업의 키를 지우지 않도록 task_id 비교)
+        """
+        if not key:
+            return []
+        waiters_key = self._waiters_key(key)
+        try:
+            with self.client.pipeline() as pipe:
+                pipe.watch(key)
+                leader = self._parse(pipe.get(key))
+                if not leader or leader.get("task_id") != task_id:
+                    pipe.unwatch()
+                    return []
+                pipe.multi()
+                pipe.lrange(waiters_key, 0, -1)
+                pipe.delete(key, waiters_key)
+                raw_waiters, _ = pipe.execute()
+        except (redis.RedisError, redis.WatchError) as e:
+            print(f"⚠️ 작업 합치기 해제 실패: {e}")
+            return []
+
+        waiters = []
+        for raw in raw_waiters:
+            try:
+                waiters.append(json.loads(raw))
+            except ValueError:
+                continue
+        if waiters:
+            print(f"📣 합류한 대기자 {len(waiters)}명에게 결과 전달: {task_id}")
+        return waiters
+
+    def abandon(self, key: str, task_id: str) -> List[dict]:
+        """리더가 작업 시작에 실패했을 때 키를 풀어 다음 요청이 새로 시작하게 한다. 반환: 대기자 목록"""
+        return self.release(key, task_id)
+
+
+job_coalescer = JobCoalescer()
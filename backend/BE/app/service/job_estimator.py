@@ -0,0 +1,220 @@
+# app/service/job_estimator.py
+import hashlib
+import json
+import os
+import subprocess
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+import redis
+from PyPDF2 import PdfReader
+
+from app.db.redis import get_redis
+
+VIDEO_META_PREFIX = "estimate:video:"
+VIDEO_META_TTL = 30 * 24 * 3600
+
+# ===== 추정 계수 (실측 로그 기준으로 조정) =====
+# PDF: 래스터화 → 페이지별 Vision 요약(순차) → 통합 생성
+PDF_RASTERIZE_SEC_PER_PAGE = 0.4
+PDF_SUMMARY_SEC_PER_PAGE = 6.0
+PDF_AGGREGATE_SEC = 45.0
+PDF_PAGE_IMAGE_BYTES = 250 * 1024          # 150dpi JPEG 한 장
+PDF_VISION_INPUT_TOKENS_PER_PAGE = 1400    # 이미지(1280px) + 페이지 프롬프트
+PDF_VISION_OUTPUT_TOKENS_PER_PAGE = 450
+PDF_AGGREGATE_OUTPUT_TOKENS = 3500
+
+# 영상: 다운로드 → 1회 디코드(오디오 분할+키프레임) → 청크 STT → 통합 생성
+VIDEO_DEFAULT_DURATION_SEC = 75 * 60       # 길이를 모를 때 (강의 1회분)
+VIDEO_DEFAULT_BITRATE = 1_500_000          # bps
+VIDEO_DOWNLOAD_BYTES_PER_SEC = 20 * 1024 * 1024
+VIDEO_DECODE_SPEED = 25.0                  # 영상 길이 대비 분석 속도 (배속)
+VIDEO_STT_SPEED = 12.0                     # 영상 길이 대비 STT 속도 (배속)
+VIDEO_GENERATE_SEC = 60.0
+VIDEO_WAV_BYTES_PER_SEC = 32_000           # 16kHz mono PCM
+VIDEO_KEYFRAME_BYTES = 120 * 1024
+VIDEO_KEYFRAME_INTERVAL_SEC = 30
+VIDEO_TRANSCRIPT_TOKENS_PER_MIN = 450
+VIDEO_KEYFRAME_INPUT_TOKENS = 800
+VIDEO_GENERATE_OUTPUT_TOKENS = 4000
+
+
+@dataclass
+class JobEstimate:
+    kind: str                                  # "pdf" | "video"
+    wall_clock_sec: float
+    input_tokens: int
+    output_tokens: int
+    disk_bytes: int
+    pages: Optional[int] = None
+    text_pages: Optional[int] = None           # 텍스트 레이어(폰트)가 있는 페이지 수
+    text_bytes: Optional[int] = None           # 페이지 content stream 길이 합 (압축 상태)
+    duration_sec: Optional[float] = None
+    bitrate: Optional[int] = None
+    source: str = "probe"                      # probe | cache | default
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class JobEstimator:
+    """
+    작업을 큐에 넣기 전에 입력 메타데이터만으로 소요 시간/토큰/디스크 사용량을 추정한다.
+    - PDF: 헤더/xref와 페이지 트리만 읽음 (래스터화/텍스트 추출 없음)
+    - 영상: ffprobe로 컨테이너 메타데이터만 읽음 (디코드 없음)
+    Canvas URL은 다운로드 전에는 파일이 없으므로, 이전에 같은 URL을 받았을 때 기록한 메타데이터를 쓰고
+    없으면 기본값으로 추정한다.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = get_redis()
+        return self._client
+
+    # ---------- PDF ----------
+    @staticmethod
+    def _pdf_stats(path: str):
+        reader = PdfReader(path, strict=False)
+        pages = text_pages = text_bytes = 0
+        for page in reader.pages:
+            pages += 1
+            resources = page.get("/Resources") or {}
+            if hasattr(resources, "get_object"):
+                resources = resources.get_object()
+            if resources.get("/Font"):
+                text_pages += 1
+            contents = page.get("/Contents")
+            if contents is None:
+                continue
+            contents = contents.get_object()
+            streams = contents if isinstance(contents, list) else [contents]
+            for stream in streams:
+                stream = stream.get_object()
+                text_bytes += int(stream.get("/Length", 0) or 0)
+        return pages, text_pages, text_bytes
+
+    def estimate_pdfs(self, paths: List[str]) -> JobEstimate:
+        pages = text_pages = text_bytes = input_bytes = 0
+        for path in paths:
+            input_bytes += os.path.getsize(path)
+            try:
+                p, t, b = self._pdf_stats(path)
+            except Exception as e:
+                print(f"⚠️ PDF 메타데이터 읽기 실패 ({os.path.basename(path)}): {e}")
+                p, t, b = 20, 0, 0
+            pages, text_pages, text_bytes = pages + p, text_pages + t, text_bytes + b
+
+        wall = (
+            pages * (PDF_RASTERIZE_SEC_PER_PAGE + PDF_SUMMARY_SEC_PER_PAGE)
+            + PDF_AGGREGATE_SEC
+        )
+        # 페이지 요약 입력 + 통합 단계 입력(페이지 요약 전체)
+        input_tokens = pages * PDF_VISION_INPUT_TOKENS_PER_PAGE + pages * PDF_VISION_OUTPUT_TOKENS_PER_PAGE
+        output_tokens = pages * PDF_VISION_OUTPUT_TOKENS_PER_PAGE + PDF_AGGREGATE_OUTPUT_TOKENS
+        # 업로드 원본 + 병합본 + 페이지 이미지
+        disk = input_bytes * 2 + pages * PDF_PAGE_IMAGE_BYTES
+
+        return JobEstimate(
+            kind="pdf",
+            wall_clock_sec=round(wall, 1),
+            input_tokens=int(input_tokens),
+            output_tokens=int(output_tokens),
+            disk_bytes=int(disk),
+            pages=pages,
+            text_pages=text_pages,
+            text_bytes=text_bytes,
+        )
+
+    # ---------- 영상 ----------
+    @staticmethod
+    def probe_video(path: str) -> dict:
+        """ffprobe -show_format: 컨테이너 헤더의 길이/비트레이트만 읽음"""
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", path],
+            capture_output=True, text=True, timeout=30, check=True,
+        ).stdout
+        fmt = json.loads(out or "{}").get("format", {})
+        duration = float(fmt.get("duration") or 0)
+        bitrate = int(fmt.get("bit_rate") or 0)
+        if not bitrate and duration:
+            bitrate = int(int(fmt.get("size") or 0) * 8 / duration)
+        return {"duration_sec": duration, "bitrate": bitrate}
+
+    def _from_video_meta(self, duration: float, bitrate: int, source: str) -> JobEstimate:
+        video_bytes = duration * bitrate / 8
+        wall = (
+            video_bytes / VIDEO_DOWNLOAD_BYTES_PER_SEC
+            + duration / VIDEO_DECODE_SPEED
+            + duration / VIDEO_STT_SPEED
+            + VIDEO_GENERATE_SEC
+        )
+        keyframes = int(duration // VIDEO_KEYFRAME_INTERVAL_SEC)
+        transcript_tokens = duration / 60 * VIDEO_TRANSCRIPT_TOKENS_PER_MIN
+        disk = video_bytes + duration * VIDEO_WAV_BYTES_PER_SEC + keyframes * VIDEO_KEYFRAME_BYTES
+
+        return JobEstimate(
+            kind="video",
+            wall_clock_sec=round(wall, 1),
+            input_tokens=int(transcript_tokens + keyframes * VIDEO_KEYFRAME_INPUT_TOKENS),
+            output_tokens=int(transcript_tokens + VIDEO_GENERATE_OUTPUT_TOKENS),
+            disk_bytes=int(disk),
+            duration_sec=round(duration, 1),
+            bitrate=bitrate,
+            source=source,
+        )
+
+    def estimate_video_file(self, path: str) -> JobEstimate:
+        try:
+            meta = self.probe_video(path)
+        except Exception as e:
+            print(f"⚠️ ffprobe 실패 ({os.path.basename(path)}): {e}")
+            return self._from_video_meta(VIDEO_DEFAULT_DURATION_SEC, VIDEO_DEFAULT_BITRATE, "default")
+        return self._from_video_meta(
+            meta["duration_sec"] or VIDEO_DEFAULT_DURATION_SEC,
+            meta["bitrate"] or VIDEO_DEFAULT_BITRATE,
+            "probe",
+        )
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return VIDEO_META_PREFIX + hashlib.sha256(url.strip().encode("utf-8")).hexdigest()
+
+    def remember_video(self, url: str, video_path: str) -> Optional[JobEstimate]:
+        """다운로드 단계에서 호출: 실제 영상 메타데이터를 URL 기준으로 기록하고 정확한 추정값 반환"""
+        try:
+            meta = self.probe_video(video_path)
+        except Exception as e:
+            print(f"⚠️ ffprobe 실패 ({os.path.basename(video_path)}): {e}")
+            return None
+        try:
+            self.client.set(self._url_key(url), json.dumps(meta), ex=VIDEO_META_TTL)
+        except redis.RedisError:
+            pass
+        return self._from_video_meta(
+            meta["duration_sec"] or VIDEO_DEFAULT_DURATION_SEC,
+            meta["bitrate"] or VIDEO_DEFAULT_BITRATE,
+            "probe",
+        )
+
+    def estimate_url(self, url: str) -> JobEstimate:
+        try:
+            raw = self.client.get(self._url_key(url))
+        except redis.RedisError:
+            raw = None
+        if raw:
+            meta = json.loads(raw)
+            return self._from_video_meta(meta["duration_sec"], meta["bitrate"] or VIDEO_DEFAULT_BITRATE, "cache")
+        return self._from_video_meta(VIDEO_DEFAULT_DURATION_SEC, VIDEO_DEFAULT_BITRATE, "default")
+
+    # ---------- 공통 ----------
+    def estimate(self, files: Optional[List[str]] = None, url: Optional[str] = None) -> JobEstimate:
+        if files:
+            return self.estimate_pdfs(files)
+        return self.estimate_url(url or "")
+
+
+job_estimator = JobEstimator()
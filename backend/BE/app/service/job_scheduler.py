@@ -0,0 +1,250 @@
+# app/service/job_scheduler.py
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.db.redis import get_redis
+
+KEY_PREFIX = "sched:"
+
+
+def _k(*parts) -> str:
+    return KEY_PREFIX + ":".join(str(p) for p in parts)
+
+
+class JobScheduler:
+    """
+    노트/퀴즈 생성 작업을 Celery에 바로 넣지 않고 사용자별 대기열에 넣었다가
+    가중 공정 큐잉(start-time fair queuing)으로 꺼내 실행한다.
+
+    - 동시에 실행되는 작업 수: 전체 SCHED_MAX_RUNNING, 사용자별 SCHED_USER_MAX_RUNNING 이하
+    - 작업마다 시작 태그 S = max(가상시간 V, 해당 사용자의 직전 종료 태그), 종료 태그 = S + 비용/가중치
+      → 작업을 많이/길게 넣은 사용자의 뒤쪽 작업은 태그가 커져서 다른 사용자 작업이 먼저 실행된다
+    - 예상 비용(초)이 작을수록 높은 Celery 우선순위로 보내 짧은 작업이 긴 작업 뒤에 막히지 않게 한다
+
+    Redis 키:
+      sched:job:{job_id}       대기 중인 작업 (chain 시그니처 JSON, 비용, 태그 등)
+      sched:q:{user_id}        사용자별 대기열 (job_id FIFO)
+      sched:ready              zset user_id → 대기열 맨 앞 작업의 시작 태그
+      sched:pending            zset job_id → 시작 태그 (대기 순번/ETA 계산용)
+      sched:finish             hash user_id → 마지막 종료 태그
+      sched:vtime              가상 시간
+      sched:running            zset job_id → 실행 시작 시각
+      sched:running_owner      hash job_id → user_id
+      sched:user_running       hash user_id → 실행 중 작업 수
+      sched:task:{task_id}     상태 조회 task_id → job_id
+
+    Redis 장애 시에는 스케줄링 없이 바로 실행한다.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = get_redis()
+        return self._client
+
+    def _lock(self):
+        # API 프로세스/워커 여러 곳에서 동시에 dispatch하지 않도록 전역 락
+        return self.client.lock(_k("lock"), timeout=10, blocking_timeout=5)
+
+    # ---------- 우선순위 ----------
+    @staticmethod
+    def priority_for(cost_sec: float) -> int:
+        """Redis 브로커 우선순위 (0이 가장 높음)"""
+        if cost_sec <= settings.SCHED_LIGHT_JOB_SEC:
+            return 0
+        if cost_sec <= settings.SCHED_HEAVY_JOB_SEC:
+            return 3
+        return 6
+
+    # ---------- 제출 / 종료 ----------
+    def submit(self, ctx: dict, flow, cost_sec: float, weight: float = 1.0) -> None:
+        """파이프라인(chain)을 대기열에 넣고, 자리가 있으면 바로 실행"""
+        job_id, user_id = ctx["job_id"], ctx["user_id"]
+        queued = False
+        launches: List[Tuple[str, str]] = []
+        try:
+            with self._lock():
+                vtime = float(self.client.get(_k("vtime")) or 0)
+                last_finish = float(self.client.hget(_k("finish"), user_id) or 0)
+                start_tag = max(vtime, last_finish)
+
+                pipe = self.client.pipeline()
+                pipe.hset(_k("job", job_id), mapping={
+                    "sig": json.dumps(flow),
+                    "user_id": user_id,
+                    "task_id": ctx["task_id"],
+                    "cost": cost_sec,
+                    "tag": start_tag,
+                    "enqueued_at": time.time(),
+                })
+                pipe.rpush(_k("q", user_id), job_id)
+                pipe.zadd(_k("pending"), {job_id: start_tag})
+                pipe.zadd(_k("ready"), {user_id: start_tag}, nx=True)   # 이미 대기 중이면 맨 앞 작업 태그 유지
+                pipe.hset(_k("finish"), user_id, start_tag + cost_sec / weight)
+                pipe.set(_k("task", ctx["task_id"]), job_id, ex=settings.SCHED_RUNNING_TTL)
+                pipe.execute()
+                queued = True
+
+                launches = self._dispatch_locked()
+        except redis.RedisError as e:
+            if queued:
+                # 대기열에는 들어갔으므로 다음 submit/finish 때 실행된다.
+                # 락 반납 실패(LockNotOwnedError 등)여도 이미 running으로 옮긴 작업은 여기서 실행해야 한다
+                print(f"⚠️ 스케줄러 dispatch/락 반납 실패 ({job_id}): {e}")
+                self._launch(launches)
+                return
+            print(f"⚠️ 스케줄러 사용 불가 → 바로 실행 ({job_id}): {e}")
+            flow.apply_async()
+            return
+
+        print(f"📥 작업 대기열 등록: {job_id} (user={user_id}, 예상 {cost_sec:.0f}s)")
+        self._launch(launches)
+
+    def finish(self, job_id: str) -> None:
+        """작업 종료(성공/실패) 시 실행 슬롯을 반납하고 다음 작업 실행"""
+        launches: List[Tuple[str, str]] = []
+        try:
+            with self._lock():
+                self._release_locked(job_id)
+                launches = self._dispatch_locked()
+        except redis.RedisError as e:
+            print(f"⚠️ 스케줄러 슬롯 반납 실패 ({job_id}): {e}")
+        # 락 반납에서 실패했더라도 running으로 옮긴 작업은 실행
+        self._launch(launches)
+
+    # ---------- 내부 ----------
+    def _release_locked(self, job_id: str) -> None:
+        if not self.client.zrem(_k("running"), job_id):
+            return
+        user_id = self.client.hget(_k("running_owner"), job_id)
+        self.client.hdel(_k("running_owner"), job_id)
+        if user_id is not None and self.client.hincrby(_k("user_running"), user_id, -1) <= 0:
+            self.client.hdel(_k("user_running"), user_id)
+
+    def _reap_stale_locked(self) -> None:
+        """워커가 죽어 finish가 호출되지 않은 작업은 일정 시간 후 슬롯 회수"""
+        deadline = time.time() - settings.SCHED_RUNNING_TTL
+        for job_id in self.client.zrangebyscore(_k("running"), "-inf", deadline):
+            print(f"⚠️ 오래된 실행 슬롯 회수: {job_id}")
+            self._release_locked(job_id)
+
+    def _dispatch_locked(self) -> List[Tuple[str, str]]:
+        """실행 가능한 만큼 대기열에서 꺼냄. 반환: [(job_id, 시그니처 JSON)] (실제 실행은 락 밖에서)"""
+        self._reap_stale_locked()
+
+        launches = []
+        running = self.client.zcard(_k("running"))
+        while running < settings.SCHED_MAX_RUNNING:
+            user_running = self.client.hgetall(_k("user_running"))
+            candidates = self.client.zrange(_k("ready"), 0, -1)
+            user_id = next(
+                (u for u in candidates if int(user_running.get(u, 0)) < settings.SCHED_USER_MAX_RUNNING),
+                None,
+            )
+            if user_id is None:
+                break
+
+            job_id = self.client.lpop(_k("q", user_id))
+            if job_id is None:
+                self.client.zrem(_k("ready"), user_id)
+                continue
+            job = self.client.hgetall(_k("job", job_id))
+
+            next_job = self.client.lindex(_k("q", user_id), 0)
+            if next_job:
+                next_tag = float(self.client.hget(_k("job", next_job), "tag") or 0)
+                self.client.zadd(_k("ready"), {user_id: next_tag})
+            else:
+                self.client.zrem(_k("ready"), user_id)
+
+            vtime = float(self.client.get(_k("vtime")) or 0)
+            pipe = self.client.pipeline()
+            pipe.zrem(_k("pending"), job_id)
+            pipe.delete(_k("job", job_id))
+            pipe.set(_k("vtime"), max(vtime, float(job.get("tag", 0))))
+            pipe.zadd(_k("running"), {job_id: time.time()})
+            pipe.hset(_k("running_owner"), job_id, user_id)
+            pipe.hincrby(_k("user_running"), user_id, 1)
+            pipe.execute()
+
+            running += 1
+            if job.get("sig"):
+                launches.append((job_id, job["sig"]))
+        return launches
+
+    def _launch(self, launches: List[Tuple[str, str]]) -> None:
+        from celery import signature
+
+        from app.celery_config import celery_app
+
+        for job_id, raw in launches:
+            try:
+                signature(json.loads(raw), app=celery_app).apply_async()
+                print(f"🚀 작업 실행: {job_id}")
+            except Exception as e:
+                print(f"🔥 작업 실행 실패: {job_id}: {e}")
+                self.finish(job_id)
+
+    # ---------- 상태 조회 ----------
+    def counts(self) -> Dict[str, int]:
+        """대기/실행 중 작업 수 (지표용, Redis 오류는 호출자가 처리)"""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zcard(_k("pending"))
+        pipe.zcard(_k("running"))
+        pending, running = pipe.execute()
+        return {"pending": pending, "running": running}
+
+    @staticmethod
+    def task_key(task_id: str) -> str:
+        return _k("task", task_id)
+
+    @staticmethod
+    def _queue_eta(rank: int, costs: List[Optional[str]]) -> Dict[str, int]:
+        # 앞선 작업이 실행 슬롯 수만큼 병렬로 처리된다고 보고 대략 계산
+        eta = sum(float(c or 0) for c in costs) / max(1, settings.SCHED_MAX_RUNNING)
+        return {"queue_position": rank + 1, "eta_seconds": int(eta)}
+
+    def queue_info(self, task_id: str) -> Optional[Dict[str, int]]:
+        """아직 대기열에 있는 작업이면 대기 순번과 예상 대기 시간(초)을 반환"""
+        try:
+            job_id = self.client.get(self.task_key(task_id))
+            if not job_id:
+                return None
+            rank = self.client.zrank(_k("pending"), job_id)
+            if rank is None:
+                return None
+
+            ahead = self.client.zrange(_k("pending"), 0, rank - 1) if rank else []
+            pipe = self.client.pipeline()
+            for other in ahead:
+                pipe.hget(_k("job", other), "cost")
+            return self._queue_eta(rank, pipe.execute())
+        except redis.RedisError:
+            return None
+
+    async def queue_info_async(self, client: aioredis.Redis, job_id: str) -> Optional[Dict[str, int]]:
+        """queue_info의 비동기 버전 (job_id는 호출하는 쪽에서 task_key로 이미 읽은 값, app/service/task_status.py)"""
+        try:
+            rank = await client.zrank(_k("pending"), job_id)
+            if rank is None:
+                return None
+
+            ahead = await client.zrange(_k("pending"), 0, rank - 1) if rank else []
+            async with client.pipeline(transaction=False) as pipe:
+                for other in ahead:
+                    pipe.hget(_k("job", other), "cost")
+                costs = await pipe.execute()
+            return self._queue_eta(rank, costs)
+        except redis.RedisError:
+            return None
+
+
+job_scheduler = JobScheduler()
@@ -0,0 +1,271 @@
+# app/service/metrics.py
+import json
+import math
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+from app.db.redis import get_redis
+
+KEY_PREFIX = "metrics:"
+GAUGE_STALE_SEC = 120
+
+# 버킷 상한(초). scripts/metrics.py의 OPENAI_BUCKETS와 같게 유지
+STAGE_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 900, 1200, 1800, 3600)
+OPENAI_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+# Celery 큐 (celery_config.TASK_ROUTES) — 우선순위별로 {queue}, {queue}:1 ... {queue}:9 리스트에 나뉘어 쌓임
+QUEUES = ("io", "cpu", "llm", "celery")
+PRIORITY_STEPS = range(10)
+
+METRIC_HELP = {
+    "ecampus_queue_length": ("gauge", "Celery 큐에 대기 중인 메시지 수"),
+    "ecampus_scheduler_jobs": ("gauge", "작업 스케줄러 대기/실행 작업 수"),
+    "ecampus_stage_duration_seconds": ("histogram", "파이프라인 단계 태스크 실행 시간"),
+    "ecampus_openai_request_seconds": ("histogram", "OpenAI API 호출 지연 시간"),
+    "ecampus_cache_requests_total": ("counter", "캐시 조회 수 (result=hit|miss)"),
+    "ecampus_worker_rss_bytes": ("gauge", "워커 프로세스 RSS"),
+    "ecampus_autoscale_desired_concurrency": ("gauge", "큐 길이/단계 실행 시간/RSS로 계산한 권장 동시 실행 수"),
+}
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    return ",".join(f'{k}="{str(v).replace(chr(34), "")}"' for k, v in sorted(labels.items()))
+
+
+def _label_value(labels: str, key: str) -> str:
+    match = re.search(rf'{key}="([^"]*)"', labels)
+    return match.group(1) if match else ""
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def current_rss() -> int:
+    """현재 프로세스 RSS (bytes). /proc이 없으면 최대 RSS로 대체"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def desired_concurrency(
+    reserved: int,
+    backlog: int,
+    mean_runtime: Optional[float],
+    rss_per_process: int,
+    max_concurrency: int,
+    min_concurrency: int,
+) -> int:
+    """
+    autoscaler 정책:
+    - 밀린 작업을 AUTOSCALE_TARGET_DRAIN_SEC 안에 처리할 만큼 프로세스를 둔다 (평균 실행 시간을 모르면 작업 1개당 1개)
+    - 이미 받아 둔(reserved) 작업만큼은 항상 유지
+    - AUTOSCALE_MAX_RSS_BYTES가 있으면 프로세스당 RSS로 나눈 수를 넘지 않는다
+    """
+    if mean_runtime:
+        needed = math.ceil(backlog * mean_runtime / settings.AUTOSCALE_TARGET_DRAIN_SEC)
+    else:
+        needed = backlog
+    desired = reserved + min(needed, backlog)
+    if settings.AUTOSCALE_MAX_RSS_BYTES and rss_per_process:
+        desired = min(desired, max(1, settings.AUTOSCALE_MAX_RSS_BYTES // rss_per_process))
+    return max(min_concurrency, min(max_concurrency, desired))
+
+
+class Metrics:
+    """
+    API 서버와 Celery 워커(및 워커가 띄운 스크립트)가 함께 쓰는 지표 저장소.
+    프로세스가 여러 개라 메모리에 두지 않고 Redis 해시에 누적한 뒤 render()에서 Prometheus 텍스트로 내보낸다.
+
+    Redis 키:
+      metrics:hist:{name}     field "{labels}|{le}" 누적 버킷 수, "{labels}|sum", "{labels}|count"
+      metrics:counter:{name}  field "{labels}" → 값
+      metrics:gauge:{name}    field "{labels}" → {"v": 값, "ts": 기록 시각} (GAUGE_STALE_SEC 지나면 무시)
+
+    지표 기록은 부가 기능이므로 Redis 오류는 삼킨다.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = get_redis()
+        return self._client
+
+    # ---------- 기록 ----------
+    def observe(self, name: str, value: float, buckets: Iterable[float], **labels) -> None:
+        label_str = _labels(labels)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            key = f"{KEY_PREFIX}hist:{name}"
+            for le in list(buckets) + [math.inf]:
+                if value <= le:
+                    pipe.hincrby(key, f"{label_str}|{_fmt(le)}", 1)
+            pipe.hincrbyfloat(key, f"{label_str}|sum", value)
+            pipe.hincrby(key, f"{label_str}|count", 1)
+            pipe.execute()
+        except redis.RedisError:
+            pass
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        try:
+            self.client.hincrbyfloat(f"{KEY_PREFIX}counter:{name}", _labels(labels), amount)
+        except redis.RedisError:
+            pass
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        try:
+            self.client.hset(
+                f"{KEY_PREFIX}gauge:{name}", _labels(labels), json.dumps({"v": value, "ts": time.time()})
+            )
+        except redis.RedisError:
+            pass
+
+    def cache_event(self, cache: str, hit: bool) -> None:
+        self.inc("ecampus_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+    def observe_stage(self, task_name: str, seconds: float, state: str) -> None:
+        self.observe("ecampus_stage_duration_seconds", seconds, STAGE_BUCKETS, task=task_name, state=state)
+
+    def report_worker_rss(self, worker: str, queues: Iterable[str]) -> None:
+        self.set_gauge(
+            "ecampus_worker_rss_bytes", current_rss(), worker=worker, queues=",".join(sorted(queues)), pid=os.getpid()
+        )
+
+    # ---------- 조회 ----------
+    def queue_lengths(self) -> Dict[str, int]:
+        """큐별 대기 메시지 수 (우선순위 리스트 합산)"""
+        pipe = self.client.pipeline(transaction=False)
+        for queue in QUEUES:
+            for step in PRIORITY_STEPS:
+                pipe.llen(queue if step == 0 else f"{queue}:{step}")
+        counts = pipe.execute()
+        steps = len(PRIORITY_STEPS)
+        return {queue: sum(counts[i * steps:(i + 1) * steps]) for i, queue in enumerate(QUEUES)}
+
+    def _fresh_gauges(self, name: str) -> List[Tuple[str, float]]:
+        key = f"{KEY_PREFIX}gauge:{name}"
+        now = time.time()
+        fresh, stale = [], []
+        for labels, raw in self.client.hgetall(key).items():
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                stale.append(labels)
+                continue
+            if now - entry.get("ts", 0) > GAUGE_STALE_SEC:
+                stale.append(labels)
+            else:
+                fresh.append((labels, entry["v"]))
+        if stale:
+            self.client.hdel(key, *stale)
+        return fresh
+
+    def mean_stage_seconds(self, task_names: Iterable[str]) -> Optional[float]:
+        """주어진 단계 태스크들의 평균 실행 시간 (성공한 실행 기준)"""
+        wanted = {f'task="{name}"' for name in task_names}
+        total = count = 0.0
+        for field, value in self.client.hgetall(f"{KEY_PREFIX}hist:ecampus_stage_duration_seconds").items():
+            labels, suffix = field.rsplit("|", 1)
+            parts = set(labels.split(","))
+            if 'state="SUCCESS"' not in parts or not parts & wanted:
+                continue
+            if suffix == "sum":
+                total += float(value)
+            elif suffix == "count":
+                count += float(value)
+        return total / count if count else None
+
+    def autoscale_hint(self, queue: str, backlog: int, reserved: int = 0) -> int:
+        """큐 하나에 필요한 동시 실행 수 추정 (워커 autoscaler와 /metrics 힌트 공용)"""
+        from app.celery_config import TASK_ROUTES
+
+        tasks = [name for name, route in TASK_ROUTES.items() if route.get("queue") == queue]
+        rss = [
+            v for labels, v in self._fresh_gauges("ecampus_worker_rss_bytes")
+            if queue in _label_value(labels, "queues").split(",")
+        ]
+        return desired_concurrency(
+            reserved=reserved,
+            backlog=backlog,
+            mean_runtime=self.mean_stage_seconds(tasks),
+            rss_per_process=int(sum(rss) / len(rss)) if rss else 0,
+            max_concurrency=settings.AUTOSCALE_MAX_CONCURRENCY,
+            min_concurrency=1,
+        )
+
+    # ---------- Prometheus 텍스트 ----------
+    def render(self) -> str:
+        from app.service.job_scheduler import job_scheduler
+
+        lines: List[str] = []
+
+        def header(name: str):
+            kind, text = METRIC_HELP[name]
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        try:
+            header("ecampus_queue_length")
+            queues = self.queue_lengths()
+            for queue, count in queues.items():
+                lines.append(f'ecampus_queue_length{{queue="{queue}"}} {count}')
+
+            header("ecampus_scheduler_jobs")
+            for state, count in job_scheduler.counts().items():
+                lines.append(f'ecampus_scheduler_jobs{{state="{state}"}} {count}')
+
+            for name in ("ecampus_stage_duration_seconds", "ecampus_openai_request_seconds"):
+                header(name)
+                lines.extend(self._render_histogram(name))
+
+            header("ecampus_cache_requests_total")
+            for labels, value in sorted(self.client.hgetall(f"{KEY_PREFIX}counter:ecampus_cache_requests_total").items()):
+                lines.append(f"ecampus_cache_requests_total{{{labels}}} {_fmt(float(value))}")
+
+            header("ecampus_autoscale_desired_concurrency")
+            for queue, count in queues.items():
+                lines.append(f'ecampus_autoscale_desired_concurrency{{queue="{queue}"}} {self.autoscale_hint(queue, count)}')
+
+            header("ecampus_worker_rss_bytes")
+            for labels, value in sorted(self._fresh_gauges("ecampus_worker_rss_bytes")):
+                lines.append(f"ecampus_worker_rss_bytes{{{labels}}} {int(value)}")
+        except redis.RedisError as e:
+            lines.append(f"# redis unavailable: {type(e).__name__}")
+
+        return "\n".join(lines) + "\n"
+
+    def _render_histogram(self, name: str) -> List[str]:
+        series: Dict[str, Dict[str, float]] = {}
+        for field, value in self.client.hgetall(f"{KEY_PREFIX}hist:{name}").items():
+            labels, suffix = field.rsplit("|", 1)
+            series.setdefault(labels, {})[suffix] = float(value)
+
+        out = []
+        for labels, values in sorted(series.items()):
+            sep = "," if labels else ""
+            bucket_items = sorted(
+                ((k, v) for k, v in values.items() if k not in ("sum", "count")),
+                key=lambda kv: float(kv[0].replace("+Inf", "inf")),
+            )
+            for le, count in bucket_items:
+                out.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {int(count)}')
+            out.append(f"{name}_sum{{{labels}}} {_fmt(values.get('sum', 0))}")
+            out.append(f"{name}_count{{{labels}}} {int(values.get('count', 0))}")
+        return out
+
+
+metrics = Metrics()
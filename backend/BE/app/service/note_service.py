@@ -1,22 +1,32 @@
 import asyncio
 import os, time, subprocess
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
+from app.schema.job import JobEstimateResponse, TaskStatusResponse
 from app.schema.note import (
     FileSummaryResponse,
     UrlSummaryResponse,
     FileFillBlankResponse,
-    UrlFillBlankResponse
+    UrlFillBlankResponse,
+    NoteRetryResponse
 )
 from app.exception.custom_exceptions import APIException
+from app.service.job_coalescer import job_coalescer
+from app.service.job_estimator import job_estimator
+from app.service.task_status import task_status_reader
 from app.exception.error_code import Error
 from app.core.config import settings
+from app.db.redis import get_async_redis
 from PyPDF2 import PdfMerger
 from app.model.user import User
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import sys
 
+# 재시도 선점 키 (resume_pipeline이 매니페스트를 PROCESSING으로 바꿀 때까지만 유지, 끝나면 삭제)
+RETRY_CLAIM_PREFIX = "retry:"
+RETRY_CLAIM_TTL = 60
+
 class NoteService:
     
     def __init__(self):
@@ -28,27 +38,76 @@ class NoteService:
         self.python_executable = sys.executable
         os.makedirs(self.workdir, exist_ok=True)
     
+    async def _start_or_join(
+        self,
+        user_id: int,
+        mode: str,
+        files: List[str] = None,
+        url: str = None,
+        file_digests: Optional[List[str]] = None
+    ) -> Tuple[str, dict]:
+        """
+        같은 입력 + 같은 모드의 작업이 진행 중이면 그 task_id에 합류하고, 없으면 새 파이프라인 시작
+        반환: (상태 조회용 task_id, 사전 추정치)
+        """
+        from app.tasks.pipeline import start_note_pipeline
+        
+        # 큐에 넣기 전 소요 시간/토큰/디스크 추정 (스케줄러 우선순위 + 응답에 사용)
+        estimate = (await asyncio.to_thread(job_estimator.estimate, files, url)).to_dict()
+        
+        if files:
+            # 파일 내용이 같으면 사용자가 달라도 같은 결과 (업로드 때 계산한 해시가 있으면 재사용)
+            if file_digests:
+                digest = job_coalescer.digest_hashes(file_digests)
+            else:
+                digest = await asyncio.to_thread(job_coalescer.digest_files, files)
+            key = job_coalescer.make_key("note", digest, mode=mode)
+        else:
+            # Canvas 강의는 수강 권한이 사용자마다 다르므로 같은 사용자 요청끼리만 합침
+            digest = job_coalescer.digest_url(url)
+            key = job_coalescer.make_key("note", digest, mode=mode, user_id=user_id)
+        
+        # 합류/포기는 WATCH/MULTI 왕복이 있는 동기 Redis 호출, 중복 업로드 삭제는 파일 I/O라 이벤트 루프 밖에서
+        ticket = await asyncio.to_thread(job_coalescer.join, key, {"user_id": user_id}, files=files)
+        if not ticket.is_leader:
+            await asyncio.to_thread(ticket.discard_duplicate_inputs, files)
+            await task_status_reader.add_owner(ticket.task_id, user_id)
+            return ticket.task_id, estimate
+        
+        try:
+            # 스케줄러 대기열 등록은 Redis 락(최대 5초 대기)을 잡으므로 이벤트 루프 밖에서
+            task_id = await asyncio.to_thread(
+                start_note_pipeline,
+                user_id, mode, files=files, url=url,
+                task_id=ticket.task_id, coalesce_key=key, estimate=estimate
+            )
+            await task_status_reader.add_owner(task_id, user_id)
+            return task_id, estimate
+        except Exception:
+            await asyncio.to_thread(job_coalescer.abandon, key, ticket.task_id)
+            raise
+    
     # 요약 노트 생성
     async def create_summary_from_files(
         self,
         user_id: int,
-        files: List[str]
+        files: List[str],
+        file_digests: Optional[List[str]] = None
     ) -> FileSummaryResponse:
         
-        from app.tasks.note_tasks import generate_summary_task
-        
         if not files or len(files) > 5:
             raise APIException(400, Error.FILE_NOT_FOUND)
 
-        task = generate_summary_task.apply_async(
-            args=[user_id, files, "summary"]
+        task_id, estimate = await self._start_or_join(
+            user_id, "summary", files=files, file_digests=file_digests
         )
             
         return FileSummaryResponse(
-            task_id=task.id,
+            task_id=task_id,
             status="PROCESSING",
             pdf_url="",
-            created_at=datetime.now().strftime("%Y-%m-%d")
+            created_at=datetime.now().strftime("%Y-%m-%d"),
+            estimate=JobEstimateResponse.from_estimate(estimate)
         )
         
     async def create_summary_from_url(
@@ -58,8 +117,6 @@ class NoteService:
         db: AsyncSession
     ) -> UrlSummaryResponse:
         
-        from app.tasks.note_tasks import generate_summary_from_url_task
-        
         if not url:
             raise APIException(400, Error.URL_NOT_FOUND)
     
@@ -71,18 +128,15 @@ class NoteService:
         if not user or not user.id or not user.password:
             raise APIException(400, Error.CANVAS_CREDENTIALS_MISSING)
         
-        canvas_pw = settings.fernet.decrypt(user.password.encode()).decode()
-        
-        # Celery 작업 시작
-        task = generate_summary_from_url_task.apply_async(
-            args=[user_id, url, user.id, canvas_pw, "summary"]
-        )
+        # Celery 파이프라인 시작 (Canvas 비밀번호는 다운로드 단계에서 DB로부터 복호화)
+        task_id, estimate = await self._start_or_join(user_id, "summary", url=url)
         
         return UrlSummaryResponse(
-            task_id=task.id,
+            task_id=task_id,
             status="PROCESSING",
             pdf_url="",
-            created_at=datetime.now().strftime("%Y-%m-%d")
+            created_at=datetime.now().strftime("%Y-%m-%d"),
+            estimate=JobEstimateResponse.from_estimate(estimate)
         )
         
   
@@ -90,23 +144,24 @@ class NoteService:
     async def create_blank_from_files(
         self,
         user_id: int,
-        files: List[str]
+        files: List[str],
+        file_digests: Optional[List[str]] = None
     ) -> FileFillBlankResponse:
         
-        from app.tasks.note_tasks import generate_summary_task
         if not files or len(files) > 5:
             raise APIException(400, Error.FILE_NOT_FOUND)
         
-        # Celery 작업 시작
-        task = generate_summary_task.apply_async(
-            args=[user_id, files, "blank"]
+        # Celery 파이프라인 시작 (동일 요청이 진행 중이면 합류)
+        task_id, estimate = await self._start_or_join(
+            user_id, "blank", files=files, file_digests=file_digests
         )
         
         return FileFillBlankResponse(
-            task_id=task.id,
+            task_id=task_id,
             status="PROCESSING",
             pdf_url="",
-            created_at=datetime.now().strftime("%Y-%m-%d")
+            created_at=datetime.now().strftime("%Y-%m-%d"),
+            estimate=JobEstimateResponse.from_estimate(estimate)
         )
     
         
@@ -117,8 +172,6 @@ class NoteService:
         db: AsyncSession
     ) -> UrlFillBlankResponse:
         
-        from app.tasks.note_tasks import generate_summary_from_url_task
-        
         # 사용자 Canvas 인증 정보
         result = await db.execute(
             select(User).where(User.user_id == user_id)
@@ -128,77 +181,55 @@ class NoteService:
         if not user or not user.id or not user.password:
             raise APIException(400, Error.CANVAS_CREDENTIALS_MISSING)
         
-        canvas_pw = settings.fernet.decrypt(user.password.encode()).decode()
-        
-        # Celery 작업 시작
-        task = generate_summary_from_url_task.apply_async(
-            args=[user_id, url, user.id, canvas_pw, "blank"]
-        )
+        # Celery 파이프라인 시작 (Canvas 비밀번호는 다운로드 단계에서 DB로부터 복호화)
+        task_id, estimate = await self._start_or_join(user_id, "blank", url=url)
         
         return UrlFillBlankResponse(
-            task_id=task.id,
+            task_id=task_id,
             status="PROCESSING",
             pdf_url="",
-            created_at=datetime.now().strftime("%Y-%m-%d")
+            created_at=datetime.now().strftime("%Y-%m-%d"),
+            estimate=JobEstimateResponse.from_estimate(estimate)
         )
     
-    async def get_task_status(self, task_id: str):
-        """Celery 작업 상태 확인 (Quiz와 동일)"""
-        from celery.result import AsyncResult
-
-        from app.celery_config import celery_app
-        
-        task = AsyncResult(task_id, app=celery_app)
-        
+    # 실패한 작업 재시도 (완료된 단계는 건너뛰고 첫 미완료 단계부터)
+    async def retry_job(
+        self,
+        user_id: int,
+        job_id: str
+    ) -> NoteRetryResponse:
+        
+        from app.tasks.pipeline import load_manifest, resume_pipeline
+        
+        manifest = await asyncio.to_thread(load_manifest, job_id)
+        if not manifest or manifest["ctx"].get("kind") != "note" or manifest["ctx"].get("user_id") != user_id:
+            raise APIException(404, Error.JOB_NOT_FOUND)
+        if manifest.get("status") != "FAILED":
+            raise APIException(409, Error.JOB_NOT_RETRYABLE)
+        
+        # 동시에 재시도하면 둘 다 FAILED를 읽을 수 있으므로 SET NX로 한 요청만 통과시키고,
+        # 선점한 뒤 매니페스트를 다시 읽어 그 사이 다른 요청이 이미 재시작(PROCESSING)했는지 확인
+        redis_client = get_async_redis()
+        claim_key = f"{RETRY_CLAIM_PREFIX}{job_id}"
+        if not await redis_client.set(claim_key, user_id, nx=True, ex=RETRY_CLAIM_TTL):
+            raise APIException(409, Error.JOB_NOT_RETRYABLE)
         try:
-            if task.ready():
-                if task.successful():
-                    result = task.result
-                    if isinstance(result, dict):
-                        return {
-                            "status": result.get('status', 'COMPLETED'),
-                            "pdf_url": result.get('pdf_url'),
-                            "job_id": result.get('job_id'),
-                            "progress": 100
-                        }
-                    else:
-                        return {
-                            "status": "COMPLETED",
-                            "progress": 100,
-                            "message": str(result)
-                        }
-                else:
-                    error_info = task.info
-                    error_message = str(error_info) if error_info else "Unknown error"
-                    
-                    return {
-                        "status": "FAILED",
-                        "error": error_message,
-                        "progress": 0
-                    }
-            else:
-                info = task.info or {}
-                
-                if not isinstance(info, dict):
-                    return {
-                        "status": "PROCESSING",
-                        "progress": 0,
-                        "message": "처리 중..."
-                    }
-                
-                return {
-                    "status": "PROCESSING",
-                    "progress": info.get('progress', 0),
-                    "message": info.get('status', '처리 중...')
-                }
-        
-        except Exception as e:
-            print(f"🔥 get_task_status Error: {type(e).__name__}: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            
-            return {
-                "status": "UNKNOWN",
-                "error": f"상태 조회 실패: {str(e)}",
-                "progress": 0
-            }
\ No newline at end of file
+            manifest = await asyncio.to_thread(load_manifest, job_id)
+            if not manifest or manifest.get("status") != "FAILED":
+                raise APIException(409, Error.JOB_NOT_RETRYABLE)
+            # 매니페스트 파일/Redis 동기 I/O + 스케줄러 락 대기가 있으므로 이벤트 루프 밖에서
+            task_id = await asyncio.to_thread(resume_pipeline, job_id)
+        finally:
+            await redis_client.delete(claim_key)
+        await task_status_reader.add_owner(task_id, user_id)
+        
+        return NoteRetryResponse(
+            task_id=task_id,
+            job_id=job_id,
+            status="PROCESSING",
+            attempts=manifest.get("attempts", 1) + 1
+        )
+    
+    async def get_task_status(self, task_id: str) -> TaskStatusResponse:
+        """Celery 작업 상태 확인 (Quiz와 동일, Redis 비동기 조회: app/service/task_status.py)"""
+        return await task_status_reader.read(task_id)
@@ -0,0 +1,97 @@
+# app/service/quiz_detail_cache.py
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.redis import get_async_redis
+from app.service.metrics import metrics
+
+KEY_PREFIX = "quiz:detail:"
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedQuizDetail:
+    etag: str
+    body: str            # 직렬화된 APIResponse[QuizDetailResponse] JSON
+
+
+class QuizDetailCache:
+    """
+    퀴즈 상세 응답(JSON 문자열)을 Redis에 read-through로 보관한다. (비동기 클라이언트, 요청당 왕복 1번)
+
+    Redis 키:
+      quiz:detail:{quiz_id}   hash {ver: 버전 (제출/저장 시 HINCRBY), at: 응답을 만든 시점의 버전, etag, body}
+
+    버전과 응답이 한 해시에 있어 HGETALL 한 번으로 조회하고, at == ver일 때만 적중으로 본다.
+    조회 직전의 버전을 at으로 저장하므로, DB를 읽는 사이 제출이 끝나도 옛 응답은 새 버전에서 적중하지 않는다.
+    버전과 응답이 같은 키라 함께 만료되므로 버전이 0으로 돌아가도 옛 응답이 남지 않는다.
+    캐시는 보조 수단이므로 Redis 장애 시에도 예외를 던지지 않고 DB 조회로 넘어간다.
+    """
+
+    def __init__(self, client: Optional[aioredis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> aioredis.Redis:
+        if self._client is None:
+            self._client = get_async_redis()
+        return self._client
+
+    # ---------- 키 ----------
+    @staticmethod
+    def _key(quiz_id: int) -> str:
+        return f"{KEY_PREFIX}{quiz_id}"
+
+    @staticmethod
+    def make_etag(quiz_id: int, version: int, body: str) -> str:
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()[:16]
+        return f'"q{quiz_id}-v{version}-{digest}"'
+
+    # ---------- 조회/저장 ----------
+    async def lookup(self, quiz_id: int) -> Tuple[Optional[int], Optional[CachedQuizDetail]]:
+        """
+        (현재 버전, 캐시된 응답) 반환.
+        Redis 오류면 (None, None) → 이번 요청은 캐시를 쓰지 않음
+        """
+        try:
+            entry = await self.client.hgetall(self._key(quiz_id))
+            version = int(entry.get("ver") or 0)
+        except (redis.RedisError, ValueError) as e:
+            logger.warning("퀴즈 상세 캐시 조회 실패", quiz_id=quiz_id, error=str(e))
+            return None, None
+        hit = bool(entry.get("at") == str(version) and entry.get("etag") and entry.get("body"))
+        metrics.cache_event("quiz_detail", hit)
+        return version, CachedQuizDetail(etag=entry["etag"], body=entry["body"]) if hit else None
+
+    async def save(self, quiz_id: int, version: int, body: str) -> CachedQuizDetail:
+        cached = CachedQuizDetail(etag=self.make_etag(quiz_id, version, body), body=body)
+        key = self._key(quiz_id)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={"at": version, "etag": cached.etag, "body": cached.body})
+                pipe.expire(key, settings.QUIZ_DETAIL_CACHE_TTL)
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("퀴즈 상세 캐시 저장 실패", quiz_id=quiz_id, error=str(e))
+        return cached
+
+    async def invalidate(self, quiz_id: int) -> None:
+        """제출/저장 후 호출: 버전을 올려 이전 응답(과 ETag)을 모두 무효화"""
+        key = self._key(quiz_id)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hincrby(key, "ver", 1)
+                pipe.expire(key, settings.QUIZ_DETAIL_CACHE_TTL)
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("퀴즈 상세 캐시 무효화 실패", quiz_id=quiz_id, error=str(e))
+
+
+quiz_detail_cache = QuizDetailCache()
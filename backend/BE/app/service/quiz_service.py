@@ -1,20 +1,30 @@
+import asyncio
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
+from sqlalchemy import update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.exception.custom_exceptions import APIException
 from app.exception.error_code import Error
-from app.model.question import Question
 from app.model.quiz import Quiz
 from app.repository.quiz_repository import QuizRepository
+from app.service.job_coalescer import job_coalescer
+from app.service.job_estimator import job_estimator
+from app.service.quiz_detail_cache import CachedQuizDetail, quiz_detail_cache
+from app.service.task_status import task_status_reader
+from app.util.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+from app.schema.common import APIResponse
+from app.schema.job import JobEstimateResponse, TaskStatusResponse
 from app.schema.quiz import (
     QuestionItem,
     QuestionResponse,
     QuizDetailResponse,
     QuizFileResponse,
     QuizItem,
+    QuizListResponse,
+    QuizRetryResponse,
     QuizSaveResponse,
     QuizSubmitItem,
     QuizSubmitQuestionItem,
@@ -28,18 +38,30 @@ class QuizService:
     def __init__(self):
         self.quiz_repo = QuizRepository()
 
-    # 사용자의 노트 목록 조회
-    async def get_user_quizzes(self, db: AsyncSession, user_id: int) -> List[QuizItem]:
-        quizzes = await self.quiz_repo.get_quizzes(db, user_id)
+    # 사용자의 노트 목록 조회 (cursor가 있으면 그 다음 페이지)
+    async def get_user_quizzes(
+        self, db: AsyncSession, user_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ) -> QuizListResponse:
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)
+            if after is None:
+                raise APIException(400, Error.QUIZ_INVALID_CURSOR)
 
-        return [
-            QuizItem(
-                quiz_id=quiz.quiz_id,
-                title=quiz.title,
-                is_saved=quiz.is_saved
-            )
-            for quiz in quizzes
-        ]
+        rows, has_more = await self.quiz_repo.get_quizzes(db, user_id, limit, after)
+
+        last = rows[-1] if rows else None
+        return QuizListResponse(
+            data=[
+                QuizItem(
+                    quiz_id=row.quiz_id,
+                    title=row.title,
+                    is_saved=row.is_saved
+                )
+                for row in rows
+            ],
+            next_cursor=encode_cursor(last.created_at, last.quiz_id) if has_more else None,
+        )
     
     # 노트 상세 정보 조회
     async def get_quiz_detail(self, db: AsyncSession, quiz_id: int) -> QuizDetailResponse:
@@ -49,25 +71,7 @@ class QuizService:
             if not quiz:
                 return None
             
-            return QuizDetailResponse(
-                quiz_id=quiz.quiz_id,
-                total_questions=quiz.total_questions,
-                correct_number=quiz.correct_number,
-                created_at=quiz.created_at.isoformat(),
-                questions=[
-                    QuestionResponse(
-                        question_number=q.question_number,
-                        question_text=q.question_text,
-                        question_type=q.question_type,
-                        choices=q.choices or [],
-                        correct_answer=int(q.correct_answer) if q.question_type == "MULTIPLE" else q.correct_answer,
-                        user_answer=int(q.user_answer) if q.question_type == "MULTIPLE" and q.user_answer else q.user_answer,
-                        is_correct=q.is_correct,
-                        explanation=q.explanation or ""
-                    )
-                    for q in quiz.questions
-                ]
-            )
+            return self._to_detail_response(quiz)
         
         except Exception as e:
             print("=" * 60)
@@ -80,6 +84,111 @@ class QuizService:
             print("=" * 60)
             raise
     
+    @staticmethod
+    def _to_detail_response(quiz: Quiz) -> QuizDetailResponse:
+        return QuizDetailResponse(
+            quiz_id=quiz.quiz_id,
+            total_questions=quiz.total_questions,
+            correct_number=quiz.correct_number,
+            created_at=quiz.created_at.isoformat(),
+            questions=[
+                QuestionResponse(
+                    question_number=q.question_number,
+                    question_text=q.question_text,
+                    question_type=q.question_type,
+                    choices=q.choices or [],
+                    correct_answer=int(q.correct_answer) if q.question_type == "MULTIPLE" else q.correct_answer,
+                    user_answer=int(q.user_answer) if q.question_type == "MULTIPLE" and q.user_answer else q.user_answer,
+                    is_correct=q.is_correct,
+                    explanation=q.explanation or ""
+                )
+                for q in quiz.questions
+            ]
+        )
+
+    # 퀴즈 상세 응답 (Redis read-through 캐시, 제출/저장 시 무효화)
+    # 캐시에 있으면 DB를 거치지 않고 직렬화된 응답을 그대로 돌려준다.
+    async def get_quiz_detail_cached(self, db: AsyncSession, quiz_id: int) -> Optional[CachedQuizDetail]:
+        version, cached = await quiz_detail_cache.lookup(quiz_id)
+        if cached:
+            return cached
+
+        quiz = await self.quiz_repo.get_quiz_by_id(db, quiz_id)
+        if not quiz:
+            return None
+        detail = self._to_detail_response(quiz)
+        body = APIResponse[QuizDetailResponse](
+            status=200,
+            message="문제 내용 조회 성공",
+            data=detail
+        ).model_dump_json(by_alias=True)
+
+        # 생성 중/실패한 퀴즈는 문제가 바뀔 수 있으므로 저장하지 않음
+        if version is None or quiz.status != "COMPLETED":
+            return CachedQuizDetail(etag=quiz_detail_cache.make_etag(quiz_id, version or 0, body), body=body)
+        return await quiz_detail_cache.save(quiz_id, version, body)
+
+    async def _start_or_join(
+        self,
+        db: AsyncSession,
+        quiz_id: int,
+        user_id: int,
+        include_short_answer: bool,
+        files: Optional[List[str]] = None,
+        url: Optional[str] = None,
+        file_digests: Optional[List[str]] = None
+    ) -> Tuple[str, dict]:
+        """
+        같은 입력 + 같은 옵션의 퀴즈 생성이 진행 중이면 그 task_id에 합류하고, 없으면 새 파이프라인 시작.
+        합류한 퀴즈(quiz_id)에는 리더 작업의 finalize 단계에서 같은 문제가 저장된다.
+        반환: (상태 조회용 task_id, 사전 추정치)
+        """
+        from app.tasks.pipeline import start_quiz_pipeline
+
+        estimate = (await asyncio.to_thread(job_estimator.estimate, files, url)).to_dict()
+
+        if files:
+            # 업로드 때 계산한 해시가 있으면 파일을 다시 읽지 않음
+            if file_digests:
+                digest = job_coalescer.digest_hashes(file_digests)
+            else:
+                digest = await asyncio.to_thread(job_coalescer.digest_files, files)
+            key = job_coalescer.make_key("quiz", digest, include_short_answer=include_short_answer)
+        else:
+            # Canvas 강의는 수강 권한이 사용자마다 다르므로 같은 사용자 요청끼리만 합침
+            digest = job_coalescer.digest_url(url)
+            key = job_coalescer.make_key(
+                "quiz", digest, include_short_answer=include_short_answer, user_id=user_id
+            )
+
+        # 합류/포기는 WATCH/MULTI 왕복이 있는 동기 Redis 호출, 중복 업로드 삭제는 파일 I/O라 이벤트 루프 밖에서
+        ticket = await asyncio.to_thread(
+            job_coalescer.join, key, {"user_id": user_id, "quiz_id": quiz_id}, files=files
+        )
+        if not ticket.is_leader:
+            await asyncio.to_thread(ticket.discard_duplicate_inputs, files)
+            await task_status_reader.add_owner(ticket.task_id, user_id)
+            return ticket.task_id, estimate
+
+        try:
+            # 스케줄러 대기열 등록은 Redis 락(최대 5초 대기)을 잡으므로 이벤트 루프 밖에서
+            task_id = await asyncio.to_thread(
+                start_quiz_pipeline,
+                quiz_id, user_id, include_short_answer, files=files, url=url,
+                task_id=ticket.task_id, coalesce_key=key, estimate=estimate
+            )
+            await task_status_reader.add_owner(task_id, user_id)
+            return task_id, estimate
+        except Exception:
+            waiters = await asyncio.to_thread(job_coalescer.abandon, key, ticket.task_id)
+            waiter_quiz_ids = [w["quiz_id"] for w in waiters if w.get("quiz_id")]
+            if waiter_quiz_ids:
+                await db.execute(
+                    update(Quiz).where(Quiz.quiz_id.in_(waiter_quiz_ids)).values(status="FAILED")
+                )
+                await db.commit()
+            raise
+
     # pdf로 퀴즈 생성
     async def create_quiz_file(
         self, 
@@ -87,10 +196,9 @@ class QuizService:
         user_id: int, 
         files: List[str], 
         include_short_answer: bool, 
-        total_questions: int
+        total_questions: int,
+        file_digests: Optional[List[str]] = None
     ) -> QuizFileResponse:
-
-        from app.tasks.quiz_tasks import generate_quiz_task
     
         if not files:
             raise APIException(400, Error.FILE_NOT_FOUND)
@@ -111,18 +219,20 @@ class QuizService:
             await db.commit()
             await db.refresh(new_quiz)
             
-            # Celery 작업 시작
-            task = generate_quiz_task.apply_async(
-                args=[new_quiz.quiz_id, user_id, files, include_short_answer]
+            # Celery 파이프라인 시작 (동일 요청이 진행 중이면 합류)
+            task_id, estimate = await self._start_or_join(
+                db, new_quiz.quiz_id, user_id, include_short_answer, files=files,
+                file_digests=file_digests
             )
             
             return QuizFileResponse(
                 quiz_id=new_quiz.quiz_id,
-                task_id=task.id,
+                task_id=task_id,
                 status="PROCESSING",
                 total_questions=0,
                 created_at=datetime.now().strftime("%Y-%m-%d"),
-                questions=[]
+                questions=[],
+                estimate=JobEstimateResponse.from_estimate(estimate)
             )
     
         except APIException:
@@ -209,7 +319,6 @@ class QuizService:
         """
         Canvas URL로 퀴즈 생성 (Celery 비동기)
         """
-        from app.tasks.quiz_tasks import generate_quiz_from_url_task
         
         if not url:
             raise APIException(400, Error.URL_NOT_FOUND)
@@ -227,98 +336,26 @@ class QuizService:
         await db.commit()
         await db.refresh(new_quiz)
         
-        # 2. Celery 작업 시작
-        task = generate_quiz_from_url_task.apply_async(
-            args=[new_quiz.quiz_id, user_id, url, include_short_answer]
+        # 2. Celery 파이프라인 시작 (동일 요청이 진행 중이면 합류)
+        task_id, estimate = await self._start_or_join(
+            db, new_quiz.quiz_id, user_id, include_short_answer, url=url
         )
         
         # 3. 즉시 반환
         return QuizUrlResponse(
             quiz_id=new_quiz.quiz_id,
-            task_id=task.id,  # ✅ task_id 추가
+            task_id=task_id,  # ✅ task_id 추가
             status="PROCESSING",
             total_questions=0,
             created_at=datetime.now().strftime("%Y-%m-%d"),
-            questions=[]
+            questions=[],
+            estimate=JobEstimateResponse.from_estimate(estimate)
         )
     
-    async def get_task_status(self, task_id: str):
-        """Celery 작업 상태 확인"""
-        from celery.exceptions import TimeLimitExceeded, TimeoutError
-        from celery.result import AsyncResult
+    async def get_task_status(self, task_id: str) -> TaskStatusResponse:
+        """Celery 작업 상태 확인 (Redis 비동기 조회, app/service/task_status.py)"""
+        return await task_status_reader.read(task_id)
 
-        from app.celery_config import celery_app
-        
-        task = AsyncResult(task_id, app=celery_app)
-        
-        try:
-            # 작업 완료 여부 확인
-            if task.ready():
-                # 성공적으로 완료된 경우
-                if task.successful():
-                    result = task.result
-                    # result가 dict인지 확인
-                    if isinstance(result, dict):
-                        return {
-                            "status": result.get('status', 'COMPLETED'),
-                            "quiz_id": result.get('quiz_id'),
-                            "total_questions": result.get('total_questions'),
-                            "progress": 100
-                        }
-                    else:
-                        return {
-                            "status": "COMPLETED",
-                            "progress": 100,
-                            "message": str(result)
-                        }
-                # 실패한 경우
-                else:
-                    # task.info는 예외 객체일 수 있음
-                    error_info = task.info
-                    error_message = str(error_info) if error_info else "Unknown error"
-                    
-                    return {
-                        "status": "FAILED",
-                        "error": error_message,
-                        "progress": 0
-                    }
-            
-            # 아직 진행 중인 경우
-            else:
-                info = task.info or {}
-                
-                # info가 dict가 아닌 경우 (예외 객체 등)
-                if not isinstance(info, dict):
-                    return {
-                        "status": "PROCESSING",
-                        "progress": 0,
-                        "message": "처리 중..."
-                    }
-                
-                return {
-                    "status": "PROCESSING",
-                    "progress": info.get('progress', 0),
-                    "message": info.get('status', '처리 중...')
-                }
-        
-        except (TimeoutError, TimeLimitExceeded) as e:
-            return {
-                "status": "FAILED",
-                "error": f"작업 시간 초과: {str(e)}",
-                "progress": 0
-            }
-        
-        except Exception as e:
-            print(f"🔥 get_task_status Error: {type(e).__name__}: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            
-            return {
-                "status": "UNKNOWN",
-                "error": f"상태 조회 실패: {str(e)}",
-                "progress": 0
-            }
-        
     # 문제 저장
     async def save_quiz_answers(
         self,
@@ -341,6 +378,7 @@ class QuizService:
             
             if not saved_quiz:
                 raise APIException(500, Error.QUIZ_INTERNAL_ERROR)
+            await quiz_detail_cache.invalidate(quiz_id)
 
             return QuizSaveResponse(
                 quiz_id=saved_quiz.quiz_id,
@@ -359,6 +397,62 @@ class QuizService:
             raise APIException(500, Error.QUIZ_INTERNAL_ERROR)
 
 
+    # 실패한 퀴즈 생성 재시도 (완료된 단계는 건너뛰고 첫 미완료 단계부터)
+    async def retry_quiz(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        quiz_id: int
+    ) -> QuizRetryResponse:
+
+        from app.tasks.pipeline import load_manifest, quiz_job_id, resume_pipeline
+
+        quiz = await db.get(Quiz, quiz_id)
+        if not quiz or quiz.user_id != user_id:
+            raise APIException(404, Error.QUIZ_NOT_FOUND)
+
+        job_id = quiz_job_id(quiz_id, user_id)
+        manifest = await asyncio.to_thread(load_manifest, job_id)
+        if not manifest:
+            raise APIException(404, Error.JOB_NOT_FOUND)
+        if manifest.get("status") != "FAILED":
+            raise APIException(409, Error.JOB_NOT_RETRYABLE)
+
+        # 상태 확인과 변경을 UPDATE 한 번으로: 동시에 재시도해도 FAILED → PROCESSING은 한 요청만 성공
+        try:
+            claimed = await db.execute(
+                update(Quiz)
+                .where(Quiz.quiz_id == quiz_id, Quiz.user_id == user_id, Quiz.status == "FAILED")
+                .values(status="PROCESSING")
+                .returning(Quiz.quiz_id)
+            )
+            claimed_id = claimed.scalar_one_or_none()
+            await db.commit()
+        except SQLAlchemyError as e:
+            print(f"🔥 Database Error: {str(e)}")
+            raise APIException(500, Error.DB_QUERY_ERROR)
+        if claimed_id is None:
+            raise APIException(409, Error.JOB_NOT_RETRYABLE)
+
+        # 매니페스트 파일/Redis 동기 I/O + 스케줄러 락 대기가 있으므로 이벤트 루프 밖에서
+        try:
+            task_id = await asyncio.to_thread(resume_pipeline, job_id)
+        except Exception:
+            # 선점 조건이 FAILED이므로 되돌려 두지 않으면 PROCESSING으로 남아 다시 재시도할 수 없음
+            await db.execute(
+                update(Quiz).where(Quiz.quiz_id == quiz_id).values(status="FAILED")
+            )
+            await db.commit()
+            raise
+        await task_status_reader.add_owner(task_id, user_id)
+
+        return QuizRetryResponse(
+            quiz_id=quiz_id,
+            task_id=task_id,
+            status="PROCESSING",
+            attempts=manifest.get("attempts", 1) + 1
+        )
+
     # 정답 제출
     async def submit_answer(
             self,
@@ -368,44 +462,32 @@ class QuizService:
     ) -> QuizSubmitResponse:
         
         try:
-            questions: List[Question] = await self.quiz_repo.submit_quiz(
+            # 채점은 저장과 함께 repository에서 한 번만 (app/util/grading.py)
+            questions, graded = await self.quiz_repo.submit_quiz(
                 db=db,
                 quiz_id=quiz_id,
                 answers=answers
             )
+            await quiz_detail_cache.invalidate(quiz_id)
 
-            total = len(questions)
-            correct_cnt = 0
-            graded_questions: List[QuizSubmitQuestionItem] = []
-
-            for q in questions:
-                if q.user_answer is None:
-                    is_correct = False
-                elif q.question_type == "MULTIPLE":
-                    is_correct = int(q.user_answer) == int(q.correct_answer)
-                else:
-                    is_correct = q.user_answer.strip().lower() == q.correct_answer.strip().lower()
-
-                if is_correct:
-                    correct_cnt += 1
-
-                graded_questions.append(
-                    QuizSubmitQuestionItem(
-                        question_number=q.question_number,
-                        question_text=q.question_text,
-                        question_type=q.question_type,
-                        choices=q.choices,
-                        correct_answer=q.correct_answer,
-                        user_answer=q.user_answer,
-                        is_correct=is_correct,
-                        explanation=q.explanation
-                    )
+            graded_questions: List[QuizSubmitQuestionItem] = [
+                QuizSubmitQuestionItem(
+                    question_number=q.question_number,
+                    question_text=q.question_text,
+                    question_type=q.question_type,
+                    choices=q.choices,
+                    correct_answer=q.correct_answer,
+                    user_answer=g.user_answer,
+                    is_correct=g.is_correct,
+                    explanation=q.explanation
                 )
+                for q, g in zip(questions, graded.answers)
+            ]
 
             return QuizSubmitResponse(
-                total_questions=total,
-                correct_number=correct_cnt,
-                score=int(correct_cnt / total * 100) if total > 0 else 0,
+                total_questions=graded.total,
+                correct_number=graded.correct_number,
+                score=graded.score,
                 created_at=datetime.now().isoformat(),
                 questions=graded_questions
             )
@@ -0,0 +1,227 @@
+# app/service/task_events.py
+"""
+작업 상태 푸시 (SSE / long-poll)
+
+- Celery 쪽: 진행률 기록, 실패/재시도 결과 저장, finalize 완료 직후 task:events:{task_id} 채널에 알림만 PUBLISH
+  (상태 자체는 기존처럼 결과 백엔드에 있고, 알림 내용은 보지 않는다)
+- API 쪽: 프로세스당 pub/sub 연결 하나(TaskEventHub)를 모든 클라이언트가 공유.
+  작업(task_id)마다 구독을 하나만 두고, 알림이 오면 상태를 한 번만 다시 읽어 기다리는 클라이언트 전부에게 넘긴다.
+  (클라이언트 N명이 같은 작업을 보고 있어도 Redis 구독 1개, 변경당 상태 조회 1번)
+- 알림이 없는 변화(스케줄러 대기 순번 등)와 재연결 중 놓친 알림은 heartbeat 때 오래된 상태를 다시 읽어 보정한다.
+"""
+import asyncio
+import contextlib
+import hashlib
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.redis import get_async_redis, get_redis
+from app.schema.job import TaskStatusResponse
+from app.service.task_status import task_status_reader
+from app.util.http_cache import etag_matches
+
+CHANNEL_PREFIX = "task:events:"
+TERMINAL_STATUSES = ("COMPLETED", "FAILED")
+_LISTEN_TIMEOUT = 0.25         # 새로 구독할 채널을 반영하는 최대 지연
+# 프록시(nginx)가 이벤트를 모아 두지 않도록
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+_MAX_BACKOFF = 30
+
+logger = get_logger(__name__)
+
+
+def channel(task_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{task_id}"
+
+
+def publish_task_event(task_id: str, event: str = "changed") -> None:
+    """상태가 바뀌었다는 알림 (Celery 워커에서 동기 호출, 실패해도 작업에는 영향 없음)"""
+    try:
+        get_redis().publish(channel(task_id), event)
+    except redis.RedisError as e:
+        logger.debug("작업 상태 알림 실패", task_id=task_id, error=str(e))
+
+
+def status_etag(status: Dict[str, Any]) -> str:
+    raw = json.dumps(status, sort_keys=True, ensure_ascii=False, default=str)
+    return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]}"'
+
+
+def is_terminal(status: Dict[str, Any]) -> bool:
+    return status.get("status") in TERMINAL_STATUSES
+
+
+class _Topic:
+    """작업 하나의 최신 상태 + 변경 대기 (같은 작업을 보는 클라이언트들이 공유)"""
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.refs = 0
+        self.status: Optional[Dict[str, Any]] = None
+        self.etag: Optional[str] = None
+        self.version = 0
+        self.loaded_at = 0.0
+        self._changed = asyncio.Condition()
+        self._refreshing: Optional[asyncio.Task] = None
+        self._dirty = False
+
+    def refresh(self) -> asyncio.Task:
+        """상태 다시 읽기 예약. 이미 읽는 중이면 끝난 뒤 한 번 더 읽는다 (알림이 몰려도 조회는 최대 2번)"""
+        if self._refreshing is not None and not self._refreshing.done():
+            self._dirty = True
+        else:
+            self._refreshing = asyncio.create_task(self._refresh())
+        return self._refreshing
+
+    def refresh_if_stale(self, max_age: float) -> None:
+        if time.monotonic() - self.loaded_at >= max_age:
+            self.refresh()
+
+    async def _refresh(self) -> None:
+        while True:
+            self._dirty = False
+            try:
+                await self._load()
+            except Exception as e:
+                logger.warning("작업 상태 조회 실패", task_id=self.task_id, error=str(e))
+            if not self._dirty:
+                return
+
+    async def _load(self) -> None:
+        # 알림을 받은 직후이므로 폴링용 캐시를 거치지 않고 새로 읽음
+        status = (await task_status_reader.read(self.task_id, fresh=True)).model_dump(by_alias=True)
+        self.loaded_at = time.monotonic()
+        etag = status_etag(status)
+        if etag == self.etag:
+            return
+        self.status, self.etag = status, etag
+        self.version += 1
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def current(self) -> Tuple[Dict[str, Any], str, int]:
+        if self.status is None:
+            await asyncio.shield(self.refresh())
+        if self.status is None:
+            # 첫 조회가 실패한 경우 (다음 알림/heartbeat 때 다시 시도)
+            return TaskStatusResponse(status="UNKNOWN").model_dump(by_alias=True), '""', self.version
+        return self.status, self.etag, self.version
+
+    async def wait_changed(self, version: int, timeout: float) -> bool:
+        """version 이후 상태가 바뀌면 True, timeout이 지나면 False"""
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait_for(lambda: self.version != version), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+
+class TaskEventHub:
+    """
+    API 프로세스 공용 pub/sub 구독자.
+    구독/해지는 리더 코루틴 하나에서만 하고(연결 하나를 여러 코루틴이 동시에 쓰지 않도록),
+    새 채널을 구독한 직후에는 그 사이 놓쳤을 수 있는 변경을 위해 상태를 한 번 다시 읽는다.
+    """
+
+    def __init__(self):
+        self._topics: Dict[str, _Topic] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    @contextlib.asynccontextmanager
+    async def watch(self, task_id: str) -> AsyncIterator[_Topic]:
+        topic = self._topics.get(task_id)
+        if topic is None:
+            topic = self._topics[task_id] = _Topic(task_id)
+        topic.refs += 1
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._listen())
+        try:
+            yield topic
+        finally:
+            topic.refs -= 1
+            if topic.refs == 0 and self._topics.get(task_id) is topic:
+                del self._topics[task_id]
+
+    async def _sync_channels(self, pubsub, subscribed: set) -> None:
+        wanted = set(self._topics)
+        added, removed = wanted - subscribed, subscribed - wanted
+        if added:
+            await pubsub.subscribe(*(channel(task_id) for task_id in added))
+            subscribed |= added
+            for task_id in added:
+                topic = self._topics.get(task_id)
+                if topic is not None:
+                    topic.refresh()
+        if removed:
+            await pubsub.unsubscribe(*(channel(task_id) for task_id in removed))
+            subscribed -= removed
+
+    async def _listen(self) -> None:
+        backoff = 1
+        while self._topics:
+            pubsub = get_async_redis().pubsub(ignore_subscribe_messages=True)
+            subscribed: set = set()
+            try:
+                while self._topics:
+                    await self._sync_channels(pubsub, subscribed)
+                    message = await pubsub.get_message(timeout=_LISTEN_TIMEOUT)
+                    if message and message.get("type") == "message":
+                        topic = self._topics.get(message["channel"][len(CHANNEL_PREFIX):])
+                        if topic is not None:
+                            topic.refresh()
+                    backoff = 1
+            except (redis.RedisError, OSError) as e:
+                logger.warning("작업 상태 구독 끊김 → 재연결", error=str(e), retry_in=backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF)
+                # 끊긴 동안의 알림은 받지 못했으므로 전부 다시 읽음
+                for topic in list(self._topics.values()):
+                    topic.refresh()
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    # ---------- 엔드포인트용 ----------
+    async def stream(self, task_id: str) -> AsyncIterator[str]:
+        """
+        SSE 본문: 상태가 바뀔 때마다 `event: status`, 변화가 없으면 주기적으로 주석 줄(연결 유지).
+        COMPLETED/FAILED를 보내면 끝낸다.
+        """
+        keepalive = settings.TASK_EVENTS_KEEPALIVE_SEC
+        async with self.watch(task_id) as topic:
+            status, _, version = await topic.current()
+            while True:
+                yield f"id: {version}\nevent: status\ndata: {json.dumps(status, ensure_ascii=False, default=str)}\n\n"
+                if is_terminal(status):
+                    return
+                while not await topic.wait_changed(version, keepalive):
+                    yield ": keep-alive\n\n"
+                    topic.refresh_if_stale(keepalive)
+                status, _, version = await topic.current()
+
+    async def wait(
+        self, task_id: str, if_none_match: Optional[str], timeout: float
+    ) -> Tuple[Dict[str, Any], str, bool]:
+        """
+        long-poll: 현재 상태의 ETag가 If-None-Match와 다르면 바로, 같으면 바뀔 때까지(최대 timeout초) 기다린다.
+        반환: (상태, ETag, 바뀌었는지)
+        """
+        async with self.watch(task_id) as topic:
+            status, etag, version = await topic.current()
+            if not etag_matches(if_none_match, etag) or is_terminal(status):
+                return status, etag, True
+            # 다른 클라이언트와 공유 중이라 오래된 상태면 알림 없이 바뀌는 값(대기 순번 등)을 위해 다시 읽음
+            topic.refresh_if_stale(settings.TASK_EVENTS_KEEPALIVE_SEC)
+            if await topic.wait_changed(version, timeout):
+                status, etag, _ = await topic.current()
+                return status, etag, True
+            return status, etag, False
+
+
+task_event_hub = TaskEventHub()
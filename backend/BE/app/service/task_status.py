@@ -0,0 +1,174 @@
+# app/service/task_status.py
+"""
+노트/퀴즈 생성 작업 상태 조회 (상태 조회 API, SSE/long-poll 공용)
+
+- AsyncResult(ready/successful/result/info)는 속성마다 동기 Redis 조회라 이벤트 루프를 막으므로,
+  비동기 Redis 클라이언트로 Celery 결과 키(celery-task-meta-{task_id})와 스케줄러 매핑(sched:task:{task_id})을
+  파이프라인 한 번에 읽는다. 스케줄러 대기열에 있을 때만 대기 순번을 추가로 조회.
+- 같은 task_id를 동시에 폴링하면 진행 중인 조회 하나에 합류하고, 결과는 TASK_STATUS_CACHE_TTL초 동안 메모리에 둔다.
+- 응답은 노트/퀴즈 공통 TaskStatusResponse (해당 없는 필드는 null)
+- 작업을 요청하거나 합류한 사용자를 task:owners:{task_id}에 기록해 두고, 상태 구독(SSE/long-poll)은 이 사용자에게만 허용
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.redis import get_async_redis
+from app.exception.custom_exceptions import APIException
+from app.exception.error_code import Error
+from app.schema.job import TaskStatusResponse
+from app.service.job_scheduler import job_scheduler
+
+logger = get_logger(__name__)
+
+_READY_STATES = ("SUCCESS", "FAILURE", "REVOKED")
+OWNERS_PREFIX = "task:owners:"
+
+
+class TaskStatusReader:
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = 10000,
+                 client: Optional[aioredis.Redis] = None):
+        self.ttl = settings.TASK_STATUS_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries
+        self._client = client
+        # task_id → (만료 시각, 상태)
+        self._cache: Dict[str, Tuple[float, TaskStatusResponse]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def client(self) -> aioredis.Redis:
+        if self._client is None:
+            self._client = get_async_redis()
+        return self._client
+
+    @property
+    def backend(self):
+        from app.celery_config import celery_app
+
+        return celery_app.backend
+
+    # ---------- 조회 ----------
+    async def read(self, task_id: str, fresh: bool = False) -> TaskStatusResponse:
+        """
+        작업 상태 반환. fresh=True면 캐시를 건너뛰고 새로 읽는다 (상태 변경 알림을 받은 직후, app/service/task_events.py).
+        조회에 실패해도 예외 대신 UNKNOWN 상태를 돌려준다.
+        """
+        if not fresh:
+            cached = self._cache.get(task_id)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+            pending = self._inflight.get(task_id)
+            if pending is not None:
+                return await asyncio.shield(pending)
+
+        future = asyncio.ensure_future(self._fetch(task_id))
+        self._inflight[task_id] = future
+        future.add_done_callback(lambda done: self._finish(task_id, done))
+        return await asyncio.shield(future)
+
+    def _finish(self, task_id: str, future: asyncio.Future) -> None:
+        if self._inflight.get(task_id) is future:
+            del self._inflight[task_id]
+        if future.cancelled() or future.exception() is not None or not self.ttl:
+            return
+        now = time.monotonic()
+        if len(self._cache) >= self.max_entries:
+            for key in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                del self._cache[key]
+            while len(self._cache) >= self.max_entries:
+                del self._cache[next(iter(self._cache))]
+        self._cache[task_id] = (now + self.ttl, future.result())
+
+    def invalidate(self, task_id: str) -> None:
+        self._cache.pop(task_id, None)
+
+    async def _fetch(self, task_id: str) -> TaskStatusResponse:
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(self.backend.get_key_for_task(task_id))
+                pipe.get(job_scheduler.task_key(task_id))
+                raw, job_id = await pipe.execute()
+
+            meta = self.backend.decode_result(raw) if raw else None
+            state = meta.get("status") if meta else "PENDING"
+            result = meta.get("result") if meta else None
+
+            queued = None
+            # 아직 아무 단계도 시작하지 않았을 때만 (재시도 대기 결과도 progress 0) 대기열 확인
+            if job_id and state not in _READY_STATES and self._progress(result) == 0:
+                queued = await job_scheduler.queue_info_async(self.client, job_id)
+            return self._to_status(state, result, queued)
+        except Exception as e:
+            logger.warning("작업 상태 조회 실패", task_id=task_id, error=f"{type(e).__name__}: {e}")
+            return TaskStatusResponse(status="UNKNOWN", error=f"상태 조회 실패: {str(e)}")
+
+    # ---------- 소유자 ----------
+    async def add_owner(self, task_id: str, user_id: int) -> None:
+        """작업 요청/합류/재시도 시 호출 (합류한 작업은 task_id를 여러 사용자가 공유). 실패해도 작업은 계속"""
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.sadd(f"{OWNERS_PREFIX}{task_id}", user_id)
+                pipe.expire(f"{OWNERS_PREFIX}{task_id}", settings.TASK_OWNER_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("작업 소유자 기록 실패", task_id=task_id, user_id=user_id, error=str(e))
+
+    async def ensure_owner(self, task_id: str, user_id: int) -> None:
+        """다른 사용자의 작업이면 존재 여부도 드러내지 않도록 404"""
+        if not await self.client.sismember(f"{OWNERS_PREFIX}{task_id}", user_id):
+            raise APIException(404, Error.JOB_NOT_FOUND)
+
+    # ---------- 변환 ----------
+    @staticmethod
+    def _progress(result: Any) -> int:
+        return int(result.get("progress") or 0) if isinstance(result, dict) else 0
+
+    @staticmethod
+    def _to_status(state: str, result: Any, queued: Optional[Dict[str, int]]) -> TaskStatusResponse:
+        if state == "SUCCESS":
+            if not isinstance(result, dict):
+                return TaskStatusResponse(status="COMPLETED", progress=100, message=str(result))
+            # pipeline_failed도 SUCCESS 상태로 {"status": "FAILED", "error": ...}를 남긴다
+            status = result.get("status", "COMPLETED")
+            return TaskStatusResponse(
+                status=status,
+                progress=0 if status == "FAILED" else 100,
+                error=result.get("error"),
+                job_id=result.get("job_id"),
+                pdf_url=result.get("pdf_url"),
+                quiz_id=result.get("quiz_id"),
+                total_questions=result.get("total_questions"),
+            )
+
+        if state in _READY_STATES:
+            # result는 decode_result가 되살린 예외 객체
+            error = str(result) if result else "Unknown error"
+            if type(result).__name__ in ("TimeLimitExceeded", "TimeoutError"):
+                error = f"작업 시간 초과: {error}"
+            return TaskStatusResponse(status="FAILED", error=error)
+
+        if queued:
+            return TaskStatusResponse(
+                status="PROCESSING",
+                message=f"대기 중... (앞에 {queued['queue_position'] - 1}개)",
+                **queued
+            )
+
+        # PENDING / STARTED / PROCESSING(report_progress) / RETRY
+        if not isinstance(result, dict):
+            return TaskStatusResponse(status="PROCESSING", message="처리 중...")
+        return TaskStatusResponse(
+            status="PROCESSING",
+            progress=int(result.get("progress") or 0),
+            message=result.get("status", "처리 중..."),
+            stage=result.get("stage"),
+            eta_seconds=result.get("eta_seconds"),
+        )
+
+
+task_status_reader = TaskStatusReader()
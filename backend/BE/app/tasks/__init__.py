@@ -1,9 +1,7 @@
 # app/tasks/__init__.py
-from app.tasks.quiz_tasks import generate_quiz_task, generate_quiz_from_url_task
+from app.tasks.pipeline import start_note_pipeline, start_quiz_pipeline
 
 __all__ = [
-    'generate_quiz_task', 
-    'generate_quiz_from_url_task',
-    'generate_summary_task',
-    'generate_summary_from_url_task'
-]
\ No newline at end of file
+    'start_note_pipeline',
+    'start_quiz_pipeline',
+]
@@ -0,0 +1,89 @@
+# app/tasks/autoscale.py
+"""
+Celery 워커 지표/오토스케일 연동 (celery_config의 signal/worker_autoscaler에서 사용)
+
+- 태스크 실행 시간과 워커 프로세스 RSS를 app/service/metrics.py에 기록
+- QueueDepthAutoscaler: 기본 autoscaler는 워커가 이미 받아 둔 작업 수만 보므로
+  (worker_prefetch_multiplier=1이라 거의 늘지 않음) 브로커 큐 길이/단계 평균 실행 시간/RSS를 함께 본다.
+  사용: celery worker --autoscale=최대,최소
+- WORKER_METRICS_PORT가 있으면 워커에서도 같은 Prometheus 텍스트를 제공
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import redis
+from celery.worker import state
+from celery.worker.autoscale import Autoscaler
+
+from app.core.config import settings
+from app.service.metrics import metrics
+
+_HINT_REFRESH_SEC = 5.0
+
+
+def consumed_queues(app) -> List[str]:
+    """이 워커가 소비하는 큐 이름 (-Q 미지정 시 라우팅에 있는 모든 큐)"""
+    selected = app.amqp.queues.consume_from
+    if selected:
+        return sorted(selected)
+    return sorted({route["queue"] for route in app.conf.task_routes.values()} | {"celery"})
+
+
+class QueueDepthAutoscaler(Autoscaler):
+    """브로커 큐 길이를 반영한 autoscaler (정책은 metrics.desired_concurrency)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._hint = 0
+        self._hint_at = 0.0
+
+    @property
+    def qty(self):
+        reserved = len(state.reserved_requests)
+        now = time.monotonic()
+        # body()가 1초마다 호출되므로 Redis 조회는 몇 초에 한 번만
+        if now - self._hint_at >= _HINT_REFRESH_SEC:
+            self._hint_at = now
+            try:
+                lengths = metrics.queue_lengths()
+                self._hint = sum(
+                    metrics.autoscale_hint(queue, lengths.get(queue, 0))
+                    for queue in consumed_queues(self.worker.app)
+                    if lengths.get(queue, 0)
+                )
+            except redis.RedisError:
+                self._hint = 0
+        return reserved + self._hint
+
+
+def record_task_runtime(task, seconds: float, task_state: str) -> None:
+    metrics.observe_stage(task.name, seconds, task_state or "UNKNOWN")
+    metrics.report_worker_rss(task.request.hostname or "unknown", consumed_queues(task.app))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        if settings.METRICS_TOKEN and self.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}":
+            self.send_error(401)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int) -> None:
+    """워커 메인 프로세스에서 /metrics HTTP 서버를 백그라운드 스레드로 실행"""
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"📈 워커 지표 서버 시작: :{port}/metrics")
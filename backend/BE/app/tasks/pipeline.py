@@ -0,0 +1,269 @@
+# app/tasks/pipeline.py
+"""
+노트/퀴즈 생성 작업을 단계(stage) 태스크의 Celery chain으로 구성한다.
+
+- 단계 사이에는 작업 컨텍스트(dict)만 전달하고, 중간 산출물은 공유 작업 폴더(output_dir)에 둔다.
+- 마지막 단계(finalize)의 task_id를 미리 정해 클라이언트에 돌려주고,
+  앞 단계들은 이 task_id로 진행률을 기록한다. (기존 상태 조회 API 그대로 사용)
+- 어느 단계든 실패하면 pipeline_failed가 마지막 task_id에 FAILED 결과를 기록한다.
+- 상태가 바뀔 때마다 task:events:{task_id} 채널로 알림을 보낸다 (SSE/long-poll, app/service/task_events.py)
+
+재시도/재개:
+- 작업 폴더에 job.json(컨텍스트, 단계 목록, 상태)을 남기고, 각 단계는 끝나면 .stages/{단계}.json에 완료 기록을 남긴다.
+- resume_pipeline(job_id)는 같은 단계 목록으로 chain을 다시 만들되, 완료 기록이 있는 단계는 건너뛴다.
+  (페이지 요약 체크포인트/STT 캐시도 같은 작업 폴더·캐시 폴더에 있으므로 그대로 재사용됨)
+- 업로드 원본은 finalize에서만 지우므로 실패 후에도 다시 올릴 필요가 없다.
+"""
+import functools
+import json
+import os
+import re
+import time
+from typing import Callable, List, Optional, Tuple
+
+from celery import chain
+from celery.utils import uuid
+
+from app.celery_config import celery_app
+from app.core.config import settings
+from app.service.job_coalescer import job_coalescer
+from app.service.job_estimator import job_estimator
+from app.service.job_scheduler import job_scheduler
+from app.service.task_events import publish_task_event
+from app.tasks.progress import reset_progress
+
+
+class StageFatalError(Exception):
+    """재시도해도 결과가 같은 실패 (자동 재시도 대상에서 제외)"""
+
+
+@celery_app.task(name="pipeline.failed")
+def pipeline_failed(request, exc, traceback, ctx: dict):
+    """
+    chain의 link_error 콜백 (실패한 워커에서 동기로 호출됨)
+    대표 task_id에 기존과 같은 형태의 실패 결과를 남긴다.
+    """
+    print("=" * 60)
+    print(f"🔥 Pipeline Error [{ctx.get('job_id')}] at {getattr(request, 'task', '?')}: {exc}")
+    print("=" * 60)
+
+    error_data = {"status": "FAILED", "error": str(exc), "job_id": ctx.get("job_id")}
+    _update_manifest(ctx, status="FAILED", failed_stage=getattr(request, "task", None), error=str(exc))
+
+    job_scheduler.finish(ctx["job_id"])
+    waiters = job_coalescer.release(ctx.get("coalesce_key"), ctx["task_id"])
+
+    if ctx.get("kind") == "quiz":
+        from app.tasks.quiz_tasks import mark_quiz_failed
+
+        mark_quiz_failed(ctx["quiz_id"])
+        error_data["quiz_id"] = int(ctx["quiz_id"])
+        # 합류한 다른 퀴즈도 같은 결과(실패)로 정리
+        for waiter in waiters:
+            if waiter.get("quiz_id"):
+                mark_quiz_failed(waiter["quiz_id"])
+
+    # 업로드 원본은 재시도에 다시 쓰므로 지우지 않는다 (finalize 성공 시 정리)
+    celery_app.backend.store_result(ctx["task_id"], error_data, "SUCCESS")
+    publish_task_event(ctx["task_id"])
+
+
+# ========== 작업 매니페스트 / 단계 완료 기록 ==========
+
+def _manifest_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "job.json")
+
+
+def _marker_path(ctx: dict, stage: str) -> str:
+    return os.path.join(ctx["output_dir"], ".stages", f"{stage}.json")
+
+
+def _write_json_atomic(path: str, obj: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+_JOB_ID_RE = re.compile(r"^(note|quiz)_\d+_\d+$")
+
+
+def load_manifest(job_id: str) -> Optional[dict]:
+    # job_id는 URL에서 들어오므로 경로로 쓰기 전에 형식을 검사
+    if not _JOB_ID_RE.match(job_id or ""):
+        return None
+    return _read_json(_manifest_path(_job_dir(job_id)))
+
+
+def _save_manifest(ctx: dict, stages: List[str], final: str) -> None:
+    previous = _read_json(_manifest_path(ctx["output_dir"])) or {}
+    _write_json_atomic(_manifest_path(ctx["output_dir"]), {
+        "ctx": ctx,
+        "stages": stages,
+        "final": final,
+        "status": "PROCESSING",
+        "attempts": previous.get("attempts", 0) + 1,
+        "updated_at": int(time.time()),
+    })
+
+
+def _update_manifest(ctx: dict, **fields) -> None:
+    path = _manifest_path(ctx["output_dir"])
+    manifest = _read_json(path)
+    if manifest is None:
+        return
+    manifest.update(fields, updated_at=int(time.time()))
+    _write_json_atomic(path, manifest)
+
+
+def mark_job_completed(ctx: dict) -> None:
+    _update_manifest(ctx, status="COMPLETED", failed_stage=None, error=None)
+
+
+def resumable(fn: Callable) -> Callable:
+    """
+    단계 태스크 데코레이터: 완료 기록이 있으면 저장된 컨텍스트를 그대로 넘기고 건너뛴다.
+    끝까지 성공한 경우에만 완료 기록을 남긴다.
+    """
+    @functools.wraps(fn)
+    def wrapper(task, ctx: dict) -> dict:
+        done = _read_json(_marker_path(ctx, task.name))
+        if done is not None:
+            print(f"⏭️ [{ctx['job_id']}] {task.name} 완료 기록 있음 → 건너뜀")
+            return {**done, "task_id": ctx["task_id"]}
+
+        ctx = fn(task, ctx)
+        _write_json_atomic(_marker_path(ctx, task.name), ctx)
+        return ctx
+    return wrapper
+
+
+def _stage(name: str):
+    return celery_app.signature(name)
+
+
+def _build(ctx: dict, stages: List[str], final: str, priority: Optional[int] = None) -> Tuple[chain, str]:
+    ctx["task_id"] = ctx.get("task_id") or uuid()
+    steps = [_stage(stages[0]).clone(args=(ctx,))]
+    steps += [_stage(name) for name in stages[1:]]
+    steps.append(_stage(final).set(task_id=ctx["task_id"]))
+    if priority is not None:
+        # chain은 첫 태스크에만 옵션을 넘기므로 단계마다 우선순위를 지정
+        steps = [step.set(priority=priority) for step in steps]
+
+    flow = chain(*steps)
+    flow.link_error(pipeline_failed.s(ctx))
+    _save_manifest(ctx, stages, final)
+    return flow, ctx["task_id"]
+
+
+def _submit(ctx: dict, stages: List[str], final: str) -> str:
+    """chain을 만들어 작업 스케줄러 대기열에 넣음 (사용자별 동시 실행 제한/공정 분배는 job_scheduler)"""
+    if not ctx.get("estimate"):
+        ctx["estimate"] = job_estimator.estimate(files=ctx["files"], url=ctx["url"]).to_dict()
+    cost = ctx["estimate"]["wall_clock_sec"]
+    flow, task_id = _build(ctx, stages, final, priority=job_scheduler.priority_for(cost))
+    job_scheduler.submit(ctx, flow, cost)
+    return task_id
+
+
+def _job_dir(job_id: str) -> str:
+    return os.path.join(settings.SUMMARY_WORKDIR, f"job_{job_id}")
+
+
+def quiz_job_id(quiz_id: int, user_id: int) -> str:
+    return f"quiz_{quiz_id}_{user_id}"
+
+
+# 입력 종류별 단계 구성 (단계별 큐는 celery_config.task_routes 참고)
+PDF_STAGES = ["stage.prepare_pdf", "stage.rasterize", "stage.summarize_pages", "stage.aggregate"]
+VIDEO_STAGES = ["stage.download", "stage.analyze_media", "stage.transcribe", "stage.generate"]
+
+
+def start_note_pipeline(
+    user_id: int,
+    mode: str,
+    files: Optional[List[str]] = None,
+    url: Optional[str] = None,
+    task_id: Optional[str] = None,
+    coalesce_key: Optional[str] = None,
+    estimate: Optional[dict] = None,
+) -> str:
+    """
+    요약/빈칸 노트 파이프라인 시작. 반환: 상태 조회용 task_id
+    task_id/coalesce_key: 동일 요청 합치기(job_coalescer)에서 리더로 정해진 경우 전달
+    estimate: 서비스에서 미리 계산한 job_estimator 결과 (없으면 여기서 계산)
+    """
+    job_id = f"note_{user_id}_{int(time.time() * 1000)}"
+    ctx = {
+        "kind": "note",
+        "job_id": job_id,
+        "user_id": user_id,
+        "mode": mode,
+        "output_dir": _job_dir(job_id),
+        "files": files or [],
+        "url": url,
+        "task_id": task_id,
+        "coalesce_key": coalesce_key,
+        "estimate": estimate,
+    }
+    return _submit(ctx, VIDEO_STAGES if url else PDF_STAGES, "note.finalize")
+
+
+def start_quiz_pipeline(
+    quiz_id: int,
+    user_id: int,
+    include_short_answer: bool,
+    files: Optional[List[str]] = None,
+    url: Optional[str] = None,
+    task_id: Optional[str] = None,
+    coalesce_key: Optional[str] = None,
+    estimate: Optional[dict] = None,
+) -> str:
+    """퀴즈 파이프라인 시작. 반환: 상태 조회용 task_id (task_id/coalesce_key/estimate는 노트와 동일)"""
+    job_id = quiz_job_id(quiz_id, user_id)
+    ctx = {
+        "kind": "quiz",
+        "job_id": job_id,
+        "user_id": user_id,
+        "quiz_id": quiz_id,
+        "mode": "quiz",
+        "include_short_answer": include_short_answer,
+        "output_dir": _job_dir(job_id),
+        "files": files or [],
+        "url": url,
+        "task_id": task_id,
+        "coalesce_key": coalesce_key,
+        "estimate": estimate,
+    }
+    return _submit(ctx, VIDEO_STAGES if url else PDF_STAGES, "quiz.finalize")
+
+
+def resume_pipeline(job_id: str) -> str:
+    """
+    실패한 작업을 첫 번째 미완료 단계부터 다시 실행. 반환: 기존과 같은 task_id
+    (호출 전에 load_manifest로 존재/상태를 확인할 것)
+    """
+    manifest = load_manifest(job_id)
+    if manifest is None:
+        raise FileNotFoundError(f"작업 매니페스트가 없습니다: {job_id}")
+
+    ctx = manifest["ctx"]
+    reset_progress(ctx["task_id"])
+    # 클라이언트가 같은 task_id로 계속 폴링하므로 FAILED 결과를 먼저 덮어쓴다
+    celery_app.backend.store_result(
+        ctx["task_id"], {"progress": 0, "status": "재시도 대기 중..."}, "PROCESSING"
+    )
+    publish_task_event(ctx["task_id"])
+    task_id = _submit(ctx, manifest["stages"], manifest["final"])
+    print(f"🔁 작업 재시도: {job_id} (시도 {manifest.get('attempts', 1) + 1}회차)")
+    return task_id
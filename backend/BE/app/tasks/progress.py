@@ -0,0 +1,166 @@
+# app/tasks/progress.py
+"""
+파이프라인 진행률 기록.
+
+- 단계 태스크마다 전체 진행률(0~100) 구간을 정해 두고(STAGE_RANGES),
+  스크립트가 보내는 세부 진행 이벤트(scripts/progress.py → Redis Stream)를 그 구간 안의 값으로 옮긴다.
+- 진행률은 단조 증가만 한다: 재시도/단계 건너뛰기로 더 작은 값이 들어와도 이전 최댓값을 유지.
+- 남은 시간(eta_seconds)은 충분히 진행된 뒤에는 실제 경과 시간 비율로,
+  그 전에는 job_estimator 추정치(ctx["estimate"])로 계산한다.
+"""
+import time
+from typing import List, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.service.task_events import publish_task_event
+from app.util.subprocess_runner import RunResult, run_streaming
+
+# 단계 태스크 → 전체 진행률 구간 (finalize는 노트/퀴즈 공통 90~100)
+STAGE_RANGES = {
+    "stage.prepare_pdf": (0, 10),
+    "stage.rasterize": (10, 20),
+    "stage.summarize_pages": (20, 70),
+    "stage.aggregate": (70, 90),
+    "stage.download": (0, 25),
+    "stage.analyze_media": (25, 40),
+    "stage.transcribe": (40, 60),
+    "stage.generate": (60, 90),
+    "note.finalize": (90, 100),
+    "quiz.finalize": (90, 100),
+}
+
+STATE_TTL = 24 * 3600
+ETA_MIN_PROGRESS = 10        # 이보다 적게 진행됐으면 경과 시간 비율 대신 추정치 사용
+_READ_BLOCK_MS = 1000
+_READ_COUNT = 100
+
+
+def _state_key(task_id: str) -> str:
+    return f"progress:{task_id}:state"
+
+
+def stream_key(task_id: str, stage: str) -> str:
+    return f"progress:{task_id}:{stage}"
+
+
+def reset_progress(task_id: str) -> None:
+    """재시도 시 이전 시도의 최댓값/시작 시각을 지움"""
+    try:
+        get_redis().delete(_state_key(task_id))
+    except redis.RedisError:
+        pass
+
+
+def _estimate_eta(ctx: dict, progress: int, elapsed: float) -> Optional[int]:
+    if progress >= 100:
+        return 0
+    if progress >= ETA_MIN_PROGRESS and elapsed > 0:
+        return int(elapsed * (100 - progress) / progress)
+    wall = (ctx.get("estimate") or {}).get("wall_clock_sec")
+    if wall:
+        return int(max(0.0, wall * (100 - progress) / 100, wall - elapsed))
+    return None
+
+
+def report_progress(task, ctx: dict, progress: float, status: str) -> None:
+    """단계 태스크의 진행률을 파이프라인 대표 task_id에 기록 (단조 증가 + 남은 시간 추정)"""
+    progress = int(progress)
+    meta = {"progress": progress, "status": status, "stage": task.name, "eta_seconds": None}
+    try:
+        client = get_redis()
+        key = _state_key(ctx["task_id"])
+        pipe = client.pipeline()
+        pipe.hsetnx(key, "started_at", time.time())
+        pipe.hget(key, "max")
+        pipe.hget(key, "started_at")
+        _, previous, started_at = pipe.execute()
+
+        progress = max(progress, int(previous or 0))
+        pipe = client.pipeline()
+        pipe.hset(key, "max", progress)
+        pipe.expire(key, STATE_TTL)
+        pipe.execute()
+
+        meta["progress"] = progress
+        meta["eta_seconds"] = _estimate_eta(ctx, progress, time.time() - float(started_at or time.time()))
+    except redis.RedisError:
+        # 단조 보장/ETA 없이 그대로 기록
+        pass
+
+    task.update_state(task_id=ctx["task_id"], state="PROCESSING", meta=meta)
+    publish_task_event(ctx["task_id"])
+
+
+def report_stage_progress(task, ctx: dict, fraction: float, status: str) -> None:
+    """현재 단계 안에서의 진행 비율(0~1)을 전체 진행률로 환산해 기록"""
+    low, high = STAGE_RANGES.get(task.name, (0, 100))
+    fraction = min(1.0, max(0.0, fraction))
+    report_progress(task, ctx, low + (high - low) * fraction, status)
+
+
+def _relay(task, ctx: dict, client: redis.Redis, stream: str, last_id: str, block_ms: Optional[int]) -> str:
+    """스트림에서 새 이벤트를 읽어 가장 최근 것 하나만 진행률로 기록. 반환: 마지막으로 읽은 ID"""
+    entries = client.xread({stream: last_id}, count=_READ_COUNT, block=block_ms)
+    events: List[Tuple[str, dict]] = entries[0][1] if entries else []
+    if not events:
+        return last_id
+
+    last_id, event = events[-1]
+    current, total = int(event.get("current") or 0), int(event.get("total") or 0)
+    fraction = current / total if total else 0.0
+    message = event.get("message") or event.get("step", "")
+    report_stage_progress(task, ctx, fraction, message)
+    return last_id
+
+
+def run_with_progress(task, ctx: dict, cmd: List[str], env: dict, timeout: int, label: str,
+                      status: Optional[str] = None) -> RunResult:
+    """
+    스크립트를 실행하고 끝날 때까지 기다리면서 진행 이벤트를 전달 (출력 처리는 app/util/subprocess_runner.py)
+    - scripts/progress.py가 보내는 Redis Stream 이벤트
+    - tqdm 진행 줄 (Canvas 다운로더처럼 progress.py를 쓰지 않는 스크립트) → status와 함께 기록
+    Redis를 쓸 수 없으면 스트림 이벤트 없이 기다리기만 한다.
+    """
+    stream = stream_key(ctx["task_id"], task.name)
+    env = {
+        **env,
+        "PROGRESS_STREAM": stream,
+        "REDIS_HOST": settings.REDIS_HOST,
+        "REDIS_PORT": str(settings.REDIS_PORT),
+        "PYTHONUNBUFFERED": "1",        # print/tqdm 줄이 블록 단위로 몰려 오지 않게
+    }
+
+    state = {"client": get_redis(), "last_id": "0-0"}
+    try:
+        state["client"].delete(stream)       # 이전 시도에서 남은 이벤트
+    except redis.RedisError:
+        state["client"] = None
+
+    def relay(block_ms: Optional[int] = _READ_BLOCK_MS):
+        client = state["client"]
+        if client is None:
+            time.sleep(_READ_BLOCK_MS / 1000)
+            return
+        try:
+            state["last_id"] = _relay(task, ctx, client, stream, state["last_id"], block_ms)
+        except redis.RedisError as e:
+            print(f"⚠️ 진행률 스트림 읽기 실패 → 진행률 없이 대기: {e}")
+            state["client"] = None
+
+    def on_progress(fraction: float, _line: str):
+        report_stage_progress(task, ctx, fraction, f"{status or label} ({int(fraction * 100)}%)")
+
+    result = run_streaming(cmd, env, timeout, label, on_progress=on_progress, on_tick=relay)
+
+    # 종료 직전에 보낸 이벤트까지 반영
+    if state["client"] is not None:
+        relay(block_ms=None)
+    if state["client"] is not None:
+        try:
+            state["client"].delete(stream)
+        except redis.RedisError:
+            pass
+    return result
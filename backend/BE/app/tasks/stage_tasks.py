@@ -0,0 +1,285 @@
+# app/tasks/stage_tasks.py
+"""
+노트/퀴즈 파이프라인의 공통 단계 태스크 (app/tasks/pipeline.py 참고)
+각 단계는 작업 컨텍스트(dict)를 받아 산출물 경로를 추가한 뒤 다음 단계로 넘긴다.
+일시적인 실패(LLM 429, 네트워크 등)는 해당 단계만 자동 재시도하고, 완료된 단계는 재실행 시 건너뛴다.
+"""
+import os
+import shutil
+import sys
+from typing import Dict, List, Optional
+
+from PyPDF2 import PdfMerger
+
+from app.celery_config import celery_app
+from app.core.config import settings
+from app.db.sync_session import task_session
+from app.model.user import User
+from app.service.canvas_session_cache import canvas_session_cache
+from app.service.job_estimator import job_estimator
+from app.service.metrics import metrics
+from app.tasks.pipeline import StageFatalError, resumable
+from app.tasks.progress import report_progress, run_with_progress
+
+# 단계 자동 재시도 (chain 안에서 같은 단계만 다시 실행, 최종 실패 시에만 pipeline_failed 호출)
+STAGE_RETRY = dict(
+    autoretry_for=(Exception,),
+    dont_autoretry_for=(StageFatalError, FileNotFoundError),
+    max_retries=settings.STAGE_MAX_RETRIES,
+    retry_backoff=settings.STAGE_RETRY_BACKOFF,
+    retry_backoff_max=600,
+    retry_jitter=True,
+)
+
+
+# ========== PDF 입력 ==========
+
+@celery_app.task(bind=True, name="stage.prepare_pdf", **STAGE_RETRY)
+@resumable
+def prepare_pdf_stage(self, ctx: dict) -> dict:
+    """업로드 파일을 작업 폴더의 단일 입력 PDF로 준비 (여러 개면 병합)"""
+    report_progress(self, ctx, 0, "PDF 병합 중...")
+    os.makedirs(ctx["output_dir"], exist_ok=True)
+
+    files = ctx["files"]
+    pdf_input = os.path.join(ctx["output_dir"], "input.pdf")
+    if len(files) > 1:
+        _merge_pdfs_sync(files, pdf_input)
+    else:
+        shutil.copyfile(files[0], pdf_input)
+
+    ctx["pdf_input"] = pdf_input
+    return ctx
+
+
+@celery_app.task(bind=True, name="stage.rasterize", **STAGE_RETRY)
+@resumable
+def rasterize_stage(self, ctx: dict) -> dict:
+    report_progress(self, ctx, 10, "PDF 페이지 변환 중...")
+    _run_pdf_stage(self, ctx, "pages")
+    return ctx
+
+
+@celery_app.task(bind=True, name="stage.summarize_pages", **STAGE_RETRY)
+@resumable
+def summarize_pages_stage(self, ctx: dict) -> dict:
+    report_progress(self, ctx, 20, "GPT API로 페이지 요약 중...")
+    _run_pdf_stage(self, ctx, "summarize")
+    return ctx
+
+
+@celery_app.task(bind=True, name="stage.aggregate", **STAGE_RETRY)
+@resumable
+def aggregate_stage(self, ctx: dict) -> dict:
+    status = "GPT API로 문제 생성 중..." if ctx["kind"] == "quiz" else "GPT API로 변환 중..."
+    report_progress(self, ctx, 70, status)
+    _run_pdf_stage(self, ctx, "aggregate")
+    ctx["result_path"] = _find_result(ctx)
+    return ctx
+
+
+# ========== Canvas 동영상 입력 ==========
+
+@celery_app.task(bind=True, name="stage.download", **STAGE_RETRY)
+@resumable
+def download_stage(self, ctx: dict) -> dict:
+    report_progress(self, ctx, 5, "사용자 정보 조회 중...")
+    canvas_id, canvas_pw = _load_canvas_credentials(ctx["user_id"])
+
+    report_progress(self, ctx, 10, "Canvas 동영상 다운로드 중...")
+    os.makedirs(ctx["output_dir"], exist_ok=True)
+    ctx["video_path"] = _download_video_sync(
+        self,
+        ctx,
+        url=ctx["url"],
+        output_dir=ctx["output_dir"],
+        canvas_id=canvas_id,
+        canvas_password=canvas_pw,
+    )
+
+    # 실제 영상 길이/비트레이트로 추정치 갱신 (같은 URL의 다음 요청은 이 값으로 미리 추정)
+    estimate = job_estimator.remember_video(ctx["url"], ctx["video_path"])
+    if estimate:
+        ctx["estimate"] = estimate.to_dict()
+    return ctx
+
+
+@celery_app.task(bind=True, name="stage.analyze_media", time_limit=settings.VIDEO_TIMEOUT + 60, **STAGE_RETRY)
+@resumable
+def analyze_media_stage(self, ctx: dict) -> dict:
+    report_progress(self, ctx, 25, "동영상 분석 중...")
+    _run_video_stage(self, ctx, "analyze")
+    return ctx
+
+
+@celery_app.task(bind=True, name="stage.transcribe", time_limit=settings.VIDEO_TIMEOUT + 60, **STAGE_RETRY)
+@resumable
+def transcribe_stage(self, ctx: dict) -> dict:
+    report_progress(self, ctx, 40, "음성 인식 중...")
+    _run_video_stage(self, ctx, "transcribe")
+    return ctx
+
+
+@celery_app.task(bind=True, name="stage.generate", time_limit=settings.VIDEO_TIMEOUT + 60, **STAGE_RETRY)
+@resumable
+def generate_stage(self, ctx: dict) -> dict:
+    status = "GPT API로 문제 생성 중..." if ctx["kind"] == "quiz" else "GPT API로 변환 중..."
+    report_progress(self, ctx, 60, status)
+    _run_video_stage(self, ctx, "generate")
+    ctx["result_path"] = _find_result(ctx)
+    return ctx
+
+
+# ========== Helper Functions ==========
+
+def _load_canvas_credentials(user_id: int):
+    with task_session() as db:
+        user = db.query(User).filter(User.user_id == user_id).first()
+        if not user or not user.id or not user.password:
+            raise StageFatalError("Canvas 인증 정보가 없습니다")
+        return user.id, settings.fernet.decrypt(user.password.encode()).decode()
+
+
+def _merge_pdfs_sync(files: List[str], output_path: str):
+    """동기 PDF 병합"""
+    merger = PdfMerger()
+
+    for pdf_file in files:
+        if not os.path.exists(pdf_file):
+            raise FileNotFoundError(f"파일을 찾을 수 없습니다: {pdf_file}")
+        merger.append(pdf_file)
+
+    merger.write(output_path)
+    merger.close()
+    print(f"✅ {len(files)}개 PDF를 하나로 합침: {output_path}")
+
+
+def _script_env(ctx: dict, stage: str, extra: Dict[str, str]) -> Dict[str, str]:
+    env = os.environ.copy()
+    env.update({
+        "WORKDIR": ctx["output_dir"],
+        "MODE": ctx["mode"],
+        "STAGE": stage,
+        "LANG": "ko",
+        "OPENAI_API_KEY": settings.OPENAI_API_KEY,
+    })
+    if ctx["kind"] == "quiz":
+        env["QUIZ_ALLOW_SHORT_ANSWER"] = "true" if ctx.get("include_short_answer") else "false"
+    env.update(extra)
+    return env
+
+
+def _run_script_sync(task, ctx: dict, script: str, env: Dict[str, str], timeout: int, label: str):
+    """스크립트 실행 (출력은 줄 단위로 로그에 흘려보내고, 세부 진행 이벤트는 단계 진행률로 옮김)"""
+    print(f"🚀 [{label}] 스크립트 실행: {script} (STAGE={env.get('STAGE')})")
+
+    result = run_with_progress(task, ctx, [sys.executable, script], env, timeout, label)
+    if result.returncode != 0:
+        raise Exception(f"{label} 실패: {result.tail()}")
+
+
+def _run_pdf_stage(task, ctx: dict, stage: str):
+    if not os.path.exists(ctx["pdf_input"]):
+        raise FileNotFoundError(f"입력 PDF가 존재하지 않습니다: {ctx['pdf_input']}")
+    env = _script_env(ctx, stage, {"PDF_FILE": ctx["pdf_input"]})
+    _run_script_sync(task, ctx, settings.PDF_SCRIPT_PATH, env, settings.PDF_TIMEOUT, f"PDF {stage}")
+
+
+def _run_video_stage(task, ctx: dict, stage: str):
+    env = _script_env(ctx, stage, {
+        "VIDEO_FILE": ctx["video_path"],
+        "MEDIA_CACHE_DIR": settings.MEDIA_CACHE_DIR,
+    })
+    _run_script_sync(task, ctx, settings.URL_SCRIPT_PATH, env, settings.VIDEO_TIMEOUT, f"VIDEO {stage}")
+
+
+def _find_result(ctx: dict) -> str:
+    """
+    스크립트 산출물 찾기 (노트: {mode}가 들어간 pdf, 퀴즈: quiz json)
+    재실행으로 여러 개가 남아 있을 수 있으므로 가장 최근 파일을 사용
+    """
+    output_dir = ctx["output_dir"]
+    if ctx["kind"] == "quiz":
+        match = lambda f: f.endswith(".json") and "quiz" in f.lower() and "raw" not in f.lower()
+    else:
+        match = lambda f: f.endswith(".pdf") and ctx["mode"] in f.lower()
+
+    candidates = [os.path.join(output_dir, f) for f in os.listdir(output_dir) if match(f)]
+    if not candidates:
+        raise StageFatalError("결과 생성 실패: 출력 파일을 찾을 수 없습니다")
+
+    result_path = max(candidates, key=os.path.getmtime)
+    print(f"✅ 결과 파일: {result_path}")
+    return result_path
+
+
+def _download_video_sync(
+    task,
+    ctx: dict,
+    url: str,
+    output_dir: str,
+    canvas_id: str,
+    canvas_password: str
+) -> str:
+    """
+    Canvas에서 동영상 다운로드 (동기)
+    """
+    env = os.environ.copy()
+    env.update({
+        "WORKDIR": output_dir,
+        "VIDEO_PAGE_URL": url,
+        "CANVAS_USERNAME": canvas_id,
+        "CANVAS_PASSWORD": canvas_password,
+        "LOGIN_PAGE_URL": settings.CANVAS_LOGIN_URL,
+        "MEDIA_STORE_DIR": settings.MEDIA_STORE_DIR,
+        "MEDIA_STORE_MAX_BYTES": str(settings.MEDIA_STORE_MAX_BYTES),
+    })
+
+    # 캐시된 SSO 세션이 있으면 스크립트에 넘겨 로그인 단계를 생략
+    cookies_out = os.path.join(output_dir, ".canvas_cookies.json")
+    env["CANVAS_COOKIES_OUT"] = cookies_out
+    cached_cookies = canvas_session_cache.export_for_subprocess(canvas_id)
+    metrics.cache_event("canvas_session", bool(cached_cookies))
+    if cached_cookies:
+        env["CANVAS_COOKIES"] = cached_cookies
+
+    print(f"📥 Canvas 동영상 다운로드 시작: {url}")
+
+    # 다운로더의 tqdm 진행 막대가 다운로드 단계 진행률로 전달됨
+    result = run_with_progress(
+        task, ctx,
+        [sys.executable, settings.CANVAS_DOWNLOADER_PATH],
+        env,
+        settings.DOWNLOAD_TIMEOUT,
+        "DOWNLOAD",
+        status="Canvas 동영상 다운로드 중...",
+    )
+
+    # 스크립트가 남긴 최신 세션 쿠키를 캐시에 반영 (파일은 즉시 삭제)
+    canvas_session_cache.import_from_file(canvas_id, cookies_out, password=canvas_password)
+
+    if result.returncode != 0:
+        raise Exception(f"동영상 다운로드 실패: {result.tail()}")
+
+    # 다운로드된 mp4 찾기
+    video_files = [f for f in os.listdir(output_dir) if f.endswith(".mp4")]
+
+    if not video_files:
+        raise Exception("동영상 파일을 찾을 수 없습니다")
+
+    video_path = os.path.join(output_dir, video_files[0])
+    print(f"✅ 동영상 다운로드 완료: {video_path}")
+    return video_path
+
+
+def cleanup_inputs(files: Optional[List[str]]):
+    """업로드 임시 파일 정리"""
+    files = files or []
+    print(f"🧹 임시 파일 정리: {len(files)}개")
+    for f in files:
+        try:
+            if os.path.exists(f):
+                os.remove(f)
+                print(f"  ✅ {os.path.basename(f)}")
+        except Exception as e:
+            print(f"  ⚠️ {os.path.basename(f)}: {e}")
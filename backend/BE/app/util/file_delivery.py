@@ -0,0 +1,155 @@
+"""
+작업 결과 파일(노트 PDF) 전송
+
+- ETag: 파일 내용 SHA-256 (강한 ETag). 해시는 옆에 {파일}.sha256로 저장해 요청마다 다시 읽지 않음
+- 작업 결과는 job_id/파일명별로 한 번만 만들어지므로 Cache-Control immutable
+  (인증이 필요한 응답이라 공유 캐시에는 두지 않도록 private)
+- If-None-Match 일치 시 304, Range 요청은 Starlette FileResponse가 206으로 처리 (If-Range는 위 ETag로 비교)
+- finalize 단계에서 미리 압축해 둔 {파일}.br / {파일}.gz 가 있으면 Accept-Encoding에 맞춰 그대로 전송
+  (Range 요청에는 항상 원본 전송)
+- DOWNLOAD_ACCEL_PREFIX를 설정하면 파일은 리버스 프록시가 보내고(X-Accel-Redirect) 앱은 헤더만 만든다
+"""
+import gzip
+import hashlib
+import os
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.util.http_cache import etag_matches
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# 압축해도 이 비율 이상 줄지 않으면 변형 파일을 남기지 않음
+MIN_COMPRESSION_GAIN = 0.9
+# Accept-Encoding 선호 순서 → 변형 파일 확장자
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def content_hash(path: str) -> str:
+    """파일 SHA-256 (사이드카 {path}.sha256가 원본보다 새것이면 재사용, 아니면 계산 후 저장)"""
+    sidecar = f"{path}.sha256"
+    try:
+        if os.path.getmtime(sidecar) >= os.path.getmtime(path):
+            with open(sidecar, "r", encoding="ascii") as f:
+                digest = f.read().strip()
+            if len(digest) == 64:
+                return digest
+    except OSError:
+        pass
+    digest = _sha256_file(path)
+    try:
+        with open(sidecar, "w", encoding="ascii") as f:
+            f.write(digest)
+    except OSError as e:
+        print(f"⚠️ 해시 파일 저장 실패: {sidecar}: {e}")
+    return digest
+
+
+def _compress(path: str, suffix: str, data: bytes) -> None:
+    if suffix == ".br":
+        if brotli is None:
+            return
+        encoded = brotli.compress(data, quality=9)
+    else:
+        encoded = gzip.compress(data, compresslevel=9, mtime=0)
+    target = f"{path}{suffix}"
+    if len(encoded) >= len(data) * MIN_COMPRESSION_GAIN:
+        if os.path.exists(target):
+            os.remove(target)
+        return
+    tmp = f"{target}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(encoded)
+    os.replace(tmp, target)
+
+
+def prepare_download(path: str) -> None:
+    """
+    작업 결과 파일 전송 준비 (Celery finalize 단계에서 호출).
+    해시 사이드카를 만들고, DOWNLOAD_PRECOMPRESS면 압축 변형도 미리 만든다. 실패해도 다운로드는 원본으로 동작.
+    """
+    try:
+        content_hash(path)
+        if settings.DOWNLOAD_PRECOMPRESS:
+            with open(path, "rb") as f:
+                data = f.read()
+            for _, suffix in ENCODINGS:
+                _compress(path, suffix, data)
+    except OSError as e:
+        print(f"⚠️ 다운로드 준비 실패: {os.path.basename(path)}: {e}")
+
+
+def _accepted(request: Request) -> Dict[str, float]:
+    accepted = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def _pick_variant(request: Request, path: str) -> Optional[Tuple[str, str]]:
+    """(인코딩, 변형 파일 경로) 또는 None"""
+    if "range" in request.headers:
+        return None
+    accepted = _accepted(request)
+    for encoding, suffix in ENCODINGS:
+        variant = f"{path}{suffix}"
+        if accepted.get(encoding, 0) > 0 and os.path.exists(variant):
+            if os.path.getmtime(variant) >= os.path.getmtime(path):
+                return encoding, variant
+    return None
+
+
+def _content_disposition(filename: str) -> str:
+    return f"attachment; filename*=utf-8''{quote(filename)}"
+
+
+async def serve_file(request: Request, path: str, filename: str, media_type: str) -> Response:
+    digest = await run_in_threadpool(content_hash, path)
+    # X-Accel-Redirect면 변형 선택도 프록시(gzip_static/brotli_static)에 맡김
+    variant = None if settings.DOWNLOAD_ACCEL_PREFIX else _pick_variant(request, path)
+    etag = f'"{digest[:32]}-{variant[0]}"' if variant else f'"{digest[:32]}"'
+
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if settings.DOWNLOAD_ACCEL_PREFIX:
+        # 프록시가 Range/압축 변형(gzip_static 등)까지 처리
+        relative = os.path.relpath(path, settings.SUMMARY_WORKDIR).replace(os.sep, "/")
+        headers.update({
+            "X-Accel-Redirect": f"{settings.DOWNLOAD_ACCEL_PREFIX.rstrip('/')}/{quote(relative)}",
+            "Content-Type": media_type,
+            "Content-Disposition": _content_disposition(filename),
+        })
+        return Response(status_code=200, headers=headers)
+
+    if variant:
+        headers["Content-Encoding"] = variant[0]
+        return FileResponse(path=variant[1], filename=filename, media_type=media_type, headers=headers)
+    return FileResponse(path=path, filename=filename, media_type=media_type, headers=headers)
@@ -0,0 +1,115 @@
+"""
+퀴즈 채점 엔진 (QuizRepository.submit_quiz / QuizService.submit_answer 공용)
+
+- 객관식: 보기 번호만 비교 ("3", " 3 ", "3번", "③" 모두 3)
+- 단답형: Unicode NFKC → 양끝 문장부호 제거 → 공백 정리 → 대소문자 무시 (casefold)
+          GRADING_STRIP_KOREAN_PARTICLES(기본 꺼짐)면 제출 답안 어절 끝 조사(은/는/이/가/을/를 ...)를 뗀 형태도 어절별로 비교
+          - 정답 쪽은 떼지 않는다 ("대만"을 "대"로 만들면 "대"가 정답 처리됨)
+          - 조사 앞에 한 음절 이상 남을 때만 뗀다 ("서울에서" → "서울", "이" → "이")
+정규식/번역 테이블은 모듈 로드 시 한 번만 만든다.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Mapping, Optional
+
+from app.core.config import settings
+
+MULTIPLE = "MULTIPLE"
+
+_WS_RE = re.compile(r"\s+")
+_EDGE_PUNCT_RE = re.compile(r"^[\s\"'`.,!?;:()\[\]{}<>~·…]+|[\s\"'`.,!?;:()\[\]{}<>~·…]+$")
+_CHOICE_RE = re.compile(r"^\D*?(\d+)")
+# 긴 조사부터 (에서 → 에 순서가 바뀌면 '서'가 남음)
+_PARTICLES = ("에게서", "에서", "으로", "에게", "께서", "까지", "부터", "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도", "만")
+_PARTICLE_RE = re.compile(r"(?<=[가-힣])(?:" + "|".join(_PARTICLES) + r")$")
+
+
+def normalize_choice(answer: Any) -> Optional[int]:
+    """객관식 답안 → 보기 번호 (숫자가 없으면 None)"""
+    if answer is None:
+        return None
+    match = _CHOICE_RE.match(unicodedata.normalize("NFKC", str(answer)).strip())
+    return int(match.group(1)) if match else None
+
+
+def strip_particle(word: str) -> str:
+    """어절 끝 조사를 뗌 (앞에 한글 음절이 없으면 그대로)"""
+    return _PARTICLE_RE.sub("", word)
+
+
+def _matches_with_particles(given: str, expected: str) -> bool:
+    # 어절마다 그대로 같거나, 조사를 뗀 형태가 같으면 정답 ("대만 서울에서" ↔ "대만 서울"에서 "대만"은 그대로 비교)
+    given_words, expected_words = given.split(" "), expected.split(" ")
+    return len(given_words) == len(expected_words) and all(
+        g == e or strip_particle(g) == e for g, e in zip(given_words, expected_words)
+    )
+
+
+def normalize_text(answer: Any) -> Optional[str]:
+    """단답형 답안 정규화 (비어 있으면 None)"""
+    if answer is None:
+        return None
+    text = unicodedata.normalize("NFKC", str(answer))
+    text = _EDGE_PUNCT_RE.sub("", text)
+    text = _WS_RE.sub(" ", text).casefold()
+    return text or None
+
+
+def is_correct(question_type: str, correct_answer: Any, user_answer: Any,
+               strip_particles: Optional[bool] = None) -> bool:
+    if user_answer is None:
+        return False
+    if question_type == MULTIPLE:
+        chosen = normalize_choice(user_answer)
+        return chosen is not None and chosen == normalize_choice(correct_answer)
+    if strip_particles is None:
+        strip_particles = settings.GRADING_STRIP_KOREAN_PARTICLES
+    given, expected = normalize_text(user_answer), normalize_text(correct_answer)
+    if given is None or expected is None:
+        return False
+    if given == expected:
+        return True
+    # 제출 답안에 붙은 조사만 허용 ("대만은" → "대만"), 정답은 원형 그대로 비교
+    return strip_particles and _matches_with_particles(given, expected)
+
+
+@dataclass(frozen=True)
+class GradedAnswer:
+    question_id: int
+    question_number: int
+    user_answer: Optional[str]       # 저장할 원문 답안 (앞뒤 공백만 제거)
+    is_correct: bool
+
+
+@dataclass
+class GradedSubmission:
+    answers: List[GradedAnswer]
+    correct_number: int
+
+    @property
+    def total(self) -> int:
+        return len(self.answers)
+
+    @property
+    def score(self) -> int:
+        return int(self.correct_number / self.total * 100) if self.total else 0
+
+
+def grade_submission(questions: Iterable[Any], submitted: Mapping[int, Any]) -> GradedSubmission:
+    """
+    문제 목록(question_id/question_number/question_type/correct_answer 속성)과
+    {문제 번호: 답안}을 받아 한 번에 채점. 제출하지 않은 문제는 오답.
+    """
+    strip_particles = settings.GRADING_STRIP_KOREAN_PARTICLES
+    graded = [
+        GradedAnswer(
+            question_id=q.question_id,
+            question_number=q.question_number,
+            user_answer=None if answer is None else str(answer).strip(),
+            is_correct=is_correct(q.question_type, q.correct_answer, answer, strip_particles),
+        )
+        for q in questions
+        for answer in (submitted.get(q.question_number),)
+    ]
+    return GradedSubmission(answers=graded, correct_number=sum(g.is_correct for g in graded))
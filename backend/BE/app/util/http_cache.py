@@ -0,0 +1,20 @@
+"""
+HTTP 조건부 요청(ETag / If-None-Match) 유틸
+"""
+from typing import Optional
+
+
+def _opaque(tag: str) -> str:
+    # If-None-Match는 약한 비교: W/"x" 와 "x" 를 같은 것으로 본다
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더 값(쉼표 구분 목록 또는 *)이 etag와 일치하면 True → 304 응답"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _opaque(etag)
+    return any(_opaque(tag) == target for tag in if_none_match.split(","))
@@ -27,3 +27,11 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire, "type": "refresh"})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
+
+def create_stream_token(user_id: int, task_id: str, expires_delta: timedelta = None):
+    """작업 상태 SSE 구독 전용 (EventSource가 헤더를 못 보내 쿼리로 전달되므로 짧게, 작업 하나로 한정)"""
+    expire = datetime.now(timezone.utc) + (
+        expires_delta or timedelta(seconds=settings.TASK_EVENTS_TOKEN_EXPIRE_SEC)
+    )
+    to_encode = {"sub": str(user_id), "task_id": task_id, "exp": expire, "type": "stream"}
+    return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
@@ -0,0 +1,29 @@
+"""
+키셋(커서) 페이지네이션 공용 유틸
+
+커서는 마지막으로 내려준 행의 (created_at, id)를 base64url로 감싼 불투명 문자열.
+OFFSET과 달리 앞쪽에 행이 추가/삭제돼도 중복·누락 없이 이어지고,
+(user_id, is_saved, created_at DESC) 인덱스를 그대로 타므로 페이지가 깊어져도 비용이 같다.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """커서 → (created_at, id). 형식이 잘못됐으면 None"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
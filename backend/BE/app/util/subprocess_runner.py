@@ -0,0 +1,195 @@
+"""
+하위 프로세스 실행기 (노트/퀴즈 파이프라인 스크립트, Canvas 다운로더 등)
+
+capture_output=True는 긴 실행의 stdout/stderr(tqdm 진행 막대, 페이지별 로그)를 전부 워커 메모리에 모았다가
+끝난 뒤 한 번에 출력한다. 여기서는
+- 출력을 줄 단위로 읽어 바로 로그로 흘려보내고 (\r로 갱신되는 tqdm 줄도 한 줄로 취급)
+- 최근 max_lines 줄만 링 버퍼에 남기며 (실패 메시지용), 한 줄은 max_line_bytes에서 자르고
+- tqdm 형식의 진행 줄(" 45%|████ ...")은 로그 대신 on_progress 콜백으로 넘기고
+- 시간 초과 시 프로세스 그룹 전체(스크립트가 띄운 ffmpeg/브라우저 포함)를 종료한다.
+자식이 파이썬 스크립트면 파이프 출력이 블록 버퍼링(4~8KiB)돼 줄이 몰려 오므로 PYTHONUNBUFFERED=1로 띄운다.
+"""
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional
+
+DEFAULT_MAX_LINES = 200
+DEFAULT_MAX_LINE_BYTES = 8 * 1024
+_READ_SIZE = 64 * 1024
+_KILL_GRACE_SEC = 5
+_POLL_SEC = 0.2
+
+_PROGRESS_RE = re.compile(r"(\d{1,3})%\|")
+_LINE_END_RE = re.compile(rb"[\r\n]")
+
+ProgressCallback = Callable[[float, str], None]
+
+
+@dataclass
+class RunResult:
+    returncode: int
+    stdout_tail: List[str]
+    stderr_tail: List[str]
+    lines: int              # 로그로 내보낸 전체 줄 수
+    truncated: int          # max_line_bytes에서 잘린 줄 수
+
+    def tail(self, n: int = 20) -> str:
+        """실패 메시지용: stderr 마지막 n줄 (없으면 stdout)"""
+        return "\n".join((self.stderr_tail or self.stdout_tail)[-n:])
+
+
+def parse_progress(line: str) -> Optional[float]:
+    """tqdm 진행 줄이면 진행 비율(0~1), 아니면 None"""
+    match = _PROGRESS_RE.search(line)
+    if not match:
+        return None
+    return min(100, int(match.group(1))) / 100
+
+
+class _StreamReader(threading.Thread):
+    """파이프 하나를 읽어 줄 단위로 sink에 전달 (줄 끝: \n 또는 \r)"""
+
+    def __init__(self, pipe, name: str, sink: Callable[[str, str, bool], None], max_line_bytes: int):
+        super().__init__(name=f"subprocess-{name}", daemon=True)
+        self.pipe = pipe
+        self.stream = name
+        self.sink = sink
+        self.max_line_bytes = max_line_bytes
+
+    def run(self):
+        fd = self.pipe.fileno()
+        buf = bytearray()
+        truncated = False
+        try:
+            while True:
+                chunk = os.read(fd, _READ_SIZE)
+                if not chunk:
+                    break
+                *lines, rest = _LINE_END_RE.split(chunk)
+                for part in lines:
+                    truncated = self._append(buf, part, truncated)
+                    self._flush(buf, truncated)
+                    buf.clear()
+                    truncated = False
+                truncated = self._append(buf, rest, truncated)
+            if buf:
+                self._flush(buf, truncated)
+        finally:
+            self.pipe.close()
+
+    def _append(self, buf: bytearray, data: bytes, truncated: bool) -> bool:
+        room = self.max_line_bytes - len(buf)
+        if len(data) > room:
+            buf.extend(data[:max(room, 0)])
+            return True
+        buf.extend(data)
+        return truncated
+
+    def _flush(self, buf: bytearray, truncated: bool):
+        line = buf.decode("utf-8", errors="replace").rstrip()
+        if line:
+            self.sink(self.stream, line, truncated)
+
+
+def run_streaming(
+    cmd: List[str],
+    env: Optional[Dict[str, str]],
+    timeout: int,
+    label: str,
+    on_progress: Optional[ProgressCallback] = None,
+    on_tick: Optional[Callable[[], None]] = None,
+    progress_interval: float = 1.0,
+    max_lines: int = DEFAULT_MAX_LINES,
+    max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
+) -> RunResult:
+    """
+    cmd를 실행하고 끝날 때까지 기다림. 반환: RunResult (종료 코드 + 최근 출력)
+    on_progress: tqdm 진행 줄을 받을 콜백 (progress_interval초마다 최대 1회, 100%는 항상 전달)
+    on_tick: 대기 중 주기적으로 호출 (블로킹 가능, 예: 진행 이벤트 스트림 읽기). 없으면 짧게 sleep
+    timeout 초과 시 프로세스 그룹을 종료하고 subprocess.TimeoutExpired 발생
+    """
+    tails: Dict[str, Deque[str]] = {"stdout": deque(maxlen=max_lines), "stderr": deque(maxlen=max_lines)}
+    counters = {"lines": 0, "truncated": 0, "last_progress": 0.0}
+    lock = threading.Lock()
+
+    def sink(stream: str, line: str, truncated: bool):
+        fraction = parse_progress(line)
+        if fraction is not None:
+            if on_progress is None:
+                return
+            now = time.monotonic()
+            with lock:
+                if fraction < 1 and now - counters["last_progress"] < progress_interval:
+                    return
+                counters["last_progress"] = now
+            try:
+                on_progress(fraction, line)
+            except Exception as e:
+                print(f"⚠️ [{label}] 진행률 전달 실패: {e}")
+            return
+
+        with lock:
+            tails[stream].append(line)
+            counters["lines"] += 1
+            counters["truncated"] += truncated
+        print(f"📄 [{label} {stream.upper()}] {line}{' …(생략)' if truncated else ''}", flush=True)
+
+    # 파이썬 자식의 print가 끝날 때까지 버퍼에 쌓이지 않게
+    env = {**(os.environ if env is None else env), "PYTHONUNBUFFERED": "1"}
+    # 새 세션(프로세스 그룹)으로 띄워 시간 초과 시 자식 프로세스까지 함께 종료
+    proc = subprocess.Popen(
+        cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True
+    )
+    readers = [
+        _StreamReader(proc.stdout, "stdout", sink, max_line_bytes),
+        _StreamReader(proc.stderr, "stderr", sink, max_line_bytes),
+    ]
+    for reader in readers:
+        reader.start()
+
+    deadline = time.monotonic() + timeout
+    try:
+        while proc.poll() is None:
+            if time.monotonic() > deadline:
+                print(f"⏰ [{label}] {timeout}s 초과 → 프로세스 그룹 종료")
+                _kill_group(proc)
+                raise subprocess.TimeoutExpired(cmd, timeout, output="\n".join(tails["stdout"]),
+                                                stderr="\n".join(tails["stderr"]))
+            if on_tick is not None:
+                on_tick()
+            else:
+                time.sleep(_POLL_SEC)
+    finally:
+        if proc.poll() is None:
+            _kill_group(proc)
+        for reader in readers:
+            reader.join(timeout=_KILL_GRACE_SEC)
+
+    print(f"🏁 [{label}] 종료 코드 {proc.returncode} (출력 {counters['lines']}줄)")
+    return RunResult(
+        returncode=proc.returncode,
+        stdout_tail=list(tails["stdout"]),
+        stderr_tail=list(tails["stderr"]),
+        lines=counters["lines"],
+        truncated=counters["truncated"],
+    )
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    """SIGTERM → 유예 후 SIGKILL (프로세스 그룹 단위)"""
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(proc.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            proc.wait(timeout=_KILL_GRACE_SEC)
+            return
+        except subprocess.TimeoutExpired:
+            continue
@@ -0,0 +1,161 @@
+"""
+업로드 파일 저장 (노트/퀴즈 PDF 생성 엔드포인트 공용)
+
+- 파일 복사는 asyncio.to_thread에서 청크 단위로 처리해 이벤트 루프를 막지 않는다
+- 복사하면서 SHA-256을 함께 계산 → 작업 합치기(job_coalescer) 키에 그대로 사용 (다시 읽지 않음)
+- 저장 경로: temp_uploads/{user_id}/{sha256 앞 32자}_{요청별 난수}.pdf
+  클라이언트 파일명을 쓰지 않으므로 같은 이름 동시 업로드가 서로 덮어쓰지 않고,
+  같은 내용이라도 작업마다 입력 파일이 따로라 먼저 끝난 작업의 정리(cleanup_inputs)가 다른 작업 입력을 지우지 않는다.
+- 파일당/요청당 크기 제한, PDF 시그니처(%PDF-) 확인 후에만 큐에 넣는다
+- 크기 제한은 두 단계:
+  1) UploadSizeLimitMiddleware: Content-Length가 요청당 한도를 넘는 multipart 요청은 본문을 읽기 전에 413
+     (FastAPI는 의존성보다 multipart 파싱을 먼저 하므로 라우트 의존성으로는 막을 수 없음)
+  2) save_pdf_uploads: 복사하면서 파일당/요청당 한도 확인. Content-Length 없는 chunked 요청은
+     Starlette가 본문 전체를 임시 파일로 받은 뒤에야 여기서 걸러지므로 프록시(nginx client_max_body_size)로도 제한할 것
+"""
+import asyncio
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, List, Tuple
+
+from fastapi import UploadFile
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.exception.custom_exceptions import APIException
+from app.exception.error_code import Error
+
+CHUNK_SIZE = 1024 * 1024
+PDF_MAGIC = b"%PDF-"
+# PDF 규격상 시그니처 앞에 최대 1024바이트의 쓰레기 값이 올 수 있음
+PDF_MAGIC_WINDOW = 1024
+_HEAD_BYTES = PDF_MAGIC_WINDOW + len(PDF_MAGIC)
+# multipart 경계/헤더 몫 (파일 합계가 한도 이내인 요청을 Content-Length만 보고 거절하지 않도록)
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    path: str
+    sha256: str
+    size: int
+    filename: str        # 클라이언트가 보낸 원래 이름 (로그/표시용)
+
+
+class _TooLarge(Exception):
+    pass
+
+
+class _NotPdf(Exception):
+    pass
+
+
+def upload_dir(user_id: int) -> str:
+    return os.path.join(settings.SUMMARY_WORKDIR, "temp_uploads", str(user_id))
+
+
+def _stream_to_disk(src: BinaryIO, directory: str, max_bytes: int) -> Tuple[str, str, int]:
+    """src → directory/임시 파일로 복사하며 해시/크기 계산 후 최종 이름으로 rename (워커 스레드에서 실행)"""
+    os.makedirs(directory, exist_ok=True)
+    src.seek(0)
+    token = uuid.uuid4().hex[:12]
+    part_path = os.path.join(directory, f".{token}.part")
+    h = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        with open(part_path, "wb") as out:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _TooLarge()
+                if len(head) < _HEAD_BYTES:
+                    head = (head + chunk)[:_HEAD_BYTES]
+                    if len(head) == _HEAD_BYTES and PDF_MAGIC not in head:
+                        raise _NotPdf()
+                h.update(chunk)
+                out.write(chunk)
+        if PDF_MAGIC not in head:
+            raise _NotPdf()
+        digest = h.hexdigest()
+        final_path = os.path.join(directory, f"{digest[:32]}_{token}.pdf")
+        os.replace(part_path, final_path)
+        return final_path, digest, size
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+
+
+def remove_uploads(uploads: List[StoredUpload]) -> None:
+    for upload in uploads:
+        try:
+            if os.path.exists(upload.path):
+                os.remove(upload.path)
+        except OSError as e:
+            print(f"[WARN] 임시 파일 정리 실패: {upload.path}, {e}")
+
+
+async def save_pdf_uploads(files: List[UploadFile], user_id: int) -> List[StoredUpload]:
+    """
+    업로드된 PDF들을 저장하고 경로/해시를 반환.
+    크기 초과면 413(FILE_TOO_LARGE), PDF가 아니면 400(FILE_INVALID_FORMAT). 실패 시 이미 저장한 파일은 지운다.
+    """
+    # multipart 파싱 시 크기를 알고 있으면 복사 전에 바로 거절
+    known = [f.size for f in files if f.size is not None]
+    if any(size > settings.UPLOAD_MAX_FILE_BYTES for size in known) or sum(known) > settings.UPLOAD_MAX_REQUEST_BYTES:
+        raise APIException(413, Error.FILE_TOO_LARGE)
+
+    directory = upload_dir(user_id)
+    stored: List[StoredUpload] = []
+    remaining = settings.UPLOAD_MAX_REQUEST_BYTES
+    try:
+        for file in files:
+            limit = min(settings.UPLOAD_MAX_FILE_BYTES, remaining)
+            path, digest, size = await asyncio.to_thread(_stream_to_disk, file.file, directory, limit)
+            stored.append(StoredUpload(path=path, sha256=digest, size=size, filename=file.filename or ""))
+            remaining -= size
+    except _TooLarge:
+        remove_uploads(stored)
+        raise APIException(413, Error.FILE_TOO_LARGE)
+    except _NotPdf:
+        remove_uploads(stored)
+        raise APIException(400, Error.FILE_INVALID_FORMAT)
+    except BaseException:
+        remove_uploads(stored)
+        raise
+    finally:
+        for file in files:
+            await file.close()
+
+    return stored
+
+
+class UploadSizeLimitMiddleware:
+    """Content-Length가 UPLOAD_MAX_REQUEST_BYTES를 넘는 multipart 요청을 본문 수신 전에 413으로 거절 (업로드 라우트만 multipart를 받음)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self._too_large(scope):
+            exc = APIException(413, Error.FILE_TOO_LARGE)
+            response = JSONResponse(status_code=exc.status_code, content=exc.detail, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _too_large(scope) -> bool:
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return False
+        try:
+            length = int(headers.get(b"content-length", b""))
+        except ValueError:
+            return False
+        return length > settings.UPLOAD_MAX_REQUEST_BYTES + MULTIPART_OVERHEAD_BYTES
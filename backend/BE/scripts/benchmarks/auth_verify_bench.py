@@ -0,0 +1,86 @@
+"""
+요청당 인증 비용 비교 벤치마크 (동시 요청 부하)
+  - before       : 동기 의존성 → 스레드풀에서 jose.jwt.decode, 라우터/엔드포인트 의존성에서 2번 (기존 방식)
+  - jose-nocache : async 의존성, 요청당 1번 디코드 (LRU 끔)
+  - jose-lru     : async 의존성 + 검증된 토큰 LRU (app/auth/token_verifier.py 기본값)
+  - pyjwt-lru    : JWT_BACKEND=pyjwt (PyJWT가 설치된 경우만)
+
+실행 (backend/BE 에서):
+    python scripts/benchmarks/auth_verify_bench.py [요청 수] [동시 요청 수] [사용자 수]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from jose import jwt  # noqa: E402
+from starlette.concurrency import run_in_threadpool  # noqa: E402
+
+from app.auth import token_verifier as verifier_module  # noqa: E402
+from app.auth.token_verifier import TokenVerifier  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.util.jwt_utils import create_access_token  # noqa: E402
+
+
+def legacy_verify(token: str) -> int:
+    payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    return int(payload["sub"])
+
+
+async def before(token: str) -> None:
+    await run_in_threadpool(legacy_verify, token)
+    await run_in_threadpool(legacy_verify, token)
+
+
+def make_after(verifier: TokenVerifier):
+    async def after(token: str) -> None:
+        verifier.verify_access(token)
+    return after
+
+
+async def run(fn, tokens: list, requests: int, concurrency: int) -> tuple:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await fn(tokens[i % len(tokens)])
+            latencies.append((time.perf_counter() - started) * 1_000_000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - started
+    return sorted(latencies), wall
+
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    users = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+
+    tokens = [create_access_token({"sub": user_id}) for user_id in range(1, users + 1)]
+
+    scenarios = [
+        ("before", before),
+        ("jose-nocache", make_after(TokenVerifier(max_entries=0))),
+        ("jose-lru", make_after(TokenVerifier())),
+    ]
+    if verifier_module.pyjwt is not None:
+        settings.JWT_BACKEND = "pyjwt"
+        scenarios.append(("pyjwt-lru", make_after(TokenVerifier())))
+
+    print(f"요청 {requests}건, 동시 {concurrency}, 사용자(토큰) {users}명")
+    print(f"{'mode':>12} | {'p50 us':>8} | {'p99 us':>8} | {'req/s':>10}")
+    print("-" * 48)
+    for name, fn in scenarios:
+        latencies, wall = await run(fn, tokens, requests, concurrency)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:>12} | {statistics.median(latencies):>8.1f} | {p99:>8.1f} | {requests / wall:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
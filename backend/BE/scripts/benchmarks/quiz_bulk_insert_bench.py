@@ -0,0 +1,127 @@
+"""
+퀴즈 문제 저장 방식 비교 벤치마크
+  - loop : 문제마다 ORM Question 객체 생성 + db.add (기존 방식)
+  - bulk : INSERT ... VALUES (...), (...) RETURNING 한 번 (QuizRepository.bulk_insert_questions_stmt)
+
+실행 (backend/BE 에서, .env의 DATABASE_URL 사용):
+    python scripts/benchmarks/quiz_bulk_insert_bench.py [반복 횟수]
+
+벤치용 user/quiz는 SAVEPOINT 안에서 만들고 마지막에 전부 롤백하므로 DB에 남지 않는다.
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy import create_engine, update  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.model.question import Question  # noqa: E402
+from app.model.quiz import Quiz  # noqa: E402
+from app.model.user import User  # noqa: E402
+from app.repository.quiz_repository import QuizRepository  # noqa: E402
+
+SIZES = (50, 100, 200)
+
+
+def make_questions(n: int) -> list:
+    questions = []
+    for i in range(n):
+        if i % 4 == 3:
+            questions.append({
+                "questionText": f"단답형 문제 {i + 1}: 다음 개념의 이름은?",
+                "questionType": "SHORT",
+                "choices": [],
+                "correctAnswer": f"정답{i + 1}",
+                "explanation": "채점 기준 설명 " * 5,
+            })
+        else:
+            questions.append({
+                "questionText": f"객관식 문제 {i + 1}: 옳은 것을 고르시오." * 3,
+                "questionType": "MULTIPLE",
+                "choices": [f"보기 {k}" for k in range(1, 5)],
+                "correctAnswer": i % 4,
+                "explanation": "해설 " * 20,
+            })
+    return questions
+
+
+def save_loop(db: Session, quiz_id: int, questions: list) -> None:
+    quiz = db.query(Quiz).filter(Quiz.quiz_id == quiz_id).first()
+    quiz.status = "COMPLETED"
+    quiz.total_questions = len(questions)
+    for i, q in enumerate(questions):
+        db.add(Question(
+            quiz_id=quiz_id,
+            question_number=i + 1,
+            question_text=q["questionText"],
+            question_type=q["questionType"],
+            choices=q.get("choices", []),
+            correct_answer=str(q["correctAnswer"]),
+            explanation=q.get("explanation", ""),
+        ))
+    db.flush()
+
+
+def save_bulk(db: Session, quiz_id: int, questions: list) -> None:
+    db.execute(
+        update(Quiz)
+        .where(Quiz.quiz_id == quiz_id)
+        .values(status="COMPLETED", total_questions=len(questions))
+    )
+    db.execute(QuizRepository.bulk_insert_questions_stmt(quiz_id, questions)).all()
+
+
+def run_once(db: Session, user_id: int, fn, questions: list) -> float:
+    savepoint = db.begin_nested()
+    quiz = Quiz(user_id=user_id, title="bench", include_short_answer=True)
+    db.add(quiz)
+    db.flush()
+    db.expunge_all()
+
+    started = time.perf_counter()
+    fn(db, quiz.quiz_id, questions)
+    elapsed = time.perf_counter() - started
+
+    savepoint.rollback()
+    db.expunge_all()
+    return elapsed
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    engine = create_engine(settings.DATABASE_URL.replace("postgresql+asyncpg", "postgresql"))
+
+    with Session(engine) as db:
+        outer = db.begin()
+        user = User(id=f"bench_{int(time.time())}", password="-")
+        db.add(user)
+        db.flush()
+
+        print(f"{'N':>5} | {'loop ms (p50/p95)':>20} | {'bulk ms (p50/p95)':>20} | speedup")
+        print("-" * 64)
+        for n in SIZES:
+            questions = make_questions(n)
+            # 워밍업
+            run_once(db, user.user_id, save_loop, questions)
+            run_once(db, user.user_id, save_bulk, questions)
+
+            loop = sorted(run_once(db, user.user_id, save_loop, questions) * 1000 for _ in range(repeat))
+            bulk = sorted(run_once(db, user.user_id, save_bulk, questions) * 1000 for _ in range(repeat))
+            p95 = lambda xs: xs[min(len(xs) - 1, int(len(xs) * 0.95))]
+
+            loop_p50, bulk_p50 = statistics.median(loop), statistics.median(bulk)
+            print(
+                f"{n:>5} | {loop_p50:>9.1f} / {p95(loop):>8.1f} | "
+                f"{bulk_p50:>9.1f} / {p95(bulk):>8.1f} | x{loop_p50 / bulk_p50:.1f}"
+            )
+
+        outer.rollback()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+퀴즈 제출(채점) 부하 테스트 — 수업 규모(수백 명 동시 제출)
+  - loop : 답안마다 SELECT Question + 정답 행 전체 조회로 개수 세기 + 재조회 (기존 방식, N+3 왕복)
+  - set  : 문제 전체 1회 조회 → 메모리 채점 → UPDATE ... FROM (VALUES ...) 1회 (QuizRepository.submit_quiz)
+
+실행 (backend/BE 에서, .env의 DATABASE_URL 사용):
+    python scripts/benchmarks/quiz_submit_load.py [동시 제출 수] [문제 수]
+
+제출은 각자 세션/트랜잭션으로 커밋해야 하므로 벤치용 user/quiz를 실제로 만들고, 끝나면 모두 삭제한다.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy import delete, update  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.future import select  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.model.question import Question  # noqa: E402
+from app.model.quiz import Quiz  # noqa: E402
+from app.model.user import User  # noqa: E402
+from app.repository.quiz_repository import QuizRepository  # noqa: E402
+from app.schema.quiz import QuizSubmitItem  # noqa: E402
+from app.util.grading import is_correct  # noqa: E402
+
+from quiz_bulk_insert_bench import make_questions  # noqa: E402
+
+
+def make_answers(questions: list, seed: int) -> list:
+    answers = []
+    for i, q in enumerate(questions):
+        right = (i + seed) % 3 != 0      # 대략 2/3 정답
+        if q["questionType"] == "MULTIPLE":
+            answer = q["correctAnswer"] if right else (q["correctAnswer"] + 1) % 4
+        else:
+            answer = f" {q['correctAnswer'].upper()} " if right else "오답"
+        answers.append(QuizSubmitItem(question_number=i + 1, question_type=q["questionType"], answer=answer))
+    return answers
+
+
+async def submit_loop(db: AsyncSession, quiz_id: int, answers: list) -> None:
+    for answer in answers:
+        result = await db.execute(
+            select(Question).where(Question.quiz_id == quiz_id, Question.question_number == answer.question_number)
+        )
+        question = result.scalar_one_or_none()
+        if question:
+            question.user_answer = str(answer.answer).strip()
+            question.is_correct = is_correct(question.question_type, question.correct_answer, question.user_answer)
+    correct = await db.execute(select(Question).where(Question.quiz_id == quiz_id, Question.is_correct == True))  # noqa: E712
+    await db.execute(update(Quiz).where(Quiz.quiz_id == quiz_id).values(correct_number=len(correct.scalars().all())))
+    await db.commit()
+    await db.execute(select(Question).where(Question.quiz_id == quiz_id).order_by(Question.question_number))
+
+
+async def submit_set(db: AsyncSession, quiz_id: int, answers: list) -> None:
+    await QuizRepository().submit_quiz(db, quiz_id, answers)
+
+
+async def create_quizzes(session_factory, user_id: int, count: int, questions: list) -> list:
+    async with session_factory() as db:
+        quiz_ids = []
+        for _ in range(count):
+            quiz = Quiz(user_id=user_id, title="load", include_short_answer=True, status="COMPLETED",
+                        total_questions=len(questions))
+            db.add(quiz)
+            await db.flush()
+            await db.execute(QuizRepository.bulk_insert_questions_stmt(quiz.quiz_id, questions))
+            quiz_ids.append(quiz.quiz_id)
+        await db.commit()
+        return quiz_ids
+
+
+async def run(session_factory, fn, quiz_ids: list, answer_sets: list) -> tuple:
+    latencies = []
+
+    async def one(quiz_id: int, answers: list):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            await fn(db, quiz_id, answers)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(qid, answers) for qid, answers in zip(quiz_ids, answer_sets)))
+    wall = time.perf_counter() - started
+    return sorted(latencies), wall
+
+
+async def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    n_questions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    # 실제 API 서버와 비슷하게 커넥션 풀 크기로 동시 실행 수가 제한됨
+    engine = create_async_engine(settings.DATABASE_URL, pool_size=20, max_overflow=10)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    questions = make_questions(n_questions)
+    answer_sets = [make_answers(questions, seed) for seed in range(concurrency)]
+
+    async with session_factory() as db:
+        user = User(id=f"load_{int(time.time())}", password="-")
+        db.add(user)
+        await db.commit()
+        user_id = user.user_id
+
+    try:
+        print(f"동시 제출 {concurrency}건, 문제 {n_questions}개")
+        print(f"{'mode':>5} | {'p50 ms':>8} | {'p95 ms':>8} | {'max ms':>8} | {'submit/s':>9}")
+        print("-" * 52)
+        for name, fn in (("loop", submit_loop), ("set", submit_set)):
+            quiz_ids = await create_quizzes(session_factory, user_id, concurrency, questions)
+            latencies, wall = await run(session_factory, fn, quiz_ids, answer_sets)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(
+                f"{name:>5} | {statistics.median(latencies):>8.1f} | {p95:>8.1f} | "
+                f"{latencies[-1]:>8.1f} | {concurrency / wall:>9.1f}"
+            )
+    finally:
+        async with session_factory() as db:
+            await db.execute(delete(Quiz).where(Quiz.user_id == user_id))
+            await db.execute(delete(User).where(User.user_id == user_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+"""
+요청 경로 로그 비용 비교 벤치마크 (인증 + 퀴즈 상세 조회 1회 = 요청 1건)
+  - print      : 요청마다 배너/토큰 앞부분/페이로드, 문항별 보기·해설을 print (기존 방식)
+  - log-info   : app/core/logging.py, LOG_LEVEL=INFO (운영 기본값, debug 로그는 포맷하지 않음)
+  - log-debug  : LOG_LEVEL=DEBUG, JSON 포맷 (전부 출력)
+  - log-sample : LOG_LEVEL=DEBUG, LOG_SAMPLE_RATES="app=0.01"
+
+DB 없이 로그 비용만 보기 위해 퀴즈는 메모리에서 만든 ORM 객체를 그대로 돌려주는 세션으로 조회한다.
+stdout은 컨테이너 로그 파일처럼 임시 파일로 돌린다.
+
+실행 (backend/BE 에서):
+    python scripts/benchmarks/request_logging_bench.py [요청 수] [문제 수]
+"""
+import asyncio
+import contextlib
+import inspect
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from app.auth.dependencies import get_current_user  # noqa: E402
+from app.auth.token_verifier import token_verifier  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.logging import setup_logging  # noqa: E402
+from app.model.question import Question  # noqa: E402
+from app.model.quiz import Quiz  # noqa: E402
+from app.repository.quiz_repository import QuizRepository  # noqa: E402
+from app.util.datetime_utils import now_kst  # noqa: E402
+
+
+def make_quiz(n: int) -> Quiz:
+    quiz = Quiz(quiz_id=1, user_id=1, title="bench", is_saved=True, total_questions=n,
+                correct_number=n // 2, created_at=now_kst())
+    quiz.questions = [
+        Question(
+            question_id=i + 1, quiz_id=1, question_number=i + 1, question_type="MULTIPLE",
+            question_text=f"문제 {i + 1}", choices=[f"보기 {c} " * 8 for c in range(4)],
+            correct_answer="1", user_answer="2", is_correct=False, explanation="해설 문장 " * 40,
+        )
+        for i in range(n)
+    ]
+    return quiz
+
+
+class _Result:
+    def __init__(self, quiz):
+        self._quiz = quiz
+
+    def scalar_one_or_none(self):
+        return self._quiz
+
+
+class _Session:
+    """execute()가 미리 만든 퀴즈를 돌려주는 세션 (DB 왕복 제외)"""
+
+    def __init__(self, quiz):
+        self._quiz = quiz
+
+    async def execute(self, stmt):
+        return _Result(self._quiz)
+
+
+# ---------- 기존 방식 (print) ----------
+def legacy_get_current_user(credentials):
+    print("\n" + "=" * 60)
+    print("🔍 JWT Token Verification Started")
+    print("=" * 60)
+    token = credentials.credentials
+    print(f"Token (first 30 chars): {token[:30]}...")
+    print(f"Token length: {len(token)}")
+    print(f"JWT_SECRET (first 10 chars): {settings.JWT_SECRET[:10]}...")
+    print(f"JWT_ALGORITHM: {settings.JWT_ALGORITHM}")
+    payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    print("✅ Token decoded successfully!")
+    print(f"Payload: {payload}")
+    print("✅ Token decoded successfully!")
+    print(f"Payload: {payload}")
+    return {"user_id": int(payload["sub"])}
+
+
+async def legacy_get_quiz_by_id(db, quiz_id):
+    quiz = (await db.execute(None)).scalar_one_or_none()
+    print("✅ Quiz found!")
+    print(f"   - quiz_id: {quiz.quiz_id}")
+    print(f"   - title: {quiz.title}")
+    print(f"   - is_saved: {quiz.is_saved}")
+    print(f"   - total_questions: {quiz.total_questions}")
+    print(f"   - correct_number: {quiz.correct_number}")
+    print(f"   - created_at: {quiz.created_at}")
+    print(f"   - questions loaded: {len(quiz.questions)}")
+    print("\n📋 Questions detail:")
+    for q in quiz.questions:
+        print(f"   Q{q.question_number}: type={q.question_type}, "
+              f"correct={q.correct_answer}, user={q.user_answer}, "
+              f"is_correct={q.is_correct}")
+        print(f"      choices: {q.choices}")
+        print(f"      explanation: {q.explanation}")
+    quiz.questions.sort(key=lambda q: q.question_number)
+    return quiz
+
+
+async def run(requests: int, auth, load, credentials, db) -> list:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        user = auth(credentials)
+        if inspect.isawaitable(user):
+            await user
+        await load(db, 1)
+        latencies.append((time.perf_counter() - started) * 1_000_000)
+    return sorted(latencies)
+
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_questions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    token = jwt.encode(
+        {"sub": "1", "type": "access", "exp": now_kst() + timedelta(hours=1)},
+        settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM,
+    )
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    db = _Session(make_quiz(n_questions))
+    repo = QuizRepository()
+    # 로그 비용만 비교하도록 검증 캐시는 끔
+    token_verifier.max_entries = 0
+
+    scenarios = (
+        ("print", dict(), legacy_get_current_user, legacy_get_quiz_by_id),
+        ("log-info", dict(LOG_LEVEL="INFO"), get_current_user, repo.get_quiz_by_id),
+        ("log-debug", dict(LOG_LEVEL="DEBUG", LOG_FORMAT="json"), get_current_user, repo.get_quiz_by_id),
+        ("log-sample", dict(LOG_LEVEL="DEBUG", LOG_FORMAT="json", LOG_SAMPLE_RATES="app=0.01"),
+         get_current_user, repo.get_quiz_by_id),
+    )
+
+    print(f"요청 {requests}건, 문제 {n_questions}개")
+    print(f"{'mode':>10} | {'p50 us':>8} | {'p99 us':>8} | {'mean us':>8} | {'log KB/req':>10}")
+    print("-" * 58)
+    for name, overrides, auth, load in scenarios:
+        for key, value in overrides.items():
+            setattr(settings, key, value)
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as sink:
+            with contextlib.redirect_stdout(sink):
+                setup_logging()      # 핸들러가 바뀐 stdout(임시 파일)에 쓰도록 다시 설정
+                latencies = await run(requests, auth, load, credentials, db)
+                sys.stdout.flush()
+            size = sink.tell()
+        logging.getLogger().handlers.clear()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(
+            f"{name:>10} | {statistics.median(latencies):>8.1f} | {p99:>8.1f} | "
+            f"{statistics.mean(latencies):>8.1f} | {size / requests / 1024:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
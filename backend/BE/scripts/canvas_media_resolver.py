@@ -0,0 +1,260 @@
+"""
+Canvas 모듈 아이템 → LTI 외부 도구 → 콘텐츠 공유(commons) 플레이어 체인을
+브라우저 없이 HTTP 요청만으로 따라가 실제 미디어(mp4) URL을 찾는다.
+
+로그인된 세션 쿠키가 있어야 하며, 어느 단계에서든 실패하면 None을 반환하고
+호출 측(canvas_video_downloader)이 기존 Selenium 경로로 폴백한다.
+"""
+import re
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+COMMONS_HOST = "commons.khu.ac.kr"
+COMMONS_REFERER = "https://commons.khu.ac.kr/"
+CONTENT_INFO_PATH = "/viewer/ssplayer/uniplayer_support/content.php"
+
+REQUEST_TIMEOUT = 10
+MAX_HOPS = 6
+
+MEDIA_URL_RE = re.compile(r"https?://[^\s\"'<>\\]+?\.mp4(?:\?[^\s\"'<>\\]*)?", re.IGNORECASE)
+CONTENT_ID_RE = re.compile(r"(?:/em/|content_id=)([0-9A-Za-z_-]+)")
+
+
+@dataclass
+class ResolvedMedia:
+    url: str
+    title: Optional[str]
+    referer: str = COMMONS_REFERER
+
+
+# -------------------- HTML 파싱 --------------------
+class _FrameFormParser(HTMLParser):
+    """iframe src, LTI 자동 제출 form(action + hidden input)만 수집"""
+
+    def __init__(self):
+        super().__init__()
+        self.iframes: List[str] = []
+        self.forms: List[Tuple[str, str, Dict[str, str]]] = []
+        self._form: Optional[Tuple[str, str, Dict[str, str]]] = None
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "iframe" and a.get("src"):
+            self.iframes.append(a["src"])
+        elif tag == "form" and a.get("action"):
+            self._form = (a["action"], (a.get("method") or "get").lower(), {})
+        elif tag == "input" and self._form is not None and a.get("name"):
+            self._form[2][a["name"]] = a.get("value") or ""
+
+    def handle_endtag(self, tag):
+        if tag == "form" and self._form is not None:
+            self.forms.append(self._form)
+            self._form = None
+
+
+def _parse(html: str) -> _FrameFormParser:
+    parser = _FrameFormParser()
+    try:
+        parser.feed(html)
+    except Exception:
+        pass
+    return parser
+
+
+# -------------------- 세션 --------------------
+def build_session(cookies: List[dict]) -> requests.Session:
+    """CDP/Selenium 형식 쿠키 목록으로 requests 세션 구성"""
+    s = requests.Session()
+    s.headers["User-Agent"] = USER_AGENT
+    for c in cookies or []:
+        try:
+            s.cookies.set(
+                c["name"], c["value"],
+                domain=(c.get("domain") or "").lstrip(".") or None,
+                path=c.get("path") or "/",
+            )
+        except KeyError:
+            continue
+    return s
+
+
+def _cookie_matches(cookie: dict, host: str, path: str, secure: bool, now: float) -> bool:
+    """RFC 6265 기준: 도메인(호스트 전용/상위 도메인), 경로, Secure, 만료 확인"""
+    domain = (cookie.get("domain") or "").lower()
+    if not domain:
+        return False
+    if domain.startswith("."):
+        # CDP/Selenium은 도메인 쿠키를 ".example.com"으로, 호스트 전용 쿠키는 점 없이 준다
+        domain = domain[1:]
+        if host != domain and not host.endswith("." + domain):
+            return False
+    elif host != domain:
+        return False
+
+    cookie_path = cookie.get("path") or "/"
+    if path != cookie_path and not (
+        path.startswith(cookie_path) and (cookie_path.endswith("/") or path[len(cookie_path)] == "/")
+    ):
+        return False
+
+    if cookie.get("secure") and not secure:
+        return False
+
+    # CDP는 expires(-1이면 세션 쿠키), Selenium은 expiry
+    expires = cookie.get("expires", cookie.get("expiry"))
+    if isinstance(expires, (int, float)) and 0 < expires < now:
+        return False
+    return True
+
+
+def cookie_header_for(url: str, cookies: List[dict]) -> Optional[str]:
+    """
+    브라우저 전체 쿠키(Network.getAllCookies) 중 url로 보낼 쿠키만 골라 Cookie 헤더 값으로.
+    Canvas/SSO 세션 쿠키가 미디어 서버(CDN) 등 다른 호스트로 나가지 않게 한다.
+    """
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or "").lower()
+    path = parts.path or "/"
+    secure = parts.scheme == "https"
+    now = time.time()
+    pairs = [
+        f"{c['name']}={c.get('value', '')}"
+        for c in cookies or []
+        if "name" in c and _cookie_matches(c, host, path, secure, now)
+    ]
+    return "; ".join(pairs) or None
+
+
+def _is_login_url(url: str) -> bool:
+    low = url.lower()
+    return "xn-sso" in low or "/login" in low
+
+
+# -------------------- commons 플레이어 --------------------
+def _content_id_from(url: str) -> Optional[str]:
+    if COMMONS_HOST not in url:
+        return None
+    m = CONTENT_ID_RE.search(url)
+    return m.group(1) if m else None
+
+
+def _resolve_from_content_info(session: requests.Session, content_id: str) -> Optional[ResolvedMedia]:
+    """commons 플레이어 설정 XML(content.php)에서 본영상 URL/제목 추출"""
+    info_url = f"https://{COMMONS_HOST}{CONTENT_INFO_PATH}"
+    r = session.get(
+        info_url,
+        params={"content_id": content_id, "_": int(time.time() * 1000)},
+        headers={"Referer": COMMONS_REFERER},
+        timeout=REQUEST_TIMEOUT,
+    )
+    r.raise_for_status()
+
+    try:
+        root = ET.fromstring(r.content)
+    except ET.ParseError:
+        m = MEDIA_URL_RE.search(r.text)
+        return ResolvedMedia(url=m.group(0), title=None) if m else None
+
+    def text(tag: str) -> Optional[str]:
+        el = root.find(f".//{tag}")
+        return el.text.strip() if el is not None and el.text else None
+
+    title = text("title") or text("content_title")
+    media_uri = text("media_uri")
+    main_media = text("main_media")
+
+    if media_uri and main_media and "[MEDIA_FILE]" in media_uri:
+        return ResolvedMedia(url=media_uri.replace("[MEDIA_FILE]", main_media), title=title)
+
+    m = MEDIA_URL_RE.search(r.text)
+    if m:
+        return ResolvedMedia(url=m.group(0), title=title)
+    return None
+
+
+# -------------------- 체인 추적 --------------------
+def resolve_media(video_page_url: str, cookies: List[dict]) -> Optional[ResolvedMedia]:
+    """
+    모듈 아이템 페이지에서 시작해 LTI form POST / iframe src를 따라가며
+    commons 콘텐츠 ID 또는 mp4 URL이 나올 때까지 탐색한다.
+    """
+    session = build_session(cookies)
+    started = time.time()
+
+    url, method, data = video_page_url, "get", None
+    visited = set()
+
+    try:
+        for hop in range(MAX_HOPS):
+            key = (url, method)
+            if key in visited:
+                break
+            visited.add(key)
+
+            content_id = _content_id_from(url)
+            if content_id:
+                media = _resolve_from_content_info(session, content_id)
+                if media:
+                    print(f"⚡ HTTP 미디어 해석 성공 ({time.time() - started:.2f}s, hop={hop})")
+                return media
+
+            if method == "post":
+                r = session.post(url, data=data, timeout=REQUEST_TIMEOUT)
+            else:
+                r = session.get(url, timeout=REQUEST_TIMEOUT)
+            r.raise_for_status()
+
+            if _is_login_url(r.url):
+                print("HTTP 해석 중단: 로그인 페이지로 리다이렉트됨")
+                return None
+
+            # 리다이렉트 끝이 commons 플레이어일 수 있음
+            content_id = _content_id_from(r.url)
+            if content_id:
+                url, method, data = r.url, "get", None
+                continue
+
+            m = MEDIA_URL_RE.search(r.text)
+            if m:
+                return ResolvedMedia(url=m.group(0), title=None)
+
+            page = _parse(r.text)
+            base = r.url
+
+            # commons iframe을 가장 먼저, 그다음 LTI launch form, 그 외 iframe 순
+            commons = [src for src in page.iframes if COMMONS_HOST in src]
+            if commons:
+                url, method, data = urllib.parse.urljoin(base, commons[0]), "get", None
+                continue
+
+            lti = [f for f in page.forms if "oauth_consumer_key" in f[2] or "lti_message_type" in f[2]]
+            if lti:
+                action, form_method, fields = lti[0]
+                url, method, data = urllib.parse.urljoin(base, action), form_method, fields
+                continue
+
+            tool_frames = [
+                src for src in page.iframes
+                if "external_tools" in src or "tool_content" in src or "lti" in src.lower()
+            ]
+            if tool_frames:
+                url, method, data = urllib.parse.urljoin(base, tool_frames[0]), "get", None
+                continue
+
+            break
+    except requests.RequestException as e:
+        print(f"HTTP 미디어 해석 실패: {type(e).__name__}: {e}")
+        return None
+
+    print("HTTP 미디어 해석 실패: 플레이어 설정을 찾지 못함")
+    return None
@@ -1,6 +1,7 @@
 import sys
 import time
 import os
+import json
 import urllib.parse
 import requests
 import traceback
@@ -17,6 +18,9 @@ from selenium.webdriver.common.action_chains import ActionChains
 from dotenv import load_dotenv
 load_dotenv()
 
+from canvas_media_resolver import cookie_header_for, resolve_media
+from media_store import get_store, media_key, probe_identity
+
 
 # ---------- 설정 ----------
 CHROME_DRIVER_PATH = None
@@ -76,6 +80,34 @@ def automatic_login(driver, login_page_url, username, password,
         return False
 
 
+def restore_session_cookies(driver, cookies):
+    """캐시된 SSO 세션 쿠키(CDP 형식)를 도메인과 무관하게 한 번에 주입"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        return True
+    except Exception as e:
+        print("세션 쿠키 복원 실패:", e)
+        return False
+
+
+def export_session_cookies(driver, out_path):
+    """로그인 이후 전체 도메인 쿠키를 파일로 남겨 워커가 캐시에 저장하도록 함"""
+    if not out_path:
+        return
+    cookies = get_all_cookies(driver)
+    if not cookies:
+        return
+    fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(cookies, f)
+
+
+def is_login_page(driver):
+    url = (driver.current_url or "").lower()
+    return "xn-sso" in url or "/login" in url
+
+
 def find_candidate_media_urls(driver, wait_seconds=5):
     time.sleep(wait_seconds)
     seen = []
@@ -113,10 +145,62 @@ def download_stream_with_requests(url, headers, out_path, chunk_size=1024*1024):
                         pbar.update(len(chunk))
         print("다운로드 완료:", out_path)
     except Exception as e:
+        # 호출 측이 다른 경로(Selenium)로 다시 시도할 수 있도록 종료하지 않고 예외를 올린다
         print("다운로드 중 오류 발생:", e)
-        sys.exit(1)
+        try:
+            os.remove(out_path)
+        except OSError:
+            pass
+        raise
         
 
+def get_all_cookies(driver):
+    try:
+        return driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+    except Exception:
+        return driver.get_cookies()
+
+
+def safe_filename(title, fallback_url):
+    # 파일명으로 쓸 수 없는 문자 제거 (윈도우 기준 \/:*?"<>|)
+    if not title:
+        title = os.path.splitext(os.path.basename(urllib.parse.urlparse(fallback_url).path))[0] or "lecture"
+    return "".join(c for c in title if c not in '\\/:*?"<>|')
+
+
+def save_media(url, headers, title):
+    """
+    미디어를 작업 폴더(DOWNLOAD_DIR)에 저장.
+    MEDIA_STORE_DIR가 설정되어 있으면 공유 저장소에서 한 번만 받고 하드링크로 연결한다.
+    """
+    out_path = os.path.join(DOWNLOAD_DIR, f"{safe_filename(title, url)}.mp4")
+    store = get_store()
+    if store is None:
+        download_stream_with_requests(url, headers, out_path)
+        return out_path
+
+    identity = probe_identity(url, headers)
+    key = media_key(url, title, identity)
+    store.fetch(
+        key,
+        lambda part: download_stream_with_requests(url, headers, part),
+        meta={"title": title, **identity},
+    )
+    store.link_into(key, out_path)
+    store.prune(int(os.getenv("MEDIA_STORE_MAX_BYTES") or 0))
+    return out_path
+
+
+def download_resolved_media(media, cookies):
+    """HTTP 해석기로 찾은 미디어를 브라우저 없이 바로 다운로드"""
+    headers = {"User-Agent": "Mozilla/5.0", "Referer": media.referer}
+    cookie_header = cookie_header_for(media.url, cookies)
+    if cookie_header:
+        headers["Cookie"] = cookie_header
+    out_path = save_media(media.url, headers, media.title)
+    return {"status": "downloaded", "path": out_path}
+
+
 def extract_commons_iframe_src(driver, timeout=15):
     frames = WebDriverWait(driver, timeout).until(
         EC.presence_of_all_elements_located((By.TAG_NAME,"iframe"))
@@ -331,25 +415,62 @@ def ensure_resume_after_src_swap(driver, watch_sec=45, poll=0.5):
 
 def main_workflow(video_page_url,
     login_page_url=None, username=None, password=None, username_selector=None, password_selector=None, submit_selector=None,
-    headless=HEADLESS):
+    headless=HEADLESS, cached_cookies=None, cookies_out=None):
     
     try:
         
         print("다운로드 경로:", DOWNLOAD_DIR)
         os.makedirs(DOWNLOAD_DIR, exist_ok=True)
 
+        # 0) 캐시된 세션이 있으면 브라우저 없이 HTTP만으로 미디어 URL 해석 시도
+        if cached_cookies:
+            media = resolve_media(video_page_url, cached_cookies)
+            if media:
+                print("선택된 URL (HTTP 해석):", media.url)
+                try:
+                    return download_resolved_media(media, cached_cookies)
+                except Exception:
+                    print("HTTP 다운로드 실패 - 브라우저 경로로 전환")
+            else:
+                print("HTTP 해석 실패 - 브라우저 경로로 전환")
+
         driver = start_driver(headless=headless)
         try:
-            # 1) 로그인 (무조건 자동 로그인 시도)
-            if username and password and username_selector and password_selector:
-                print("자동 로그인 시도...")
-                ok = automatic_login(driver, login_page_url or video_page_url,
-                    username, password, username_selector, password_selector, submit_selector)
-
-            # 2) 비디오 페이지 로드
-            print("비디오 페이지 로드:", video_page_url)
-            driver.get(video_page_url)
-            time.sleep(10)
+            # 1) 캐시된 세션이 있으면 쿠키 복원 후 바로 비디오 페이지 접근
+            session_ok = False
+            if cached_cookies and restore_session_cookies(driver, cached_cookies):
+                print("캐시된 세션으로 비디오 페이지 로드:", video_page_url)
+                driver.get(video_page_url)
+                time.sleep(10)
+                session_ok = not is_login_page(driver)
+                if not session_ok:
+                    print("캐시된 세션 만료 - 자동 로그인으로 전환")
+                    driver.delete_all_cookies()
+
+            if not session_ok:
+                # 2) 로그인 (자동 로그인 시도)
+                if username and password and username_selector and password_selector:
+                    print("자동 로그인 시도...")
+                    ok = automatic_login(driver, login_page_url or video_page_url,
+                        username, password, username_selector, password_selector, submit_selector)
+
+                # 3) 비디오 페이지 로드
+                print("비디오 페이지 로드:", video_page_url)
+                driver.get(video_page_url)
+                time.sleep(10)
+
+            if not is_login_page(driver):
+                export_session_cookies(driver, cookies_out)
+
+                # 로그인된 쿠키로 HTTP 해석 재시도 (성공 시 재생 시뮬레이션 생략)
+                session_cookies = get_all_cookies(driver)
+                media = resolve_media(video_page_url, session_cookies)
+                if media:
+                    print("선택된 URL (HTTP 해석):", media.url)
+                    try:
+                        return download_resolved_media(media, session_cookies)
+                    except Exception:
+                        print("HTTP 다운로드 실패 - 재생 캡처 경로로 전환")
 
             # 3) 모든 iframe 찾기
             iframes = driver.find_elements(By.TAG_NAME, "iframe")
@@ -415,11 +536,7 @@ def main_workflow(video_page_url,
             el = driver.find_element(By.CSS_SELECTOR, "span.vc-content-meta-title-text")
             title_text = el.get_attribute("title")
 
-            # 파일명으로 쓸 수 없는 문자 제거 (윈도우 기준 \/:*?"<>|)
-            safe_name = "".join(c for c in title_text if c not in '\\/:*?"<>|')
-            out_name = f"{safe_name}.mp4"
-            out_path = os.path.join(DOWNLOAD_DIR, out_name)
-            download_stream_with_requests(selected, headers, out_path)
+            out_path = save_media(selected, headers, title_text)
             return {"status": "downloaded", "path": out_path}
 
         finally:
@@ -448,9 +565,17 @@ if __name__ == "__main__":
     submit_selector   = "a"   # 로그인 버튼
     # --------------------------------------------
 
+    # 워커가 Redis에서 꺼내 준 세션 쿠키 (없으면 로그인부터 진행)
+    cached_cookies = None
+    if os.getenv("CANVAS_COOKIES"):
+        try:
+            cached_cookies = json.loads(os.getenv("CANVAS_COOKIES"))
+        except ValueError:
+            print("CANVAS_COOKIES 파싱 실패 - 무시")
+    cookies_out = os.getenv("CANVAS_COOKIES_OUT")
+
     print("DEBUG URL:", video_page_url)
     print("DEBUG ID:", username)
-    print("DEBUG PW:", password)
     res = main_workflow(video_page_url,
                         login_page_url=login_page_url,
                         username=username,
@@ -458,6 +583,8 @@ if __name__ == "__main__":
                         username_selector=username_selector,
                         password_selector=password_selector,
                         submit_selector=submit_selector,
-                        headless=True)
+                        headless=True,
+                        cached_cookies=cached_cookies,
+                        cookies_out=cookies_out)
 
     print("결과:", res)
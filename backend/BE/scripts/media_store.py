@@ -0,0 +1,177 @@
+"""
+여러 사용자/작업이 같은 강의 영상을 요청할 때 한 번만 다운로드하도록
+해석된 미디어 식별자(서명 파라미터를 뗀 URL + 제목 + 길이/ETag) 기준으로
+공유 저장소(MEDIA_STORE_DIR)에 보관하고 작업 폴더에는 하드링크로 연결한다.
+
+저장소 구조:
+    {MEDIA_STORE_DIR}/{key[:2]}/{key}/media.mp4
+    {MEDIA_STORE_DIR}/{key[:2]}/{key}/meta.json   # 존재하면 다운로드 완료
+    {MEDIA_STORE_DIR}/{key[:2]}/{key}/.lock       # 동시 다운로드 방지용 flock
+"""
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+import urllib.parse
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+import requests
+
+from metrics import cache_event
+
+MEDIA_FILE = "media.mp4"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+
+def canonical_media_url(url: str) -> str:
+    """서명/만료 쿼리 파라미터를 제거한 URL (같은 영상이면 사용자와 무관하게 동일)"""
+    p = urllib.parse.urlsplit(url)
+    return urllib.parse.urlunsplit((p.scheme, p.netloc.lower(), p.path, "", ""))
+
+
+def probe_identity(url: str, headers: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """본문을 받지 않고 Content-Length / ETag만 확인"""
+    length, etag = None, None
+    try:
+        r = requests.head(url, headers=headers, allow_redirects=True, timeout=10)
+        if r.ok:
+            length = r.headers.get("Content-Length")
+            etag = r.headers.get("ETag")
+    except requests.RequestException:
+        pass
+
+    if not length:
+        # HEAD를 막는 CDN 대비: 첫 바이트만 요청해 Content-Range에서 전체 길이 확인
+        try:
+            h = dict(headers, Range="bytes=0-0")
+            with requests.get(url, headers=h, stream=True, timeout=10) as r:
+                total = (r.headers.get("Content-Range") or "").rpartition("/")[2]
+                length = total if total.isdigit() else None
+                etag = etag or r.headers.get("ETag")
+        except requests.RequestException:
+            pass
+
+    return {"length": length, "etag": etag.strip('"') if etag else None}
+
+
+def media_key(url: str, title: Optional[str], identity: Dict[str, Optional[str]]) -> str:
+    parts = [canonical_media_url(url), title or "", identity.get("etag") or "", identity.get("length") or ""]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class MediaStore:
+    def __init__(self, root: str):
+        self.root = root
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def media_path(self, key: str) -> str:
+        return os.path.join(self.entry_dir(key), MEDIA_FILE)
+
+    def is_complete(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.entry_dir(key), META_FILE))
+
+    @contextmanager
+    def lock(self, key: str):
+        """같은 강의에 대한 동시 작업은 먼저 잡은 쪽이 받을 때까지 대기"""
+        d = self.entry_dir(key)
+        os.makedirs(d, exist_ok=True)
+        with open(os.path.join(d, LOCK_FILE), "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def fetch(
+        self,
+        key: str,
+        download: Callable[[str], None],
+        meta: Optional[dict] = None,
+    ) -> str:
+        """
+        저장소에 없으면 download(part_path)로 받아 저장, 있으면 바로 경로 반환.
+        meta.json은 파일 rename 뒤에 기록해 완료 표시로 사용한다.
+        """
+        with self.lock(key):
+            path = self.media_path(key)
+            if self.is_complete(key) and os.path.exists(path):
+                print(f"♻️ 공유 저장소 적중: {key}")
+                cache_event("media_store", True)
+                self._touch(key)
+                return path
+
+            cache_event("media_store", False)
+            part = path + ".part"
+            download(part)
+            os.replace(part, path)
+
+            info = dict(meta or {})
+            info.update({"key": key, "size": os.path.getsize(path), "stored_at": time.time()})
+            with open(os.path.join(self.entry_dir(key), META_FILE), "w", encoding="utf-8") as f:
+                json.dump(info, f, ensure_ascii=False)
+            print(f"📦 공유 저장소 저장: {key}")
+            return path
+
+    def link_into(self, key: str, dest_path: str) -> str:
+        """작업 폴더로 하드링크 (다른 파일시스템이면 복사)"""
+        src = self.media_path(key)
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        try:
+            os.link(src, dest_path)
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                raise
+            shutil.copy2(src, dest_path)
+        return dest_path
+
+    def _touch(self, key: str) -> None:
+        try:
+            os.utime(os.path.join(self.entry_dir(key), META_FILE))
+        except OSError:
+            pass
+
+    def prune(self, max_bytes: int) -> None:
+        """전체 용량이 max_bytes를 넘으면 오래 사용되지 않은 항목부터 삭제"""
+        if max_bytes <= 0 or not os.path.isdir(self.root):
+            return
+
+        entries = []
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for key in os.listdir(shard_dir):
+                meta = os.path.join(shard_dir, key, META_FILE)
+                media = os.path.join(shard_dir, key, MEDIA_FILE)
+                if os.path.exists(meta) and os.path.exists(media):
+                    entries.append((os.path.getmtime(meta), os.path.getsize(media), key))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= max_bytes:
+                break
+            with self.lock(key):
+                # 작업 폴더의 하드링크는 그대로 남으므로 진행 중인 작업에는 영향 없음
+                for name in (META_FILE, MEDIA_FILE):
+                    try:
+                        os.remove(os.path.join(self.entry_dir(key), name))
+                    except OSError:
+                        pass
+            total -= size
+            print(f"🧹 공유 저장소 정리: {key}")
+
+
+def get_store() -> Optional[MediaStore]:
+    root = os.getenv("MEDIA_STORE_DIR")
+    if not root:
+        return None
+    os.makedirs(root, exist_ok=True)
+    return MediaStore(root)
@@ -0,0 +1,92 @@
+"""
+스크립트 → 지표 기록 (app/service/metrics.py와 같은 Redis 키 형식)
+
+Celery 단계 태스크가 REDIS_HOST/REDIS_PORT를 넘겨줄 때만 동작하고, 없거나 Redis 오류가 나면 조용히 끈다.
+  observe_openai(endpoint, model, seconds, ok)   OpenAI 호출 지연 시간 히스토그램
+  cache_event(cache, hit)                        STT/키프레임/페이지 요약/공유 영상 저장소 적중률
+"""
+import math
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - 워커 이미지에는 항상 설치됨
+    redis = None
+
+KEY_PREFIX = "metrics:"
+# app/service/metrics.py의 OPENAI_BUCKETS와 같게 유지
+OPENAI_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+_client = None
+_disabled = False
+
+
+def _get_client():
+    global _client, _disabled
+    if _client is None and not _disabled:
+        if redis is None or not os.getenv("REDIS_HOST"):
+            _disabled = True
+            return None
+        _client = redis.Redis(
+            host=os.getenv("REDIS_HOST"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            socket_timeout=2,
+        )
+    return _client
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{k}="{str(v).replace(chr(34), "")}"' for k, v in sorted(labels.items()))
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _send(build):
+    global _disabled
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        build(pipe)
+        pipe.execute()
+    except Exception as e:
+        print(f"[metrics] 기록 실패 → 비활성화: {e}", flush=True)
+        _disabled = True
+
+
+def observe_openai(endpoint: str, model: str, seconds: float, ok: bool = True):
+    label_str = _labels(endpoint=endpoint, model=model, result="ok" if ok else "error")
+    key = f"{KEY_PREFIX}hist:ecampus_openai_request_seconds"
+
+    def build(pipe):
+        for le in list(OPENAI_BUCKETS) + [math.inf]:
+            if seconds <= le:
+                pipe.hincrby(key, f"{label_str}|{_fmt(le)}", 1)
+        pipe.hincrbyfloat(key, f"{label_str}|sum", seconds)
+        pipe.hincrby(key, f"{label_str}|count", 1)
+
+    _send(build)
+
+
+@contextmanager
+def timed_openai(endpoint: str, model: str):
+    """with timed_openai("responses", model): client.responses.create(...)"""
+    started = time.monotonic()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        observe_openai(endpoint, model, time.monotonic() - started, ok)
+
+
+def cache_event(cache: str, hit: bool):
+    field = _labels(cache=cache, result="hit" if hit else "miss")
+    _send(lambda pipe: pipe.hincrbyfloat(f"{KEY_PREFIX}counter:ecampus_cache_requests_total", field, 1))
@@ -24,12 +24,17 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.lib import colors
 from reportlab.lib.utils import ImageReader
 
+from progress import emit as emit_progress
+from metrics import cache_event, timed_openai
+
 # ======================== 사용자 설정 ========================
 #PDF_FILE            = "./downloads/Computer Architecture_230427-Branch Prediction 2_-_230504_043850.pdf"      # 입력 PDF
 # WORKDIR              = "./khunote_pdf_run"
 PDF_FILE = os.getenv("PDF_FILE")
 WORKDIR = os.getenv("WORKDIR", "./output")
 MODE = os.getenv("MODE", "quiz") 
+# 파이프라인 단계: all(기본, 전체 실행) / pages(PDF→이미지) / summarize(페이지 요약) / aggregate(통합 생성+렌더)
+STAGE = os.getenv("STAGE", "all")
 MODEL_VISION         = "gpt-4o-mini"  # 이미지 입력 지원 모델로 통일
 LANG                 = "ko"           # "ko" / "en"
 # MODE                 = "quiz"      # "summary" | "blank" | "quiz"
@@ -243,10 +248,11 @@ def call_openai_with_retry(model: str, content_payload: list):
     while True:
         try:
             time.sleep(REQUEST_INTERVAL_SEC)
-            resp = client.responses.create(
-                model=model,
-                input=[{"role":"user","content":content_payload}]
-            )
+            with timed_openai("responses", model):
+                resp = client.responses.create(
+                    model=model,
+                    input=[{"role":"user","content":content_payload}]
+                )
             return resp
         except (RateLimitError, APIError) as e:
             attempt += 1
@@ -407,7 +413,8 @@ def summarize_pages(image_paths: List[str]) -> Dict[str, str]:
     total = len(image_paths)
     updated = False
     
-    for i, img in enumerate(image_paths, start=2):
+    for n, (i, img) in enumerate(enumerate(image_paths, start=2), start=1):
+        emit_progress("summarize", n - 1, total, f"페이지 요약 중 ({n}/{total})")
         elapsed = time.time() - start_time  # start_time을 함수 시작부에 추가
         log(f"▶ [{i}/{total}] 진행률: {i/total*100:.1f}% | 경과: {elapsed:.0f}초")
         key = f"p{i}"
@@ -434,6 +441,7 @@ def summarize_pages(image_paths: List[str]) -> Dict[str, str]:
                 cached.get("model") == MODEL_VISION):
                 skip = True
 
+        cache_event("page_summary", skip)
         if skip:
             log(f"▶ 페이지 요약 건너뜀(체크포인트 hit): {human_page(i,total)}")
             continue
@@ -458,6 +466,7 @@ def summarize_pages(image_paths: List[str]) -> Dict[str, str]:
         # 매 페이지마다 저장
         save_checkpoint(cp)
         
+    emit_progress("summarize", total, total, "페이지 요약 완료")
     if not updated:
         log("ℹ 체크포인트 일치: 변경된 페이지가 없어 새 호출 없음")
     return {k: v["md"] if isinstance(v, dict) and "md" in v else v for k, v in cp.items() if k.startswith("p")}
@@ -639,13 +648,14 @@ def call_llm_on_text(
 
     # 1차 호출
     messages = _make_messages()
-    resp = client.responses.create(
-        model=MODEL_VISION,
-        input=messages,
-        max_output_tokens=max_output_tokens,
-        temperature=temperature,
-        top_p=top_p,
-    )
+    with timed_openai("responses", MODEL_VISION):
+        resp = client.responses.create(
+            model=MODEL_VISION,
+            input=messages,
+            max_output_tokens=max_output_tokens,
+            temperature=temperature,
+            top_p=top_p,
+        )
     raw_text = _extract_text(resp)
 
     try:
@@ -665,13 +675,14 @@ def call_llm_on_text(
             "- 반드시 유효 JSON만 출력(스키마 불일치 시 자체 복구)"
         )
         messages = _make_messages(extra_hint=booster)
-        resp = client.responses.create(
-            model=MODEL_VISION,
-            input=messages,
-            max_output_tokens=max_output_tokens,
-            temperature=temperature,
-            top_p=top_p,
-        )
+        with timed_openai("responses", MODEL_VISION):
+            resp = client.responses.create(
+                model=MODEL_VISION,
+                input=messages,
+                max_output_tokens=max_output_tokens,
+                temperature=temperature,
+                top_p=top_p,
+            )
         raw_text2 = _extract_text(resp)
         try:
             obj2 = json.loads(raw_text2)
@@ -1282,24 +1293,35 @@ def main():
     # 현재 해시 저장(다음 실행 대비)
     write_text(INPUT_HASH_PATH, current_pdf_hash)
 
-    # 1) PDF → 이미지
+    # 1) PDF → 이미지 (이후 단계에서는 이전 단계가 만든 페이지 이미지를 재사용)
     img_dir = os.path.join(WORKDIR, "pages")
-    if ALWAYS_CLEAN_PAGES:
-        try:
-            import glob
-            for f in glob.glob(os.path.join(img_dir, "page_*.jpg")):
-                os.remove(f)
-        except Exception as e:
-            log(f"[WARN] ALWAYS_CLEAN_PAGES 정리 실패: {e}")
-    image_paths = pdf_to_images(PDF_FILE, img_dir, dpi=DPI, poppler_path=POPPLER_PATH)
+    import glob
+    existing_pages = sorted(glob.glob(os.path.join(img_dir, "page_*.jpg")))
+    if STAGE in ("summarize", "aggregate") and existing_pages:
+        image_paths = existing_pages
+        log(f"▶ 기존 페이지 이미지 재사용: {len(image_paths)}p")
+    else:
+        if ALWAYS_CLEAN_PAGES:
+            try:
+                for f in existing_pages:
+                    os.remove(f)
+            except Exception as e:
+                log(f"[WARN] ALWAYS_CLEAN_PAGES 정리 실패: {e}")
+        emit_progress("pages", 0, 1, "PDF 페이지 변환 중")
+        image_paths = pdf_to_images(PDF_FILE, img_dir, dpi=DPI, poppler_path=POPPLER_PATH)
+        emit_progress("pages", 1, 1, f"PDF 페이지 변환 완료 ({len(image_paths)}p)")
+    if STAGE == "pages":
+        return
     
     # 이미지 경로 맵 생성 (썸네일 삽입을 위함)
     page_to_path_map = {i + 1: path for i, path in enumerate(image_paths)}
     img_path_manager = ImagePaths(page_to_path_map)
 
-    # 2) 페이지 단위 요약(체크포인트 지원)
+    # 2) 페이지 단위 요약(체크포인트 지원 → aggregate 단계에서는 전부 체크포인트 hit)
     page_summaries = summarize_pages(image_paths)  # { "p1":"...", ... }
     total = len(image_paths)
+    if STAGE == "summarize":
+        return
 
     # 3) 통합요청
     #   페이지 순서대로 합치기
@@ -1331,6 +1353,7 @@ def main():
 
     if MODE == "summary":
         log("▶ 통합 요약(JSON) 생성")
+        emit_progress("aggregate", 0, 2, "통합 생성 중")
         data = call_llm_on_text(prompt_aggregate_summary(all_pages_md), system_prompt=SYSTEM_PROMPT_VISUAL)
         raw_output_path = SUMMARY_JSON_PATH.replace(".json", "_raw_llm_output.txt")
         write_text(raw_output_path, json.dumps(data, ensure_ascii=False, indent=2))
@@ -1372,6 +1395,7 @@ def main():
         temp_files_to_clean = [] # 정리할 임시 파일 리스트 초기화
         try:
             # 2) ✅ JSON → PDF 변환 호출 및 임시 파일 목록 받기
+            emit_progress("render", 1, 2, "PDF 렌더링 중")
             temp_files_to_clean = export_pdf_from_json(data, SUMMARY_PDF_PATH, image_paths_map=img_path_manager) # 🚨 반환 값 받기
             log(f"✅ 요약 PDF 저장: {SUMMARY_PDF_PATH}")
         finally:
@@ -1387,6 +1411,7 @@ def main():
 
     elif MODE == "blank":
         log("▶ 빈칸 채우기 노트(JSON) 생성")
+        emit_progress("aggregate", 0, 2, "통합 생성 중")
         min_clozes = round(total / 3)
         data = call_llm_on_text(prompt_aggregate_blank(all_pages_md, min_clozes), system_prompt=SYSTEM_PROMPT_VISUAL)
         raw_output_path = BLANK_JSON_PATH.replace(".json", "_raw_llm_output.txt") # 🚨 [추가] 원시 출력 저장
@@ -1440,6 +1465,7 @@ def main():
         
         temp_files_to_clean = [] # 정리할 임시 파일 리스트 초기화
         try:
+            emit_progress("render", 1, 2, "PDF 렌더링 중")
             temp_files_to_clean = export_pdf_from_json(mapped, BLANK_PDF_PATH, image_paths_map=img_path_manager) 
             log(f"✅ 빈칸 PDF 저장(정답 숨김 + 마지막 장 정답 모음): {BLANK_PDF_PATH}")
         finally:
@@ -1454,6 +1480,7 @@ def main():
         
     elif MODE == "quiz":
         log("▶ 예상 문제(JSON) 생성")
+        emit_progress("aggregate", 0, 2, "통합 생성 중")
         min_clozes = round(total / 3)
         allow_short_answer = QUIZ_ALLOW_SHORT_ANSWER
         data = call_llm_on_text(
@@ -1488,5 +1515,7 @@ def main():
     else:
         raise ValueError("MODE must be one of: summary | blank | quiz")
 
+    emit_progress("render", 2, 2, "생성 완료")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
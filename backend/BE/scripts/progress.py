@@ -0,0 +1,70 @@
+"""
+스크립트 → Celery 단계 태스크로 진행 상황을 보내는 채널.
+
+태스크가 PROGRESS_STREAM(Redis Stream 키)을 환경변수로 넘기면 emit()이 이벤트를 XADD 하고,
+태스크 쪽(app/tasks/progress.py)이 이를 읽어 결과 백엔드의 진행률로 옮긴다.
+환경변수가 없거나 Redis에 연결할 수 없으면 아무 것도 하지 않는다 (단독 실행/로컬 테스트용).
+
+이벤트 필드:
+    step     세부 단계 이름 (pages / summarize / aggregate / render / analyze / transcribe / generate ...)
+    current  현재까지 처리한 개수
+    total    전체 개수 (모르면 0)
+    message  사용자에게 보여줄 짧은 설명
+"""
+import os
+import time
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - 워커 이미지에는 항상 설치됨
+    redis = None
+
+STREAM = os.getenv("PROGRESS_STREAM")
+MAXLEN = 500
+
+_client = None
+_disabled = False
+_last_emit = {}
+
+
+def _get_client():
+    global _client, _disabled
+    if _client is None and not _disabled:
+        if not STREAM or redis is None:
+            _disabled = True
+            return None
+        _client = redis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            socket_timeout=2,
+        )
+    return _client
+
+
+def emit(step: str, current: int = 0, total: int = 0, message: str = "", min_interval: float = 0.0):
+    """
+    진행 이벤트 전송. min_interval(초) 안에 같은 step 이벤트가 반복되면 건너뛴다 (프레임 단위 호출용).
+    마지막 이벤트(current >= total)는 항상 보낸다.
+    """
+    global _disabled
+    client = _get_client()
+    if client is None:
+        return
+
+    now = time.time()
+    done = total and current >= total
+    if min_interval and not done and now - _last_emit.get(step, 0) < min_interval:
+        return
+    _last_emit[step] = now
+
+    try:
+        client.xadd(
+            STREAM,
+            {"step": step, "current": int(current), "total": int(total), "message": message, "ts": now},
+            maxlen=MAXLEN,
+            approximate=True,
+        )
+    except Exception as e:
+        # 진행률은 부가 기능이므로 실패해도 작업은 계속
+        print(f"[progress] 전송 실패 → 비활성화: {e}", flush=True)
+        _disabled = True
@@ -1,11 +1,16 @@
 import base64
+import fcntl
 import hashlib
 import json
 import math
 import os
 import pathlib
 import re
+import shutil
+import subprocess
+import tempfile
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -13,7 +18,6 @@ from typing import Dict, List, Optional, Tuple
 import cv2
 import numpy as np
 from dotenv import load_dotenv
-from moviepy import VideoFileClip
 from openai import OpenAI
 from PIL import Image as PILImage
 from reportlab.lib import colors
@@ -39,16 +43,24 @@ from reportlab.platypus import (
     TableStyle,
 )
 
+from progress import emit as emit_progress
+from metrics import cache_event, timed_openai
+
 # -------------------- 사용자 설정 --------------------
 # VIDEO_FILE           = "./downloads/04 Spatial & Frequency Domain Approaches_02.mp4"
 VIDEO_FILE = os.getenv("VIDEO_FILE")
 # WORKDIR              = "./khunote_mp4_run"
 WORKDIR = os.getenv("WORKDIR")
 MODE = os.getenv("MODE", "quiz") 
+# 파이프라인 단계: all(기본) / analyze(오디오 분할+키프레임) / transcribe(STT) / generate(LLM+렌더)
+STAGE = os.getenv("STAGE", "all")
 
 if not VIDEO_FILE or not WORKDIR:
     raise ValueError("VIDEO_FILE과 WORKDIR 환경변수는 필수입니다")
 
+# STT / 오디오 청크 / 키프레임 캐시 루트 (작업 폴더 간 공유, 미설정 시 WORKDIR)
+MEDIA_CACHE_DIR = os.getenv("MEDIA_CACHE_DIR") or WORKDIR
+
 CHUNK_SECONDS        = 600
 KEYFRAME_THRESHOLD   = 45.0
 KEYFRAME_INTERVAL    = 30
@@ -185,76 +197,206 @@ def _save_json(path: str, obj):
     with open(path, "w", encoding="utf-8") as f:
         json.dump(obj, f, ensure_ascii=False, indent=2)
 
-# -------------------- 1) 오디오 분할 --------------------
-def split_audio_chunks(video_path: str, output_dir: str, chunk_seconds: int) -> List[str]:
-    clip = VideoFileClip(video_path)
-    audio = clip.audio
-    duration = int(clip.duration)
-    print(f"▶ 영상 길이: {human_time(duration)} ({duration}s)")
-    os.makedirs(output_dir, exist_ok=True)
+# -------------------- 1) 미디어 분석 (단일 디코드) --------------------
+KEYFRAME_SAMPLE_FPS = 1      # 키프레임 후보로 디코드할 초당 프레임 수
+KEYFRAME_MAX_WIDTH  = 1280   # 키프레임 저장 해상도 상한
+
+@dataclass
+class MediaInfo:
+    duration: float
+    fps: float
+    width: int
+    height: int
+    has_audio: bool
+    has_video: bool
+
+@dataclass
+class MediaAnalysis:
+    info: MediaInfo
+    audio_paths: List[str]
+    keyframes: List[Tuple[str, int]]
+
+def probe_media(video_path: str) -> MediaInfo:
+    """ffprobe로 컨테이너 헤더만 읽어 길이/fps/해상도 확인 (디코드 없음)"""
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", video_path],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    meta = json.loads(out or "{}")
+    streams = meta.get("streams", [])
+    video = next((st for st in streams if st.get("codec_type") == "video"), None)
+    audio = next((st for st in streams if st.get("codec_type") == "audio"), None)
+
+    fps = 0.0
+    if video:
+        num, _, den = (video.get("avg_frame_rate") or "0/1").partition("/")
+        fps = float(num) / float(den) if float(den or 0) else 0.0
+
+    duration = float(meta.get("format", {}).get("duration") or (video or {}).get("duration") or 0)
+    return MediaInfo(
+        duration=duration,
+        fps=fps,
+        width=int((video or {}).get("width") or 0),
+        height=int((video or {}).get("height") or 0),
+        has_audio=audio is not None,
+        has_video=video is not None,
+    )
+
+class KeyframeDetector:
+    """샘플링된 프레임을 순서대로 받아 장면 전환/주기 기준으로 키프레임 저장"""
+    def __init__(self, output_dir: str, threshold: float, interval_sec: int, min_gap_sec: int = 5):
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.threshold = threshold
+        self.interval_sec = interval_sec
+        self.min_gap_sec = min_gap_sec
+        self.prev_gray = None
+        self.last_ts = -999
+        self.outputs: List[Tuple[str, int]] = []
+
+    def feed(self, frame: np.ndarray, ts: int):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.prev_gray is not None:
+            diff = cv2.absdiff(gray, self.prev_gray)
+            changed = np.sum(diff) / diff.size > self.threshold
+            if (changed or ts % self.interval_sec == 0) and ts - self.last_ts > self.min_gap_sec:
+                out = os.path.join(self.output_dir, f"key_{len(self.outputs):04d}_{ts}s.jpg")
+                cv2.imwrite(out, frame)
+                self.outputs.append((out, ts))
+                self.last_ts = ts
+        self.prev_gray = gray
+
+def _rename_audio_segments(seg_dir: str, chunk_seconds: int, duration: int) -> List[str]:
+    """ffmpeg segment 결과(seg_0000.wav...)를 transcribe_all이 읽는 chunk_시작_끝.wav 형식으로 변경"""
     paths = []
-    for start in range(0, duration, chunk_seconds):
+    for i, name in enumerate(sorted(n for n in os.listdir(seg_dir) if n.startswith("seg_"))):
+        start = i * chunk_seconds
         end = min(start + chunk_seconds, duration)
-        sub = audio.subclipped(start, end)
-        out = os.path.join(output_dir, f"chunk_{start:06d}_{end:06d}.wav")
-        if not os.path.exists(out):  # 이미 있으면 재생성 생략 (조용히 덮어쓰지 않음)
-            sub.write_audiofile(out, fps=16000, codec="pcm_s16le")
-        paths.append(out)
-    clip.close()
+        dst = os.path.join(os.path.dirname(seg_dir), f"chunk_{start:06d}_{end:06d}.wav")
+        os.replace(os.path.join(seg_dir, name), dst)
+        paths.append(dst)
+    os.rmdir(seg_dir)
     return paths
 
+def analyze_media(
+    video_path: str,
+    info: MediaInfo,
+    audio_dir: Optional[str],
+    keyframe_dir: Optional[str],
+    chunk_seconds: int = CHUNK_SECONDS,
+    threshold: float = KEYFRAME_THRESHOLD,
+    interval_sec: int = KEYFRAME_INTERVAL,
+) -> MediaAnalysis:
+    """
+    ffmpeg 한 번으로 영상을 디코드하면서
+      - 오디오: 16kHz mono wav 청크로 분할 (audio_dir)
+      - 비디오: 초당 KEYFRAME_SAMPLE_FPS 프레임을 파이프로 받아 키프레임 검출 (keyframe_dir)
+    을 동시에 수행한다. 필요 없는 쪽은 None을 넘기면 해당 스트림을 건너뛴다.
+    """
+    duration = int(info.duration)
+    want_audio = bool(audio_dir) and info.has_audio
+    want_video = bool(keyframe_dir) and info.has_video and info.width > 0
+    if not want_audio and not want_video:
+        return MediaAnalysis(info=info, audio_paths=[], keyframes=[])
+
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin", "-y", "-i", video_path]
+
+    seg_dir = None
+    if want_audio:
+        os.makedirs(audio_dir, exist_ok=True)
+        seg_dir = os.path.join(audio_dir, f".seg_{os.getpid()}")
+        os.makedirs(seg_dir, exist_ok=True)
+        cmd += [
+            "-map", "0:a:0", "-vn", "-ac", "1", "-ar", "16000", "-c:a", "pcm_s16le",
+            "-f", "segment", "-segment_time", str(chunk_seconds), "-reset_timestamps", "1",
+            os.path.join(seg_dir, "seg_%04d.wav"),
+        ]
+
+    out_w = out_h = 0
+    if want_video:
+        out_w = min(info.width, KEYFRAME_MAX_WIDTH) // 2 * 2
+        out_h = int(round(info.height * out_w / info.width / 2)) * 2
+        cmd += [
+            "-map", "0:v:0", "-an",
+            "-vf", f"fps={KEYFRAME_SAMPLE_FPS},scale={out_w}:{out_h}",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1",
+        ]
+
+    print(f"▶ 미디어 분석 시작 (오디오={want_audio}, 키프레임={want_video}, 길이 {human_time(duration)})")
+    t0 = time.time()
+    detector = KeyframeDetector(keyframe_dir, threshold, interval_sec) if want_video else None
+
+    with tempfile.TemporaryFile() as errlog:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE if want_video else subprocess.DEVNULL,
+            stderr=errlog,
+        )
+        if want_video:
+            frame_bytes = out_w * out_h * 3
+            idx = 0
+            while True:
+                buf = proc.stdout.read(frame_bytes)
+                if len(buf) < frame_bytes:
+                    break
+                frame = np.frombuffer(buf, dtype=np.uint8).reshape((out_h, out_w, 3))
+                detector.feed(frame, int(idx / KEYFRAME_SAMPLE_FPS))
+                idx += 1
+                emit_progress("analyze", int(idx / KEYFRAME_SAMPLE_FPS), duration, "영상 분석 중", min_interval=2.0)
+            proc.stdout.close()
+        rc = proc.wait()
+        if rc != 0:
+            errlog.seek(0)
+            raise RuntimeError(f"ffmpeg 분석 실패(rc={rc}): {errlog.read().decode(errors='ignore')[-2000:]}")
+
+    emit_progress("analyze", duration, duration, "영상 분석 완료")
+    audio_paths = _rename_audio_segments(seg_dir, chunk_seconds, duration) if want_audio else []
+    keyframes = detector.outputs if detector else []
+    print(f"▶ 미디어 분석 완료: 오디오 청크 {len(audio_paths)}개, 키프레임 {len(keyframes)}장 ({time.time() - t0:.1f}s)")
+    return MediaAnalysis(info=info, audio_paths=audio_paths, keyframes=keyframes)
+
 # -------------------- 2) STT --------------------
 def stt_chunk(wav_path: str, model: str = STT_MODEL, lang: str = LANG) -> str:
-    with open(wav_path, "rb") as f:
+    with open(wav_path, "rb") as f, timed_openai("audio.transcriptions", model):
         resp = client.audio.transcriptions.create(
             model=model, file=f, language=lang
         )
     return resp.text or ""
 
-def transcribe_all(audio_paths: List[str]) -> List[Dict]:
+def transcribe_all(audio_paths: List[str], partial_path: Optional[str] = None) -> List[Dict]:
+    """
+    청크별 STT. partial_path가 있으면 청크마다 중간 결과를 저장하고,
+    재시도 시 이미 인식한 청크는 다시 호출하지 않는다.
+    """
+    done = {}
+    if partial_path and os.path.exists(partial_path):
+        try:
+            with open(partial_path, "r", encoding="utf-8") as f:
+                done = json.load(f)
+            print(f"▶ STT 중간 결과 재사용: {len(done)}개 청크")
+        except Exception:
+            done = {}
+
     results = []
-    for p in audio_paths:
-        m = re.search(r"chunk_(\d+)_(\d+)\.wav$", os.path.basename(p))
+    total = len(audio_paths)
+    for n, p in enumerate(audio_paths):
+        emit_progress("transcribe", n, total, f"음성 인식 중 ({n + 1}/{total})")
+        name = os.path.basename(p)
+        m = re.search(r"chunk_(\d+)_(\d+)\.wav$", name)
         start = int(m.group(1)) if m else 0
         end   = int(m.group(2)) if m else 0
-        print(f"▶ STT: {os.path.basename(p)} [{human_time(start)} ~ {human_time(end)}]")
-        text = stt_chunk(p)
+        if name in done:
+            text = done[name]
+        else:
+            print(f"▶ STT: {name} [{human_time(start)} ~ {human_time(end)}]")
+            text = stt_chunk(p)
+            done[name] = text
+            if partial_path:
+                _write_json_atomic(partial_path, done)
         results.append({"start": start, "end": end, "text": text})
+    emit_progress("transcribe", total, total, "음성 인식 완료")
     return results
 
-# -------------------- 3) 키프레임 --------------------
-def extract_keyframes_with_timestamps(video_path: str, output_dir: str, threshold=50.0, interval_sec=30) -> List[Tuple[str,int]]:
-    os.makedirs(output_dir, exist_ok=True)
-    cap = cv2.VideoCapture(video_path)
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    interval_frames = int(fps * interval_sec)
-    ret, prev_frame = cap.read()
-    if not ret: return []
-    prev_gray = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
-    frame_count, keyframe_count = 0, 0
-    outputs, last_ts = [], -999
-    while True:
-        ret, frame = cap.read()
-        if not ret: break
-        frame_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        diff = cv2.absdiff(frame_gray, prev_gray)
-        non_zero = np.sum(diff) / diff.size
-        ts = int(frame_count / fps)
-        save = False
-        if non_zero > threshold or frame_count % interval_frames == 0:
-            if ts - last_ts > 5:   # 너무 가까운 프레임 중복 방지
-                save = True
-        if save:
-            out = os.path.join(output_dir, f"key_{keyframe_count:04d}_{ts}s.jpg")
-            cv2.imwrite(out, frame)
-            outputs.append((out, ts))
-            keyframe_count += 1
-            last_ts = ts
-        prev_gray, frame_count = frame_gray, frame_count+1
-    cap.release()
-    print(f"▶ 키프레임: {keyframe_count}장 추출")
-    return outputs
-
 # -------------------- 4) 텍스트 전처리 --------------------
 def normalize_text(text: str) -> str:
     text = text.replace("\u3000"," ").replace("\xa0"," ")
@@ -489,13 +631,14 @@ def call_gpt_json(
 
     # 1차 시도
     messages = _make_messages()
-    resp = client.responses.create(
-        model=LLM_MODEL,
-        input=messages,
-        max_output_tokens=max_output_tokens,
-        temperature=temperature,
-        top_p=top_p,
-    )
+    with timed_openai("responses", LLM_MODEL):
+        resp = client.responses.create(
+            model=LLM_MODEL,
+            input=messages,
+            max_output_tokens=max_output_tokens,
+            temperature=temperature,
+            top_p=top_p,
+        )
     raw_text = _extract_text(resp)
 
     try:
@@ -515,13 +658,14 @@ def call_gpt_json(
             "- 반드시 유효 JSON만 출력(스키마 불일치 시 자체 복구)"
         )
         messages = _make_messages(extra_hint=booster)
-        resp = client.responses.create(
-            model=LLM_MODEL,
-            input=messages,
-            max_output_tokens=max_output_tokens,
-            temperature=temperature,
-            top_p=top_p,
-        )
+        with timed_openai("responses", LLM_MODEL):
+            resp = client.responses.create(
+                model=LLM_MODEL,
+                input=messages,
+                max_output_tokens=max_output_tokens,
+                temperature=temperature,
+                top_p=top_p,
+            )
         raw_text2 = _extract_text(resp)
         try:
             obj2 = json.loads(raw_text2)
@@ -534,22 +678,57 @@ def call_gpt_json(
 
     return obj
 # 동영상 캐시 저장
-def _video_signature(video_path: str) -> dict:
-    """영상의 식별 정보를 만들어 캐시 키로 사용."""
+SIG_SAMPLE_COUNT = 16          # 파일 전체에 고르게 분포한 샘플 블록 수
+SIG_SAMPLE_BYTES = 64 * 1024   # 샘플 블록 크기
+
+def _video_signature(video_path: str, duration_sec: int) -> dict:
+    """
+    영상 내용 기반 식별 정보 (경로/mtime 무관).
+    크기 + 재생 길이 + 고정 오프셋 샘플 블록 해시로 만들어 재다운로드/복사본도 같은 키가 된다.
+    """
     ap = os.path.abspath(video_path)
-    try:
-        st = os.stat(ap)
-        size = st.st_size
-        mtime = int(st.st_mtime)
-    except FileNotFoundError:
-        size = -1
-        mtime = -1
-    key = f"{os.path.basename(ap)}__{size}__{mtime}"
-    # 경로까지 섞어서 64 길이의 안정 키도 만들자(폴더명 충돌 방지)
-    strong = hashlib.sha1((ap + "|" + key).encode("utf-8")).hexdigest()
-    return {"abs": ap, "size": size, "mtime": mtime, "key": key, "strong": strong}
-
-def _load_stt_cache(json_path: str, sig: dict) -> Optional[list]:
+    size = os.path.getsize(ap)
+    h = hashlib.sha1()
+    h.update(f"{size}|{int(duration_sec)}".encode("utf-8"))
+    with open(ap, "rb") as f:
+        if size <= SIG_SAMPLE_COUNT * SIG_SAMPLE_BYTES:
+            h.update(f.read())
+        else:
+            last = size - SIG_SAMPLE_BYTES
+            for i in range(SIG_SAMPLE_COUNT):
+                f.seek(last * i // (SIG_SAMPLE_COUNT - 1))
+                h.update(f.read(SIG_SAMPLE_BYTES))
+    strong = h.hexdigest()
+    return {"abs": ap, "size": size, "duration": int(duration_sec), "strong": strong}
+
+def _cache_paths(sig: dict) -> dict:
+    root = MEDIA_CACHE_DIR
+    return {
+        "audio_dir": os.path.join(root, "audio_chunks", sig["strong"]),
+        "stt_json": os.path.join(root, "stt_cache", f"stt_{sig['strong']}.json"),
+        "keyframe_dir": os.path.join(root, "keyframes", sig["strong"]),
+        "lock": os.path.join(root, "locks", f"{sig['strong']}.lock"),
+    }
+
+@contextmanager
+def _cache_lock(path: str):
+    """같은 영상을 동시에 처리하는 작업끼리 STT/키프레임을 중복 생성하지 않도록 flock"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+def _write_json_atomic(path: str, obj):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+def _load_stt_cache(json_path: str, sig: dict, chunk_seconds: int) -> Optional[list]:
     """캐시 JSON이 있고 시그니처가 맞으면 results를 반환."""
     if not os.path.exists(json_path):
         return None
@@ -558,9 +737,8 @@ def _load_stt_cache(json_path: str, sig: dict) -> Optional[list]:
             obj = json.load(f)
         meta = obj.get("meta", {})
         ok = (
-            meta.get("video_abs") == sig["abs"] and
-            meta.get("video_size") == sig["size"] and
-            meta.get("video_mtime") == sig["mtime"]
+            meta.get("sig_sha1") == sig["strong"] and
+            meta.get("chunk_seconds") == chunk_seconds
         )
         if ok and isinstance(obj.get("results"), list):
             print("▶ STT 캐시 적중: 기존 결과를 재사용합니다.")
@@ -570,24 +748,44 @@ def _load_stt_cache(json_path: str, sig: dict) -> Optional[list]:
     return None
 
 def _save_stt_cache(json_path: str, sig: dict, results: list, chunk_seconds: int, stt_model: str):
-    os.makedirs(os.path.dirname(json_path), exist_ok=True)
     payload = {
         "meta": {
             "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "video_abs": sig["abs"],
             "video_size": sig["size"],
-            "video_mtime": sig["mtime"],
-            "sig_key": sig["key"],
+            "video_duration": sig["duration"],
             "sig_sha1": sig["strong"],
             "chunk_seconds": chunk_seconds,
             "stt_model": stt_model,
         },
         "results": results,
     }
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    _write_json_atomic(json_path, payload)
     print(f"✅ STT 캐시 저장: {json_path}")   
 
+def _load_keyframe_cache(keyframe_dir: str, threshold: float, interval_sec: int) -> Optional[List[Tuple[str, int]]]:
+    manifest = os.path.join(keyframe_dir, "keyframes.json")
+    if not os.path.exists(manifest):
+        return None
+    try:
+        with open(manifest, "r", encoding="utf-8") as f:
+            obj = json.load(f)
+        if obj.get("threshold") != threshold or obj.get("interval_sec") != interval_sec:
+            return None
+        frames = [(os.path.join(keyframe_dir, name), ts) for name, ts in obj.get("frames", [])]
+        if all(os.path.exists(p) for p, _ in frames):
+            print(f"▶ 키프레임 캐시 적중: {len(frames)}장 재사용")
+            return frames
+    except Exception:
+        pass
+    return None
+
+def _save_keyframe_cache(keyframe_dir: str, keyframes: List[Tuple[str, int]], threshold: float, interval_sec: int):
+    _write_json_atomic(os.path.join(keyframe_dir, "keyframes.json"), {
+        "threshold": threshold,
+        "interval_sec": interval_sec,
+        "frames": [(os.path.basename(p), ts) for p, ts in keyframes],
+    })
+
 
 # -------------------- 7) PDF 출력 --------------------
 def render_pdf_from_json(json_path: str,
@@ -924,28 +1122,15 @@ def render_pdf_from_json(json_path: str,
     doc.build(story)
     print(f"✅ PDF 저장 완료: {outpath}")
 
-def export_stt_text(video_file: str, workdir: str, out_txt: str):
-    import hashlib
-    import json
-    import os
-
-    def _video_signature(video_path: str):
-        ap = os.path.abspath(video_file)
-        st = os.stat(ap)
-        key = f"{os.path.basename(ap)}__{st.st_size}__{int(st.st_mtime)}"
-        strong = hashlib.sha1((ap + "|" + key).encode("utf-8")).hexdigest()
-        return {"strong": strong}
-
+def export_stt_text(stt_cache_json: str, out_txt: str):
     def hms(t):
         m, s = divmod(int(t), 60); h, m = divmod(m, 60)
         return f"{h:02d}:{m:02d}:{s:02d}"
 
-    sig = _video_signature(video_file)
-    cache_path = os.path.join(workdir, "stt_cache", f"stt_{sig['strong']}.json")
-    if not os.path.exists(cache_path):
-        raise FileNotFoundError(f"STT 캐시가 없습니다: {cache_path}\n스크립트를 한 번 실행해 STT를 생성하세요.")
+    if not os.path.exists(stt_cache_json):
+        raise FileNotFoundError(f"STT 캐시가 없습니다: {stt_cache_json}\n스크립트를 한 번 실행해 STT를 생성하세요.")
 
-    with open(cache_path, "r", encoding="utf-8") as f:
+    with open(stt_cache_json, "r", encoding="utf-8") as f:
         obj = json.load(f)
 
     results = sorted(obj.get("results", []), key=lambda r: r.get("start", 0))
@@ -987,41 +1172,94 @@ def build_page_blocks(stt_results: List[Dict], keyframes: List[Tuple[str,int]],
         blocks.append((title, txt, is_critical))
     return blocks
 
+# -------------------- 단계별 산출물 준비 (캐시 재사용) --------------------
+def _audio_chunks_ready(audio_dir: str) -> bool:
+    return os.path.exists(os.path.join(audio_dir, ".complete"))
+
+def prepare_media(info: MediaInfo, sig: dict, cache: dict, want_audio: bool = True, want_keyframes: bool = True):
+    """캐시에 없는 오디오 청크/키프레임만 골라 한 번의 디코드로 생성"""
+    audio_dir = cache["audio_dir"]
+    need_audio = (
+        want_audio
+        and _load_stt_cache(cache["stt_json"], sig, CHUNK_SECONDS) is None
+        and not _audio_chunks_ready(audio_dir)
+    )
+    need_keyframes = (
+        want_keyframes
+        and _load_keyframe_cache(cache["keyframe_dir"], KEYFRAME_THRESHOLD, KEYFRAME_INTERVAL) is None
+    )
+    if not need_audio and not need_keyframes:
+        return
+
+    if need_audio and os.path.isdir(audio_dir):
+        shutil.rmtree(audio_dir)   # 중단된 이전 분할 결과 정리
+    analysis = analyze_media(
+        VIDEO_FILE, info,
+        audio_dir=audio_dir if need_audio else None,
+        keyframe_dir=cache["keyframe_dir"] if need_keyframes else None,
+    )
+    if need_keyframes:
+        _save_keyframe_cache(cache["keyframe_dir"], analysis.keyframes, KEYFRAME_THRESHOLD, KEYFRAME_INTERVAL)
+    if need_audio:
+        pathlib.Path(audio_dir, ".complete").touch()
+
+def ensure_stt(info: MediaInfo, sig: dict, cache: dict) -> List[Dict]:
+    stt_results = _load_stt_cache(cache["stt_json"], sig, CHUNK_SECONDS)
+    cache_event("stt", stt_results is not None)
+    if stt_results is not None:
+        return stt_results
+    prepare_media(info, sig, cache, want_keyframes=False)
+    audio_paths = sorted(str(p) for p in Path(cache["audio_dir"]).glob("chunk_*.wav"))
+    partial_path = os.path.join(cache["audio_dir"], "stt_partial.json")
+    stt_results = transcribe_all(audio_paths, partial_path=partial_path)
+    _save_stt_cache(cache["stt_json"], sig, stt_results, CHUNK_SECONDS, STT_MODEL)
+    if os.path.exists(partial_path):
+        os.remove(partial_path)
+    return stt_results
+
+def ensure_keyframes(info: MediaInfo, sig: dict, cache: dict) -> List[Tuple[str, int]]:
+    keyframes = _load_keyframe_cache(cache["keyframe_dir"], KEYFRAME_THRESHOLD, KEYFRAME_INTERVAL)
+    cache_event("keyframes", keyframes is not None)
+    if keyframes is not None:
+        return keyframes
+    prepare_media(info, sig, cache, want_audio=False)
+    return _load_keyframe_cache(cache["keyframe_dir"], KEYFRAME_THRESHOLD, KEYFRAME_INTERVAL) or []
+
 # -------------------- 실행 --------------------
 def main():
     if not os.path.exists(VIDEO_FILE):
         raise FileNotFoundError(f"영상 없음: {VIDEO_FILE}")
 
-    clip = VideoFileClip(VIDEO_FILE)
-    duration_sec = int(clip.duration or 0)
-    clip.close()
+    info = probe_media(VIDEO_FILE)
+    duration_sec = int(info.duration or 0)
+    print(f"▶ 영상 길이: {human_time(duration_sec)} ({duration_sec}s), fps={info.fps:.2f}, {info.width}x{info.height}")
     min_clozes = max(10, math.ceil((duration_sec / 3600) * 10))  # 1시간당 10문제, 최소 10
     print(f"min_clozes = {min_clozes}")
     
-    # 시그니처/경로 설정
-    sig = _video_signature(VIDEO_FILE)
-    audio_dir = os.path.join(WORKDIR, "audio_chunks", sig["strong"])  # 영상별로 분리
-    stt_cache_json = os.path.join(WORKDIR, "stt_cache", f"stt_{sig['strong']}.json")
-
-    # 1) audio chunk 단위로 자르기 -> stt 적용(캐시 있으면 그걸로 대체체)
-    stt_results = _load_stt_cache(stt_cache_json, sig)
-    if stt_results is None:
-        # 캐시 없음 → 청크 생성 + STT
-        audio_paths = split_audio_chunks(VIDEO_FILE, audio_dir, CHUNK_SECONDS)
-        stt_results = transcribe_all(audio_paths)
-        _save_stt_cache(stt_cache_json, sig, stt_results, CHUNK_SECONDS, STT_MODEL)
-    else:
-        # 캐시가 있으면 청크 디렉토리도 확인(없어도 상관 없으나 있으면 재활용 가능)
-        if not os.path.isdir(audio_dir):
-            print("※ 참고: 오디오 청크 폴더가 없어 STT만 재사용합니다. (문제 없음)")
+    # 시그니처/경로 설정 (내용 기반 키 → 작업 폴더가 달라도 캐시 공유)
+    sig = _video_signature(VIDEO_FILE, duration_sec)
+    cache = _cache_paths(sig)
+    stt_cache_json = cache["stt_json"]
+
+    with _cache_lock(cache["lock"]):
+        # 1) 캐시에 없는 오디오 청크/키프레임을 한 번의 디코드로 생성
+        if STAGE in ("all", "analyze"):
+            prepare_media(info, sig, cache)
+        if STAGE == "analyze":
+            return
+
+        # audio chunk → STT (캐시 있으면 그걸로 대체)
+        stt_results = ensure_stt(info, sig, cache)
+        if STAGE == "transcribe":
+            return
+        keyframes = ensure_keyframes(info, sig, cache)
 
     # 2) stt text 전처리
     text_all = "\n".join([r["text"] for r in stt_results])
     paras = detect_titles(split_paragraphs(text_all))
-    export_stt_text(VIDEO_FILE, WORKDIR, os.path.join(WORKDIR, "KHUNote_stt.txt"))
-    # 3) keyframe 추출
-    keyframes = extract_keyframes_with_timestamps(VIDEO_FILE, os.path.join(WORKDIR,"keyframes"), KEYFRAME_THRESHOLD, KEYFRAME_INTERVAL)
+    export_stt_text(stt_cache_json, os.path.join(WORKDIR, "KHUNote_stt.txt"))
     keyframe_paths = [k[0] for k in keyframes]
+    emit_progress("generate", 0, 2, "GPT로 생성 중")
 
     if MODE=="summary":
         prompt = prompt_summary(paras)
@@ -1035,6 +1273,7 @@ def main():
         )
         json_path = os.path.join(WORKDIR, "KHUNote_summary.json")
         _save_json(json_path, obj)
+        emit_progress("render", 1, 2, "PDF 렌더링 중")
         render_pdf_from_json(
             json_path=json_path,
             outpath=os.path.join(WORKDIR, "KHUNote_summary.pdf"),
@@ -1070,6 +1309,7 @@ def main():
         json_path = os.path.join(WORKDIR, "KHUNote_blank.json")
         _save_json(json_path, obj)
 
+        emit_progress("render", 1, 2, "PDF 렌더링 중")
         render_pdf_from_json(
             json_path=json_path,
             outpath=os.path.join(WORKDIR, "KHUNote_blank.pdf"),
@@ -1102,5 +1342,7 @@ def main():
         _save_json(json_path, obj)
         print(f"✅ 예상문제 JSON 저장 완료: {json_path}")
 
+    emit_progress("render", 2, 2, "생성 완료")
+
 if __name__=="__main__":
     main()
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+from app.util.grading import grade_submission, is_correct, strip_particle
+
+SHORT = "SHORT"
+
+
+def test_particles_are_not_stripped_by_default():
+    assert not is_correct(SHORT, "대만", "대만은")
+
+
+def test_particle_on_user_answer_is_accepted_when_enabled():
+    assert is_correct(SHORT, "대만", "대만은", strip_particles=True)
+    assert is_correct(SHORT, "메모리", "메모리에서", strip_particles=True)
+    assert is_correct(SHORT, "고양이", "고양이가", strip_particles=True)
+
+
+def test_exact_answer_ending_in_particle_syllable_is_correct():
+    assert is_correct(SHORT, "고양이", "고양이", strip_particles=True)
+    assert is_correct(SHORT, "도로", "도로", strip_particles=True)
+
+
+def test_near_miss_prefix_is_wrong():
+    # 정답 쪽에서 조사처럼 보이는 글자를 떼면 앞부분만 쓴 오답이 정답이 됨
+    assert not is_correct(SHORT, "대만", "대", strip_particles=True)
+    assert not is_correct(SHORT, "메모리", "메모", strip_particles=True)
+    assert not is_correct(SHORT, "도로", "도", strip_particles=True)
+    assert not is_correct(SHORT, "고양이", "고양", strip_particles=True)
+
+
+def test_particle_after_short_stem_is_accepted_when_enabled():
+    assert is_correct(SHORT, "서울", "서울에서", strip_particles=True)
+    assert is_correct(SHORT, "대만", "대만은 ", strip_particles=True)
+
+
+def test_multi_word_answer_compares_each_word():
+    assert is_correct(SHORT, "대만 서울", "대만 서울에서", strip_particles=True)
+    assert is_correct(SHORT, "대만 서울", "대만은 서울에서", strip_particles=True)
+    assert not is_correct(SHORT, "대만 서울", "서울에서", strip_particles=True)
+
+
+def test_strip_particle_keeps_at_least_one_syllable():
+    assert strip_particle("서울에서") == "서울"
+    assert strip_particle("메모리에서") == "메모리"
+    assert strip_particle("이") == "이"
+    assert strip_particle("가") == "가"
+
+
+def test_grade_submission_uses_setting(monkeypatch):
+    from app.core.config import settings
+
+    questions = [SimpleNamespace(question_id=1, question_number=1, question_type=SHORT, correct_answer="대만")]
+    monkeypatch.setattr(settings, "GRADING_STRIP_KOREAN_PARTICLES", True)
+    assert grade_submission(questions, {1: "대만은"}).correct_number == 1
+    assert grade_submission(questions, {1: "대"}).correct_number == 0
+    monkeypatch.setattr(settings, "GRADING_STRIP_KOREAN_PARTICLES", False)
+    assert grade_submission(questions, {1: "대만은"}).correct_number == 0
@@ -0,0 +1,45 @@
+import os
+import sys
+import textwrap
+import time
+
+from app.util.subprocess_runner import run_streaming
+
+
+def test_lines_arrive_before_child_exits(tmp_path, capsys):
+    """자식이 첫 줄을 찍고 기다리는 동안(종료 전) 그 줄이 전달되어야 한다 (블록 버퍼링이면 시간 초과)"""
+    release = tmp_path / "release"
+    script = tmp_path / "child.py"
+    script.write_text(textwrap.dedent(f"""
+        import os, time
+        print("first line")
+        while not os.path.exists({str(release)!r}):
+            time.sleep(0.05)
+        print("second line")
+    """))
+    logged = []
+
+    def on_tick():
+        logged.append(capsys.readouterr().out)
+        if "first line" in "".join(logged) and not release.exists():
+            release.write_text("go")
+        time.sleep(0.05)
+
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONUNBUFFERED"}
+    result = run_streaming([sys.executable, str(script)], env, timeout=10, label="test", on_tick=on_tick)
+
+    assert result.returncode == 0
+    assert release.exists()
+    assert result.stdout_tail == ["first line", "second line"]
+
+
+def test_progress_lines_go_to_callback(tmp_path):
+    script = tmp_path / "child.py"
+    script.write_text('import sys\nsys.stderr.write(" 50%|#####     | 5/10\\r")\nsys.stderr.write("100%|##########| 10/10\\n")\n')
+    fractions = []
+    result = run_streaming(
+        [sys.executable, str(script)], dict(os.environ), timeout=20, label="test",
+        on_progress=lambda fraction, line: fractions.append(fraction), progress_interval=0,
+    )
+    assert result.returncode == 0
+    assert fractions == [0.5, 1.0]
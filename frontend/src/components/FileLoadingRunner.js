@@ -19,6 +19,7 @@ export default function FileLoadingRunner({ inputSource, option }) {
 
   const didRunRef = useRef(false);
   const pollTimerRef = useRef(null);
+  const eventSourceRef = useRef(null);
 
   const isQuiz = option?.type === "quiz";
 
@@ -166,11 +167,13 @@ export default function FileLoadingRunner({ inputSource, option }) {
     run();
   }, [inputSource, option, navigate, getAuthHeader]);
 
-  // ✅ quiz 폴링: 2분마다 task-status 호출 -> COMPLETED면 ready만 세팅 (generate 재호출 X)
+  // ✅ quiz 상태 구독: SSE(events)로 상태가 바뀔 때마다 받고, COMPLETED면 ready만 세팅 (generate 재호출 X)
+  // - EventSource는 헤더를 못 보내므로 events/token으로 받은 단기 토큰을 쿼리로 전달
+  // - 토큰 발급/연결이 실패하면 기존처럼 2분마다 task-status 폴링
   useEffect(() => {
     if (!isQuiz) return;
     if (!taskId) return;
-    if (quizReady) return; // 이미 준비됐으면 폴링 중단
+    if (quizReady) return; // 이미 준비됐으면 구독/폴링 중단
 
     const authHeader = getAuthHeader();
     if (!authHeader) {
@@ -179,6 +182,8 @@ export default function FileLoadingRunner({ inputSource, option }) {
       return;
     }
 
+    let cancelled = false;
+
     const stopPolling = () => {
       if (pollTimerRef.current) {
         clearInterval(pollTimerRef.current);
@@ -186,6 +191,23 @@ export default function FileLoadingRunner({ inputSource, option }) {
       }
     };
 
+    const closeEvents = () => {
+      if (eventSourceRef.current) {
+        eventSourceRef.current.close();
+        eventSourceRef.current = null;
+      }
+    };
+
+    const handleStatus = (statusData) => {
+      setQuizStatusData(statusData);
+
+      if (statusData?.status === "COMPLETED") {
+        stopPolling();
+        closeEvents();
+        setQuizReady(true);
+      }
+    };
+
     const checkStatusOnce = async () => {
       try {
         const res = await axios.get(`/api/quiz/task-status/${taskId}`, {
@@ -194,13 +216,7 @@ export default function FileLoadingRunner({ inputSource, option }) {
 
         console.log("[Quiz Polling] / task-status:", res.data);
 
-        const statusData = res.data?.data || {};
-        setQuizStatusData(statusData);
-
-        if (statusData?.status === "COMPLETED") {
-          stopPolling();
-          setQuizReady(true);
-        }
+        handleStatus(res.data?.data || {});
       } catch (err) {
         console.group("❌ 퀴즈 상태 폴링 실패");
         if (err.response) {
@@ -213,10 +229,56 @@ export default function FileLoadingRunner({ inputSource, option }) {
       }
     };
 
-    // ✅ 2분 주기
-    pollTimerRef.current = setInterval(checkStatusOnce, 2 * 60 * 1000);
+    // ✅ 2분 주기 (SSE를 쓸 수 없을 때)
+    const startPolling = () => {
+      if (cancelled || pollTimerRef.current) return;
+      pollTimerRef.current = setInterval(checkStatusOnce, 2 * 60 * 1000);
+    };
 
-    return () => stopPolling();
+    const subscribe = async () => {
+      try {
+        const res = await axios.post(
+          `/api/quiz/task-status/${taskId}/events/token`,
+          null,
+          { headers: { ...authHeader } }
+        );
+        if (cancelled) return;
+
+        const token = res.data?.data?.token;
+        if (!token || typeof EventSource === "undefined") {
+          startPolling();
+          return;
+        }
+
+        const es = new EventSource(
+          `${axios.defaults.baseURL}/api/quiz/task-status/${taskId}/events?token=${encodeURIComponent(token)}`
+        );
+        eventSourceRef.current = es;
+
+        es.addEventListener("status", (e) => {
+          const statusData = JSON.parse(e.data);
+          console.log("[Quiz SSE] / task-status:", statusData);
+          handleStatus(statusData);
+        });
+
+        // 서버가 COMPLETED/FAILED를 보내고 닫은 경우도 여기로 옴 (토큰이 만료돼 재연결 불가 → 폴링)
+        es.onerror = () => {
+          closeEvents();
+          startPolling();
+        };
+      } catch (err) {
+        console.log("[Quiz SSE] 구독 실패 → 폴링:", err.response?.status || err.message);
+        startPolling();
+      }
+    };
+
+    subscribe();
+
+    return () => {
+      cancelled = true;
+      closeEvents();
+      stopPolling();
+    };
   }, [isQuiz, taskId, quizReady, navigate, getAuthHeader]);
 
   // ✅ quiz 이동 조건:
@@ -18,12 +18,47 @@ const COLOR_CLASSES = [
   "card--lavender",
 ];
 
+// 한 페이지 요청: { list, nextCursor }
+const fetchQuizPage = async (token, cursor) => {
+  const res = await axios.get("http://192.168.0.10:8000/api/quiz", {
+    headers: {
+      Authorization: `Bearer ${token}`,
+    },
+    params: cursor ? { cursor } : {},
+  });
+
+  console.log("📥 /api/quiz 원본 응답:", res.data);
+
+  // 최상위
+  const root = res.data || {};
+  const d1 = root.data; // { data: [...], nextCursor } 또는 배열 또는 다른 형태
+
+  let list = [];
+
+  if (Array.isArray(d1)) {
+    // case 1: { status, message, data: [ ... ] }
+    list = d1;
+  } else if (d1 && Array.isArray(d1.data)) {
+    // ✅ 현재 케이스: { status, message, data: { data: [ ... ], nextCursor } }
+    list = d1.data;
+  } else if (d1 && Array.isArray(d1.quizzes)) {
+    list = d1.quizzes;
+  } else {
+    console.warn("⚠️ 예상치 못한 data 형식, 빈 배열로 처리:", d1);
+  }
+
+  return { list, nextCursor: (d1 && d1.nextCursor) || null };
+};
+
 export default function SavedQuiz() {
   const navigate = useNavigate();
 
   const [quizzes, setQuizzes] = useState([]);
   const [loading, setLoading] = useState(true);
   const [errorMsg, setErrorMsg] = useState("");
+  // ✅ 목록은 페이지 단위(기본 20개)로 내려옴 → 다음 페이지 커서
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchQuiz = async () => {
@@ -38,38 +73,16 @@ export default function SavedQuiz() {
         setLoading(true);
         setErrorMsg("");
 
-        const res = await axios.get("http://192.168.0.10:8000/api/quiz", {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        });
-
-        console.log("📥 /api/quiz 원본 응답:", res.data);
-
-        // 최상위
-        const root = res.data || {};
-        const d1 = root.data; // { data: [...] } 또는 배열 또는 다른 형태
-
-        let list = [];
-
-        if (Array.isArray(d1)) {
-          // case 1: { status, message, data: [ ... ] }
-          list = d1;
-        } else if (d1 && Array.isArray(d1.data)) {
-          // ✅ 현재 케이스: { status, message, data: { data: [ ... ] } }
-          list = d1.data;
-        } else if (d1 && Array.isArray(d1.quizzes)) {
-          list = d1.quizzes;
-        } else {
-          console.warn("⚠️ 예상치 못한 data 형식, 빈 배열로 처리:", d1);
-        }
-
-        console.log("📌 최종 quizzes 리스트:", list);
-        setQuizzes(list);
+        const page = await fetchQuizPage(token, null);
+
+        console.log("📌 최종 quizzes 리스트:", page.list);
+        setQuizzes(page.list);
+        setNextCursor(page.nextCursor);
       } catch (err) {
         console.error("저장된 퀴즈 목록 불러오기 실패:", err);
         setErrorMsg("저장된 문제 목록을 불러오는데 실패했습니다.");
         setQuizzes([]);
+        setNextCursor(null);
       } finally {
         setLoading(false);
       }
@@ -78,6 +91,29 @@ export default function SavedQuiz() {
     fetchQuiz();
   }, [navigate]);
 
+  // ✅ 다음 페이지 이어 붙이기
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    const token = sessionStorage.getItem("accessToken");
+    if (!token) {
+      alert("로그인이 만료되었습니다. 다시 로그인해 주세요.");
+      navigate("/login", { replace: true });
+      return;
+    }
+
+    try {
+      setLoadingMore(true);
+      const page = await fetchQuizPage(token, nextCursor);
+      setQuizzes((prev) => [...prev, ...page.list]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("저장된 퀴즈 다음 페이지 불러오기 실패:", err);
+      alert("저장된 문제를 더 불러오지 못했습니다. 다시 시도해 주세요.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const isEmpty = !Array.isArray(quizzes) || quizzes.length === 0;
 
   return (
@@ -172,6 +208,25 @@ export default function SavedQuiz() {
               )}
             </div>
           )}
+
+          {!loading && !errorMsg && nextCursor && (
+            <div style={{ textAlign: "center", padding: "16px 0" }}>
+              <button
+                type="button"
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="btn btn--subtle"
+                style={{
+                  height: 32,
+                  padding: "0 16px",
+                  color: "#6b7280",
+                  cursor: loadingMore ? "not-allowed" : "pointer",
+                }}
+              >
+                {loadingMore ? "불러오는 중..." : "더 보기"}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </section>